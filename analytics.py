@@ -0,0 +1,251 @@
+import datetime
+import numpy as np
+import data_engine as db
+
+# --- REVIEW LOG ANALYTICS ---
+# The review log is loaded ONCE into columns (NumPy arrays) and every statistic is a
+# vectorized group-by over those columns. Timestamps are naive local time, stored as
+# int64 seconds, so "day" is simply ts // 86400 and "hour" is (ts // 3600) % 24.
+# Reviews compacted out of the raw log live on as per-deck summaries (log.archive,
+# see data_engine.compact_history) and are merged into every statistic below.
+
+SESSION_GAP = 120   # Legacy entries (no session_id) split into sessions after 2 minutes idle
+
+def _codes(values):
+    """Dictionary-encodes a list of strings/None -> (int32 codes, labels). None -> -1."""
+    labels = {}
+    codes = np.fromiter((-1 if v is None else labels.setdefault(v, len(labels)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(labels)
+
+def _day_iso(days):
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype(str)
+
+class ReviewLog:
+    """Columnar snapshot of history.json."""
+
+    def __init__(self, entries):
+        n = len(entries)
+        stamps = []
+        for e in entries:
+            ts = e.get("timestamp")
+            if not ts:
+                date = e.get("date")
+                ts = f"{date}T12:00:00" if date else "NaT"
+            stamps.append(ts)
+
+        self.ts = np.array(stamps, dtype="datetime64[us]").astype("datetime64[s]").astype(np.int64)
+        self.rating = np.fromiter((e.get("rating", 0) for e in entries), dtype=np.int8, count=n)
+        self.hint = np.fromiter((bool(e.get("hint_used")) for e in entries), dtype=bool, count=n)
+        self.bucket = np.fromiter((-1 if e.get("bucket") is None else e["bucket"] for e in entries), dtype=np.int16, count=n)
+        self.deck, self.deck_names = _codes([e.get("deck") for e in entries])
+        self.session, self.session_ids = _codes([e.get("session_id") or None for e in entries])
+        self.card, self.card_ids = _codes([e.get("card_id") for e in entries])
+        self.archive = {} # {deck: compacted summary}, attached by get_review_log
+
+        valid = self.ts != np.iinfo(np.int64).min # Drop entries with no usable date
+        if not valid.all(): self._keep(valid)
+
+    def _keep(self, mask):
+        for name in ("ts", "rating", "hint", "bucket", "deck", "session", "card"):
+            setattr(self, name, getattr(self, name)[mask])
+
+    def __len__(self):
+        return len(self.ts)
+
+    def deck_mask(self, filename=None):
+        if filename is None: return np.ones(len(self), dtype=bool)
+        if filename not in self.deck_names: return np.zeros(len(self), dtype=bool)
+        return self.deck == self.deck_names.index(filename)
+
+    def scores(self):
+        """Accuracy credit per review: Good 1.0, Hard 1.0 (0.5 with hint), Miss 0.0"""
+        return np.where(self.rating == 3, 1.0, np.where(self.rating == 2, np.where(self.hint, 0.5, 1.0), 0.0))
+
+    def archived(self, filename=None):
+        """Compacted summaries for one deck (or all of them)."""
+        if filename is None: return list(self.archive.values())
+        return [self.archive[filename]] if filename in self.archive else []
+
+    def archived_days(self, filename=None):
+        """{day number: [count, good, hard, miss, score]} summed over the compacted summaries."""
+        out = {}
+        for summary in self.archived(filename):
+            for day, row in summary.get("days", {}).items():
+                d = int(np.datetime64(day, "D").astype(np.int64))
+                out[d] = [a + b for a, b in zip(out.get(d, [0] * len(row)), row)]
+        return out
+
+# --- Cached Loader ---
+_cache = {"stamp": None, "log": None}
+
+def get_review_log():
+    """The columnar log (plus compacted archive), rebuilt only when either file changes."""
+    entries = db.load_history()
+    archive = db.load_archive()
+    stamp = (db.get_history_stamp(), db.get_archive_stamp())
+    if _cache["log"] is None or _cache["stamp"] != stamp:
+        _cache["log"] = ReviewLog(entries)
+        _cache["log"].archive = archive
+        _cache["stamp"] = stamp
+    return _cache["log"]
+
+# --- Compaction ---
+def _bucket_totals(log, mask):
+    """{"bucket": [reviews, recalled]} over the masked raw reviews."""
+    mask = mask & (log.bucket >= 0)
+    buckets = log.bucket[mask].astype(np.int64)
+    if buckets.size == 0: return {}
+    total = np.bincount(buckets)
+    recalled = np.bincount(buckets, weights=(log.rating[mask] >= 2).astype(np.float64))
+    return {str(b): [int(total[b]), int(recalled[b])] for b in np.nonzero(total)[0]}
+
+def summarize_entries(entries):
+    """
+    Folds raw review entries into per-deck summaries for the archive:
+    {deck: {"sessions", "days", "hour_counts", "hour_scores", "buckets"}}
+    """
+    log = ReviewLog(entries)
+    scores = log.scores()
+    out = {}
+    for code, deck in enumerate(log.deck_names):
+        mask = log.deck == code
+        if not mask.any(): continue
+        days, inverse = np.unique(log.ts[mask] // 86400, return_inverse=True)
+        rating = log.rating[mask]
+        cols = [np.bincount(inverse)] + [np.bincount(inverse, weights=rating == r) for r in (3, 2, 1)]
+        score = np.bincount(inverse, weights=scores[mask])
+        hours = (log.ts[mask] // 3600) % 24
+        out[deck] = {
+            "sessions": group_into_sessions(log, deck),
+            "days": {iso: [int(c[i]) for c in cols] + [float(score[i])] for i, iso in enumerate(_day_iso(days).tolist())},
+            "hour_counts": np.bincount(hours, minlength=24).tolist(),
+            "hour_scores": np.bincount(hours, weights=scores[mask], minlength=24).tolist(),
+            "buckets": _bucket_totals(log, mask),
+        }
+    return out
+
+# --- Aggregations ---
+def _daily_totals(log, filename=None):
+    """(day numbers, reviews, score) per day, raw log and archive combined."""
+    mask = log.deck_mask(filename)
+    days, inverse = np.unique(log.ts[mask] // 86400, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(days)).astype(np.float64)
+    score = np.bincount(inverse, weights=log.scores()[mask], minlength=len(days))
+    archived = log.archived_days(filename)
+    if archived:
+        a_days = np.fromiter(archived, dtype=np.int64, count=len(archived))
+        a_rows = np.array(list(archived.values()), dtype=np.float64)
+        days, inverse = np.unique(np.concatenate((days, a_days)), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate((counts, a_rows[:, 0])))
+        score = np.bincount(inverse, weights=np.concatenate((score, a_rows[:, 4])))
+    return days, counts, score
+
+def overall_accuracy(log, filename=None):
+    _, counts, score = _daily_totals(log, filename)
+    if not counts.sum(): return 0.0
+    return float(score.sum() / counts.sum())
+
+def daily_counts(log, filename=None):
+    """{"YYYY-MM-DD": reviews} (feeds the heatmap)."""
+    days, counts, _ = _daily_totals(log, filename)
+    return dict(zip(_day_iso(days).tolist(), counts.astype(np.int64).tolist()))
+
+def daily_accuracy(log, filename=None, last_n=7):
+    """[(YYYY-MM-DD, accuracy), ...] for the last `last_n` days that have reviews."""
+    days, counts, score = _daily_totals(log, filename)
+    if not len(days): return []
+    acc = score / counts
+    days, acc = days[-last_n:], acc[-last_n:]
+    return list(zip(_day_iso(days).tolist(), acc.tolist()))
+
+def hourly_accuracy(log, filename=None):
+    """(reviews per hour, accuracy per hour) as two length-24 arrays."""
+    mask = log.deck_mask(filename)
+    hours = (log.ts[mask] // 3600) % 24
+    counts = np.bincount(hours, minlength=24)
+    score = np.bincount(hours, weights=log.scores()[mask], minlength=24)
+    for summary in log.archived(filename):
+        counts = counts + np.asarray(summary.get("hour_counts", [0] * 24), dtype=np.int64)
+        score = score + np.asarray(summary.get("hour_scores", [0] * 24), dtype=np.float64)
+    acc = np.divide(score, counts, out=np.zeros(24), where=counts > 0)
+    return counts, acc
+
+def retention_by_bucket(log, filename=None):
+    """{bucket: (reviews, recall rate)} using the bucket a card was in when reviewed."""
+    totals = {}
+    for summary in [{"buckets": _bucket_totals(log, log.deck_mask(filename))}] + log.archived(filename):
+        for b, (n, r) in summary.get("buckets", {}).items():
+            row = totals.setdefault(int(b), [0, 0])
+            row[0] += n; row[1] += r
+    return {b: (n, r / n) for b, (n, r) in sorted(totals.items()) if n}
+
+def deck_trends(log, days=30, today=None):
+    """
+    {deck: {"reviews": n, "accuracy": a, "prev_reviews": n, "prev_accuracy": a}}
+    comparing the last `days` days with the `days` before that.
+    """
+    if not len(log): return {}
+    if today is None: today = int(np.datetime64(datetime.date.today(), "D").astype(np.int64))
+    age = today - log.ts // 86400
+    period = np.where(age < days, 0, np.where(age < 2 * days, 1, -1))
+    mask = period >= 0
+    key = log.deck[mask].astype(np.int64) * 2 + period[mask]
+    size = len(log.deck_names) * 2
+    count = np.bincount(key, minlength=size).reshape(-1, 2)
+    score = np.bincount(key, weights=log.scores()[mask], minlength=size).reshape(-1, 2)
+    count = count.astype(np.float64)
+    for i, name in enumerate(log.deck_names):
+        for day, row in log.archived_days(name).items():
+            p = 0 if today - day < days else 1 if today - day < 2 * days else -1
+            if p >= 0: count[i, p] += row[0]; score[i, p] += row[4]
+    acc = np.divide(score, count, out=np.zeros_like(score), where=count > 0)
+    return {
+        name: {"reviews": int(count[i, 0]), "accuracy": float(acc[i, 0]),
+               "prev_reviews": int(count[i, 1]), "prev_accuracy": float(acc[i, 1])}
+        for i, name in enumerate(log.deck_names) if count[i].any()
+    }
+
+def group_into_sessions(log, filename=None):
+    """
+    Sessions for one deck, oldest first:
+    [{'start_time': iso, 'count', 'good', 'hard', 'miss', 'session_id'}, ...]
+    Entries with a session_id group by it; legacy ones split on idle gaps.
+    """
+    sessions = [dict(x) for summary in log.archived(filename) for x in summary.get("sessions", [])]
+    mask = log.deck_mask(filename)
+    if not mask.any():
+        sessions.sort(key=lambda s: s['start_time'])
+        return sessions
+    ts, rating, session = log.ts[mask], log.rating[mask], log.session[mask]
+
+    def emit(ts_sel, rating_sel, group, n_groups, sid_of):
+        count = np.bincount(group, minlength=n_groups)
+        good = np.bincount(group, weights=rating_sel == 3, minlength=n_groups)
+        hard = np.bincount(group, weights=rating_sel == 2, minlength=n_groups)
+        miss = np.bincount(group, weights=rating_sel == 1, minlength=n_groups)
+        start = np.full(n_groups, np.iinfo(np.int64).max)
+        np.minimum.at(start, group, ts_sel)
+        start_iso = start.astype("datetime64[s]").astype(str)
+        for g in np.nonzero(count)[0]:
+            sessions.append({
+                'start_time': str(start_iso[g]), 'count': int(count[g]),
+                'good': int(good[g]), 'hard': int(hard[g]), 'miss': int(miss[g]),
+                'session_id': sid_of(g)
+            })
+
+    # 1. Modern entries: group by session_id
+    modern = session >= 0
+    if modern.any():
+        ts_sel, rating_sel = ts[modern], rating[modern]
+        uniq, group = np.unique(session[modern], return_inverse=True)
+        emit(ts_sel, rating_sel, group, len(uniq), lambda g: log.session_ids[uniq[g]])
+
+    # 2. Legacy entries: sort by time, new session after each idle gap
+    if (~modern).any():
+        order = np.argsort(ts[~modern], kind="stable")
+        ts_sel, rating_sel = ts[~modern][order], rating[~modern][order]
+        group = np.concatenate(([0], np.cumsum(np.diff(ts_sel) > SESSION_GAP)))
+        emit(ts_sel, rating_sel, group, int(group[-1]) + 1, lambda g: None)
+
+    sessions.sort(key=lambda s: s['start_time'])
+    return sessions
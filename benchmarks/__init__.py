@@ -0,0 +1,9 @@
+"""
+FlipStack benchmarks.
+
+    python -m benchmarks run --decks 20 --cards 500 --out before.json
+    python -m benchmarks compare before.json after.json
+
+`run` builds a synthetic collection (see collection.py) in a throwaway BASE_DIR,
+times the hot data_engine paths against it and writes the results as JSON.
+"""
@@ -0,0 +1,40 @@
+import sys
+import json
+import argparse
+
+from benchmarks import collection, run
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="FlipStack data_engine benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Generate a synthetic collection and time the hot paths")
+    for key, default in collection.DEFAULTS.items():
+        p_run.add_argument(f"--{key.replace('_', '-')}", type=int, default=default, dest=key)
+    p_run.add_argument("--repeat", type=int, default=5, help="Warm runs per case (after one cold run)")
+    p_run.add_argument("--only", nargs="*", help="Run just these cases")
+    p_run.add_argument("--keep", action="store_true", help="Keep the generated BASE_DIR")
+    p_run.add_argument("--out", help="Write the JSON here instead of stdout")
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files side by side")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.old) as f: old = json.load(f)
+        with open(args.new) as f: new = json.load(f)
+        print("\n".join(run.compare(old, new)))
+        return 0
+
+    params = {key: getattr(args, key) for key in collection.DEFAULTS}
+    results = run.run(repeat=args.repeat, only=args.only, keep=args.keep, **params)
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f: f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
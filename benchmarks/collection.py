@@ -0,0 +1,146 @@
+import os
+import json
+import random
+import sqlite3
+import zipfile
+import tempfile
+import datetime
+
+# --- SYNTHETIC COLLECTION ---
+# Writes a BASE_DIR laid out exactly like data_engine's (decks/, assets/, history.json,
+# categories.json, deck_meta.json), filled with generated but realistic-looking data.
+# Decks and history come from one seed, so two runs with the same parameters see the same data.
+
+WORDS = ("apple river stone light market window garden yellow thunder silver paper "
+         "mountain ocean forest candle bridge winter summer letter number castle "
+         "engine mirror planet island shadow rhythm harbor lantern meadow violet").split()
+
+DEFAULTS = {
+    "decks": 20,           # Number of deck files
+    "cards": 300,          # Cards per deck
+    "tags": 40,            # Distinct tags in the collection
+    "tags_per_card": 2,    # Up to this many tags per card (Zipf-ish: a few tags are everywhere)
+    "history": 5000,       # Review log entries
+    "history_days": 365,   # ...spread over this many days back from today
+    "media": 30,           # Image files in assets/, referenced by some cards
+    "media_kb": 40,        # Size of each image file
+    "categories": 4,
+    "seed": 0,
+}
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def _tag_pool(rng, count):
+    return [f"{rng.choice(WORDS)}_{i}" for i in range(count)]
+
+def _make_card(rng, deck_i, card_i, tags, media, today):
+    n_tags = rng.randint(0, tags["per_card"])
+    # Zipf-like pick: low indexes (popular tags) come up far more often
+    card_tags = sorted({tags["pool"][min(int(rng.paretovariate(1.2)) - 1, len(tags["pool"]) - 1)] for _ in range(n_tags)}) if tags["pool"] else []
+    bucket = rng.choice((0, 0, 1, 1, 2, 3, 4, 5, 6))
+    due = today + datetime.timedelta(days=rng.randint(-30, 2 ** bucket))
+    return {
+        "id": f"{deck_i}.{card_i}.{rng.getrandbits(32)}",
+        "front": _sentence(rng, rng.randint(2, 12)) + "?",
+        "back": _sentence(rng, rng.randint(1, 20)),
+        "image": rng.choice(media) if media and rng.random() < 0.15 else None,
+        "audio": None,
+        "tags": card_tags,
+        "hint": _sentence(rng, 3) if rng.random() < 0.3 else "",
+        "bucket": bucket,
+        "next_review": None if bucket == 0 else due.isoformat(),
+        "miss_streak": 0,
+        "suspended": rng.random() < 0.02,
+    }
+
+def generate(base_dir, **params):
+    """
+    Fills `base_dir` with a synthetic collection. Keyword arguments override DEFAULTS.
+    Returns {deck filename: [card ids]} for the benchmarks to pick targets from.
+    """
+    p = {**DEFAULTS, **params}
+    rng = random.Random(p["seed"])
+    today = datetime.date.today()
+    decks_dir = os.path.join(base_dir, "decks")
+    assets_dir = os.path.join(base_dir, "assets")
+    for d in (base_dir, decks_dir, assets_dir, os.path.join(base_dir, "backups")):
+        os.makedirs(d, exist_ok=True)
+
+    media = []
+    for i in range(p["media"]):
+        name = f"image_{i}.png"
+        with open(os.path.join(assets_dir, name), "wb") as f:
+            f.write(os.urandom(p["media_kb"] * 1024)) # Content doesn't matter, only the bytes moved
+        media.append(name)
+
+    tags = {"pool": _tag_pool(rng, p["tags"]), "per_card": p["tags_per_card"]}
+    categories = ["Uncategorized"] + [f"Category {i + 1}" for i in range(p["categories"])]
+    meta, ids = {}, {}
+    for d in range(p["decks"]):
+        fname = f"deck_{d:03d}_{rng.choice(WORDS)}.json"
+        cards = [_make_card(rng, d, c, tags, media, today) for c in range(p["cards"])]
+        with open(os.path.join(decks_dir, fname), "w") as f:
+            json.dump(cards, f, indent=2)
+        meta[fname] = rng.choice(categories)
+        ids[fname] = [c["id"] for c in cards]
+
+    with open(os.path.join(base_dir, "categories.json"), "w") as f:
+        json.dump(categories, f)
+    with open(os.path.join(base_dir, "deck_meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    # Review log: sessions of 10-40 reviews, oldest first, as log_review() writes it
+    history, decks = [], list(ids)
+    start = datetime.datetime.now() - datetime.timedelta(days=p["history_days"])
+    span = p["history_days"] * 86400
+    while decks and len(history) < p["history"]:
+        deck = rng.choice(decks)
+        ts = start + datetime.timedelta(seconds=rng.uniform(0, span))
+        sid = f"bench-{len(history)}"
+        for _ in range(min(rng.randint(10, 40), p["history"] - len(history))):
+            ts += datetime.timedelta(seconds=rng.uniform(3, 25))
+            history.append({
+                "timestamp": ts.isoformat(), "deck": deck,
+                "rating": rng.choices((1, 2, 3), weights=(2, 2, 6))[0],
+                "session_id": sid, "hint_used": rng.random() < 0.1,
+                "card_id": rng.choice(ids[deck]), "response_ms": rng.randint(800, 9000),
+                "bucket": rng.randint(0, 6),
+            })
+    history.sort(key=lambda e: e["timestamp"])
+    with open(os.path.join(base_dir, "history.json"), "w") as f:
+        json.dump(history, f, indent=2)
+    return ids
+
+def make_csv(path, cards, seed=0):
+    """A front,back CSV with `cards` rows, as import_csv() expects."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(cards):
+            f.write(f"{_sentence(rng, 4)},{_sentence(rng, 6)}\n")
+    return path
+
+def make_apkg(path, cards, media=0, media_kb=40, seed=0):
+    """A minimal Anki package: collection.anki2 with a notes table, plus a media map."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "collection.anki2")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, flds TEXT)")
+        rows = []
+        for i in range(cards):
+            front = f"<b>{_sentence(rng, 4)}</b>&nbsp;?"
+            if media and i % 5 == 0: front += f'<img src="anki_{i % media}.png">'
+            rows.append((i, front + "\x1f" + _sentence(rng, 6)))
+        conn.executemany("INSERT INTO notes VALUES (?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+        with zipfile.ZipFile(path, "w") as z:
+            z.write(db_path, "collection.anki2")
+            media_map = {}
+            for m in range(media):
+                media_map[str(m)] = f"anki_{m}.png"
+                z.writestr(str(m), os.urandom(media_kb * 1024))
+            z.writestr("media", json.dumps(media_map))
+    return path
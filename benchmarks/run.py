@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+import random
+import shutil
+import platform
+import statistics
+import subprocess
+import tempfile
+import datetime
+
+from benchmarks import collection
+
+# --- BENCHMARK RUNNER ---
+# data_engine picks its BASE_DIR at import time, so XDG_DATA_HOME has to point at the
+# synthetic tree *before* the first import. run() does that, then times each case:
+# one cold call (first touch: empty caches) followed by `repeat` warm calls.
+FORMAT_VERSION = 1
+
+def _git_revision():
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def _summary(times):
+    warm = times[1:] or times
+    return {
+        "runs": len(times),
+        "first_ms": round(times[0] * 1000, 3),
+        "min_ms": round(min(warm) * 1000, 3),
+        "median_ms": round(statistics.median(warm) * 1000, 3),
+        "mean_ms": round(statistics.mean(warm) * 1000, 3),
+    }
+
+def _time(fn, repeat, before=None, after=None):
+    """Times fn(i) for i in 0..repeat; before/after(i) run untimed around each call."""
+    times = []
+    for i in range(repeat + 1):
+        if before: before(i)
+        start = time.perf_counter()
+        fn(i)
+        times.append(time.perf_counter() - start)
+        if after: after(i)
+    return _summary(times)
+
+def cases(db, ids, work_dir, params):
+    """(name, fn, before, after) for each hot path. Decks are picked deterministically."""
+    rng = random.Random(params.get("seed", 0))
+    decks = sorted(ids)
+    deck = decks[len(decks) // 2]
+    query = collection.WORDS[3]
+    csv_path = collection.make_csv(os.path.join(work_dir, "import.csv"), params["cards"])
+    apkg_path = collection.make_apkg(os.path.join(work_dir, "import.apkg"), params["cards"], media=5)
+    imported = []
+    renamed = {"current": deck}
+
+    def drop_imported(i):
+        while imported: db.delete_deck(imported.pop())
+
+    def import_as(importer, path, prefix):
+        def fn(i):
+            name = f"{prefix} {i}"
+            importer(path, name)
+            imported.append(db.deck_filename(name))
+        return fn
+
+    def rename(i):
+        target = f"bench renamed {i % 2}"
+        renamed["current"] = db.rename_deck(renamed["current"], target) or renamed["current"]
+
+    def clear_backups(i):
+        for f in os.listdir(db.BACKUP_DIR): os.remove(os.path.join(db.BACKUP_DIR, f))
+
+    from session_queue import SessionQueue # Imports data_engine, so only once BASE_DIR is set
+    cards = db.load_deck(deck)
+    return [
+        ("load_deck", lambda i: db.load_deck(decks[i % len(decks)]), None, None),
+        ("save_deck", lambda i: db.save_deck(deck, cards), None, None),
+        ("update_card_progress", lambda i: db.update_card_progress(deck, rng.choice(ids[deck]), rng.choice((1, 2, 3))), None, None),
+        ("search_global", lambda i: db.search_global(query), None, None),
+        ("get_heatmap_data", lambda i: db.get_heatmap_data(), None, None),
+        ("get_deck_mastery", lambda i: db.get_deck_mastery(decks[i % len(decks)]), None, None),
+        ("get_deck_summary", lambda i: db.get_deck_summary(decks[i % len(decks)]), None, None),
+        ("session_start", lambda i: SessionQueue(decks[i % len(decks)]).start(), None, None),
+        ("import_csv", import_as(db.import_csv, csv_path, "bench csv"), None, drop_imported),
+        ("import_anki_apkg", import_as(db.import_anki_apkg, apkg_path, "bench anki"), None, drop_imported),
+        ("rename_deck", rename, None, None),
+        ("create_backup", lambda i: db.create_backup(), None, clear_backups),
+    ]
+
+def run(repeat=5, only=None, keep=False, **params):
+    """Builds a collection, times every case and returns the results dict."""
+    params = {**collection.DEFAULTS, **params}
+    root = tempfile.mkdtemp(prefix="flipstack-bench-")
+    os.environ["XDG_DATA_HOME"] = root
+    if "data_engine" in sys.modules:
+        raise RuntimeError("data_engine was imported before the benchmark set its BASE_DIR")
+    base_dir = os.path.join(root, "flipstack")
+
+    started = time.perf_counter()
+    ids = collection.generate(base_dir, **params)
+    generate_s = time.perf_counter() - started
+
+    import data_engine as db
+    results = {}
+    try:
+        for name, fn, before, after in cases(db, ids, root, params):
+            if only and name not in only: continue
+            results[name] = _time(fn, repeat, before, after)
+            print(f"  {name:<22} {results[name]['median_ms']:>10.2f} ms", file=sys.stderr)
+    finally:
+        if not keep: shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "format": FORMAT_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {**params, "repeat": repeat},
+        "generate_s": round(generate_s, 3),
+        "base_dir": base_dir if keep else None,
+        "results": results,
+    }
+
+def compare(old, new):
+    """Side-by-side median times of two result files; returns printable lines."""
+    lines = [f"{'case':<22} {'old ms':>10} {'new ms':>10} {'change':>8}"]
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(name), new["results"].get(name)
+        if not a or not b: # Case only in one of the runs
+            cells = [f"{r['median_ms']:>10.2f}" if r else f"{'-':>10}" for r in (a, b)]
+            lines.append(f"{name:<22} {cells[0]} {cells[1]}")
+            continue
+        change = (b["median_ms"] - a["median_ms"]) / a["median_ms"] * 100 if a["median_ms"] else 0.0
+        lines.append(f"{name:<22} {a['median_ms']:>10.2f} {b['median_ms']:>10.2f} {change:>+7.1f}%")
+    return lines
@@ -0,0 +1,145 @@
+import gi
+import os
+from data_worker import get_worker
+
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import Gtk, Adw, Gio
+
+# --- CARD DIALOG ---
+# The Add / Edit Card dialog, shared by the deck editor, the study session and the
+# global search. It only needs a parent window and the deck the card belongs to; the
+# save goes through the data worker and the CardAdded / CardUpdated event updates
+# whichever views show the card.
+MAX_AUDIO_BYTES = 10 * 1024 * 1024
+
+def show_card_dialog(parent, deck, mode, card=None, on_close=None):
+    """Opens the dialog over `parent`; on_close() runs once it is dismissed (saved or not)."""
+    title = "Add Card" if mode == "add" else "Edit Card"
+    dialog = Adw.MessageDialog(heading=title, transient_for=parent)
+    dialog.set_modal(True)
+    dialog.add_response("cancel", "Cancel")
+    dialog.add_response("save", "Save")
+    dialog.set_response_appearance("save", Adw.ResponseAppearance.SUGGESTED)
+
+    # Responsive Height Logic
+    is_narrow = parent.get_width() < 500
+    box_height = 90 if is_narrow else 120
+
+    # Main Layout
+    box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+
+    # Front
+    box.append(Gtk.Label(label="Front", xalign=0, css_classes=["heading"]))
+    tf = Gtk.TextView(); tf.set_wrap_mode(3)
+    tf.set_left_margin(10); tf.set_right_margin(10); tf.set_top_margin(10); tf.set_bottom_margin(10)
+    if card: tf.get_buffer().set_text(card.get("front", ""))
+
+    scroll_f = Gtk.ScrolledWindow(min_content_height=box_height)
+    scroll_f.set_propagate_natural_height(True); scroll_f.set_hexpand(True)
+    scroll_f.set_child(tf)
+    box.append(Gtk.Frame(child=scroll_f))
+
+    # Back
+    box.append(Gtk.Label(label="Back", xalign=0, css_classes=["heading"]))
+    tb = Gtk.TextView(); tb.set_wrap_mode(3)
+    tb.set_left_margin(10); tb.set_right_margin(10); tb.set_top_margin(10); tb.set_bottom_margin(10)
+    if card: tb.get_buffer().set_text(card.get("back", ""))
+
+    scroll_b = Gtk.ScrolledWindow(min_content_height=box_height)
+    scroll_b.set_propagate_natural_height(True); scroll_b.set_hexpand(True)
+    scroll_b.set_child(tb)
+    box.append(Gtk.Frame(child=scroll_b))
+
+    # Metadata
+    box.append(Gtk.Label(label="Hint", xalign=0, css_classes=["heading"]))
+    th = Gtk.Entry()
+    if card: th.set_text(card.get("hint", ""))
+    box.append(th)
+
+    box.append(Gtk.Label(label="Tags", xalign=0, css_classes=["heading"]))
+    ent_tags = Gtk.Entry(); ent_tags.set_placeholder_text("tag1, tag2")
+    if card: ent_tags.set_text(", ".join(card.get("tags", [])))
+    box.append(ent_tags)
+
+    # --- MEDIA CONTROLS ---
+    state = {"image": card.get("image") if card else None,
+             "audio": card.get("audio") if card else None,
+             "unsuspend": False}
+
+    def create_media_row(label_text, type_hint, icon):
+        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        current = state[type_hint]
+        lbl = Gtk.Label(label=os.path.basename(current) if current else f"No {label_text}", hexpand=True, xalign=0)
+        lbl.set_ellipsize(3)
+        btn_add = Gtk.Button(icon_name=icon)
+        btn_del = Gtk.Button(icon_name="user-trash-symbolic", visible=bool(current))
+
+        def on_del(b):
+            state[type_hint] = None; lbl.set_label(f"No {label_text}"); btn_del.set_visible(False)
+        def on_picked(path):
+            state[type_hint] = path; lbl.set_label(os.path.basename(path)); btn_del.set_visible(True)
+        btn_del.connect("clicked", on_del)
+        btn_add.connect("clicked", lambda b: pick_file(parent, type_hint, on_picked))
+
+        row.append(lbl); row.append(btn_add); row.append(btn_del)
+        return row
+
+    box.append(create_media_row("Image", "image", "insert-image-symbolic"))
+    box.append(create_media_row("Audio", "audio", "audio-volume-high-symbolic"))
+
+    # Unsuspend (Only for Edit Mode)
+    if mode == "edit" and card.get("suspended"):
+        btn_unsus = Gtk.Button(label="Unsuspend Leech"); box.append(Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)); box.append(btn_unsus)
+        def unsus(b): state["unsuspend"] = True; b.set_sensitive(False)
+        btn_unsus.connect("clicked", unsus)
+
+    # Layout Inversion (Scroll -> Clamp -> Content)
+    scroll_main = Gtk.ScrolledWindow()
+    scroll_main.set_propagate_natural_height(True)
+    scroll_main.set_max_content_height(500)
+
+    clamp = Adw.Clamp(maximum_size=600)
+    clamp.set_margin_start(12); clamp.set_margin_end(12); clamp.set_margin_bottom(12)
+    clamp.set_child(box)
+
+    scroll_main.set_child(clamp)
+    dialog.set_extra_child(scroll_main)
+
+    def on_response(d, r):
+        if r == "save":
+            buf_f = tf.get_buffer(); buf_b = tb.get_buffer()
+            s, e = buf_f.get_bounds(); new_f = buf_f.get_text(s, e, True).strip()
+            s, e = buf_b.get_bounds(); new_b = buf_b.get_text(s, e, True).strip()
+            tags = [t.strip() for t in ent_tags.get_text().split(",") if t.strip()]
+            hint_val = th.get_text().strip()
+
+            if new_f and new_b:
+                if mode == "add":
+                    get_worker().add_card(deck, new_f, new_b, state["image"], state["audio"], tags, hint_val)
+                else:
+                    is_suspended = not state["unsuspend"] and card.get("suspended", False)
+                    get_worker().edit_card(deck, card["id"], new_f, new_b, state["image"], state["audio"], tags, is_suspended, hint_val)
+        if on_close: on_close()
+
+    dialog.connect("response", on_response); dialog.present()
+    return dialog
+
+def pick_file(parent, type_hint, callback):
+    if hasattr(Gtk, "FileDialog"):
+        d = Gtk.FileDialog(); f = Gtk.FileFilter()
+        if type_hint == "image": f.set_name("Images"); f.add_pixbuf_formats()
+        elif type_hint == "audio": f.set_name("Audio"); f.add_mime_type("audio/*")
+        filters = Gio.ListStore.new(Gtk.FileFilter); filters.append(f); d.set_filters(filters); d.set_default_filter(f)
+        def on_o(f, r):
+            try:
+                res = f.open_finish(r)
+                if not res: return
+                path = res.get_path()
+                if type_hint == "audio" and os.path.getsize(path) > MAX_AUDIO_BYTES:
+                    content = parent.get_content()
+                    if hasattr(content, "add_toast"): content.add_toast(Adw.Toast.new("File too large! Max 10MB."))
+                    return
+                callback(path)
+            except: pass
+        d.open(parent, None, on_o)
@@ -0,0 +1,155 @@
+import re
+import json
+import datetime
+from collections.abc import MutableMapping
+import numpy as np
+
+# --- COMPACT CARD MODEL ---
+# Two lighter stand-ins for the plain card dicts decks are stored as:
+#   Card          one card; the scheduling fields sit in slots and everything else
+#                 (front/back text, tags, media...) stays as the card's raw JSON until
+#                 a caller first reads one of those keys. Behaves like a dict.
+#   DeckSchedule  one deck's scheduling fields as NumPy columns (struct of arrays),
+#                 for mastery / due counts / forecasts that never look at the text.
+SCHEDULE_FIELDS = ("bucket", "next_review", "last_review", "suspended", "miss_streak", "lapses", "ease", "stability")
+_MISSING = object()
+_INDENT = re.compile(r"\n *") # JSON strings can't hold a raw newline, so these are all layout
+
+class Card(MutableMapping):
+    __slots__ = ("id",) + SCHEDULE_FIELDS + ("_raw", "_rest")
+
+    def __init__(self, card, raw=None):
+        """`card`: the decoded card; `raw`: its JSON text, kept (minus indentation) instead of the text fields when given."""
+        self.id = card.get("id", _MISSING)
+        for key in SCHEDULE_FIELDS: setattr(self, key, card.get(key, _MISSING))
+        self._raw, self._rest = (None, dict(card)) if raw is None else (_INDENT.sub("", raw), None)
+
+    @staticmethod
+    def _slotted(key):
+        return key == "id" or key in SCHEDULE_FIELDS
+
+    def _others(self):
+        """
+        The card as decoded from the raw JSON (on first use). Its scheduling keys are
+        only placeholders keeping the stored key order; the slots hold the live values.
+        """
+        if self._rest is None:
+            self._rest = json.loads(self._raw)
+            self._raw = None
+        return self._rest
+
+    # --- Mapping protocol ---
+    def __getitem__(self, key):
+        if self._slotted(key):
+            value = getattr(self, key)
+            if value is _MISSING: raise KeyError(key)
+            return value
+        return self._others()[key]
+
+    def __setitem__(self, key, value):
+        if self._slotted(key): setattr(self, key, value)
+        else: self._others()[key] = value
+
+    def __delitem__(self, key):
+        if self._slotted(key):
+            if getattr(self, key) is _MISSING: raise KeyError(key)
+            setattr(self, key, _MISSING)
+        else: del self._others()[key]
+
+    def __iter__(self):
+        if self.id is not _MISSING: yield "id"
+        for key in SCHEDULE_FIELDS:
+            if getattr(self, key) is not _MISSING: yield key
+        yield from (k for k in self._others() if not self._slotted(k))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if self._slotted(key): return getattr(self, key) is not _MISSING
+        return key in self._others()
+
+    def get(self, key, default=None):
+        # Scheduling reads are the hot path: skip the KeyError round trip
+        if self._slotted(key):
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        return self._others().get(key, default)
+
+    def to_dict(self):
+        """A plain dict in the stored key order (for json.dump and events)."""
+        card = json.loads(self._raw) if self._raw is not None else dict(self._rest)
+        for key in ("id",) + SCHEDULE_FIELDS:
+            value = getattr(self, key)
+            if value is _MISSING: card.pop(key, None)
+            else: card[key] = value
+        return card
+
+    def __repr__(self):
+        return f"Card({self.to_dict()!r})"
+
+def plain(card):
+    """`card` as something json.dump accepts."""
+    return card.to_dict() if isinstance(card, Card) else card
+
+# --- Struct of arrays ---
+def _day(iso):
+    if not iso: return -1
+    try: return datetime.date.fromisoformat(iso[:10]).toordinal()
+    except ValueError: return -1
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+class DeckSchedule:
+    """
+    Scheduling columns of one deck, row i = i-th card in the file. Dates are
+    proleptic ordinals (date.toordinal()); -1 = none. ease/stability are NaN when unset.
+    """
+    __slots__ = ("ids", "bucket", "next_day", "last_day", "suspended", "miss_streak", "lapses", "ease", "stability")
+
+    def __init__(self, cards):
+        cards = list(cards)
+        n = len(cards)
+        self.ids = [c.get("id") for c in cards]
+        self.bucket = np.fromiter((c.get("bucket", 0) or 0 for c in cards), dtype=np.int16, count=n)
+        self.next_day = np.fromiter((_day(c.get("next_review")) for c in cards), dtype=np.int32, count=n)
+        self.last_day = np.fromiter((_day(c.get("last_review")) for c in cards), dtype=np.int32, count=n)
+        self.suspended = np.fromiter((bool(c.get("suspended")) for c in cards), dtype=np.bool_, count=n)
+        self.miss_streak = np.fromiter((c.get("miss_streak", 0) or 0 for c in cards), dtype=np.int16, count=n)
+        self.lapses = np.fromiter((c.get("lapses", 0) or 0 for c in cards), dtype=np.int32, count=n)
+        self.ease = np.fromiter((c.get("ease") or np.nan for c in cards), dtype=np.float64, count=n)
+        self.stability = np.fromiter((np.nan if c.get("stability") is None else c["stability"] for c in cards), dtype=np.float64, count=n)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def mastery(self):
+        """Share of the deck's cards that are learned (bucket > 0) and not suspended."""
+        if not len(self.ids): return 0.0
+        return int(np.count_nonzero((self.bucket > 0) & ~self.suspended)) / len(self.ids)
+
+    def due_mask(self, today=None):
+        """Active cards that are new or due on/before `today` (a date)."""
+        today = (today or datetime.date.today()).toordinal()
+        return ~self.suspended & (self.next_day <= today) # New cards are -1
+
+    def arrays(self, active_only=True):
+        """The same dict scheduler.card_arrays() builds (day numbers since the epoch)."""
+        keep = ~self.suspended if active_only else slice(None)
+        def epoch_days(col):
+            col = col[keep].astype(np.int64)
+            return np.where(col >= 0, col - _EPOCH_ORDINAL, -1)
+        return {
+            "bucket": self.bucket[keep].astype(np.int32), "lapses": self.lapses[keep].astype(np.int32),
+            "ease": self.ease[keep].astype(np.float64), "stability": self.stability[keep].astype(np.float64),
+            "next_day": epoch_days(self.next_day), "last_day": epoch_days(self.last_day),
+        }
+
+    def nbytes(self):
+        return sum(getattr(self, col).nbytes for col in self.__slots__[1:])
+
+def collection_arrays(schedules):
+    """DeckSchedule.arrays() of several decks, concatenated (active cards only)."""
+    parts = [s.arrays() for s in schedules]
+    if not parts: return DeckSchedule([]).arrays()
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
@@ -1,10 +1,141 @@
 import gi
-import data_engine as db
+import cairo
+import forecast
+from data_worker import get_worker
 from datetime import datetime, timedelta
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Gdk
+from gi.repository import Gtk, Adw, Gdk, GLib
+
+# --- HEATMAP WIDGET ---
+# One DrawingArea paints every day of the year. Cells are drawn into a cached
+# surface; a refresh diffs the per-day color buckets and repaints only the cells
+# that changed, and the widget just blits the surface on every frame.
+CELL = 14
+GAP = 3
+MIN_COLS, MAX_COLS = 5, 60
+
+_GREEN = (0x26 / 255, 0xa2 / 255, 0x69 / 255)
+_BLUE = (0x35 / 255, 0x84 / 255, 0xe4 / 255)
+# Same palette as the .hm-* CSS classes used by the legend
+BUCKET_COLORS = {
+    "hm-1": (*_GREEN, 0.4), "hm-2": (*_GREEN, 0.6), "hm-3": (*_GREEN, 0.8), "hm-4": (*_GREEN, 1.0),
+    "hm-f1": (*_BLUE, 0.25), "hm-f2": (*_BLUE, 0.45), "hm-f3": (*_BLUE, 0.7), "hm-f4": (*_BLUE, 1.0),
+}
+
+class HeatmapArea(Gtk.DrawingArea):
+    def __init__(self):
+        super().__init__()
+        self.set_hexpand(True)
+        self.set_content_height(CELL)
+        self.buckets = []   # color bucket (hm-* class name) per day
+        self.tooltips = []
+        self._surface = None
+        self._surface_size = None
+        self._cols, self._x0 = 0, 0
+
+        self.set_draw_func(self.on_draw)
+        self.connect("resize", self.on_resize)
+        self.set_has_tooltip(True)
+        self.connect("query-tooltip", self.on_query_tooltip)
+        Adw.StyleManager.get_default().connect("notify::dark", lambda *a: self.invalidate())
+
+    def set_cells(self, buckets, tooltips):
+        """Updates the grid; when the layout is unchanged only the differing cells are repainted."""
+        old = self.buckets
+        self.buckets, self.tooltips = buckets, tooltips
+        if self._surface is None or len(old) != len(buckets):
+            self.invalidate()
+            return
+        changed = [i for i, (a, b) in enumerate(zip(old, buckets)) if a != b]
+        if not changed: return
+        cr = cairo.Context(self._surface)
+        for i in changed: self.paint_cell(cr, i)
+        self.queue_draw()
+
+    def invalidate(self):
+        self._surface = None
+        self.update_height()
+        self.queue_draw()
+
+    # --- Geometry ---
+    def layout(self, width):
+        cols = max(MIN_COLS, min(MAX_COLS, (width + GAP) // (CELL + GAP)))
+        x0 = max(0, (width - (cols * (CELL + GAP) - GAP)) // 2)
+        return cols, x0
+
+    def cell_origin(self, i):
+        row, col = divmod(i, self._cols)
+        return self._x0 + col * (CELL + GAP), row * (CELL + GAP)
+
+    def update_height(self):
+        if not self._cols: return
+        rows = max(1, -(-len(self.buckets) // self._cols))
+        self.set_content_height(rows * (CELL + GAP) - GAP)
+
+    def on_resize(self, area, width, height):
+        cols, x0 = self.layout(width)
+        if (cols, x0) != (self._cols, self._x0):
+            self._cols, self._x0 = cols, x0
+            self._surface = None
+            # Changing our own size request during allocation must wait for the next cycle
+            GLib.idle_add(lambda: self.update_height() or False)
+
+    def cell_at(self, x, y):
+        if not self._cols: return None
+        col, dx = divmod(int(x) - self._x0, CELL + GAP)
+        row, dy = divmod(int(y), CELL + GAP)
+        if not (0 <= col < self._cols) or dx >= CELL or dy >= CELL: return None
+        i = row * self._cols + col
+        return i if 0 <= i < len(self.buckets) else None
+
+    # --- Painting ---
+    def paint_cell(self, cr, i):
+        x, y = self.cell_origin(i)
+        cr.save()
+        cr.set_operator(cairo.OPERATOR_CLEAR)
+        cr.rectangle(x, y, CELL, CELL)
+        cr.fill()
+        cr.restore()
+
+        bucket = self.buckets[i]
+        if bucket == "hm-future":
+            cr.set_source_rgba(*self._fg, 0.2)
+            cr.set_line_width(1)
+            cr.rectangle(x + 0.5, y + 0.5, CELL - 1, CELL - 1)
+            cr.stroke()
+            return
+        if bucket in BUCKET_COLORS: cr.set_source_rgba(*BUCKET_COLORS[bucket])
+        else: cr.set_source_rgba(*self._fg, 0.1)   # hm-0: no activity
+        cr.rectangle(x, y, CELL, CELL)
+        cr.fill()
+
+    def build_surface(self, width, height):
+        scale = self.get_scale_factor()
+        self._surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, max(1, width * scale), max(1, height * scale))
+        self._surface.set_device_scale(scale, scale)
+        self._surface_size = (width, height)
+        fg = self.get_color()
+        self._fg = (fg.red, fg.green, fg.blue)
+        cr = cairo.Context(self._surface)
+        for i in range(len(self.buckets)): self.paint_cell(cr, i)
+
+    def on_draw(self, area, cr, width, height):
+        if not self._cols: self._cols, self._x0 = self.layout(width)
+        if self._surface is None or self._surface_size != (width, height): self.build_surface(width, height)
+        cr.set_source_surface(self._surface, 0, 0)
+        cr.paint()
+
+    def on_query_tooltip(self, widget, x, y, keyboard, tooltip):
+        i = self.cell_at(x, y)
+        if i is None: return False
+        tooltip.set_text(self.tooltips[i])
+        cx, cy = self.cell_origin(i)
+        rect = Gdk.Rectangle()
+        rect.x, rect.y, rect.width, rect.height = cx, cy, CELL, CELL
+        tooltip.set_tip_area(rect) # Moving to another cell re-queries the tooltip
+        return True
 
 class DashboardView(Gtk.Box):
     def __init__(self):
@@ -35,15 +166,25 @@ class DashboardView(Gtk.Box):
         content.append(title)
 
         # --- Stats Section (Centered) ---
-        stats = db.load_stats()
-        stats_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
+        # FlowBox so the four cards wrap to 2x2 on narrow (mobile) screens
+        stats_box = Gtk.FlowBox(selection_mode=Gtk.SelectionMode.NONE, homogeneous=True)
         stats_box.set_halign(Gtk.Align.CENTER)
+        stats_box.set_column_spacing(20); stats_box.set_row_spacing(20)
+        stats_box.set_min_children_per_line(2); stats_box.set_max_children_per_line(4)
         
-        self.lbl_streak_val = Gtk.Label(label=str(stats['streak']))
+        self.lbl_streak_val = Gtk.Label(label="0")
         self.lbl_streak_val.add_css_class("title-1")
         
         card_streak = self.create_stat_card("🔥 Streak", self.lbl_streak_val)
         stats_box.append(card_streak)
+
+        # Forecast cards: reviews due in the next 30 / 90 / 365 days
+        self.forecast_labels = {}
+        for days in forecast.HORIZONS:
+            lbl = Gtk.Label(label="0")
+            lbl.add_css_class("title-1")
+            self.forecast_labels[days] = lbl
+            stats_box.append(self.create_stat_card(f"📅 Next {days}d", lbl))
         
         content.append(stats_box)
         content.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
@@ -73,22 +214,12 @@ class DashboardView(Gtk.Box):
         
         content.append(hm_header_box)
 
-        # --- Heatmap Container ---
-        # No nested ScrolledWindow here; flowbox expands naturally inside page_scroll
-        self.flowbox = Gtk.FlowBox()
-        self.flowbox.set_valign(Gtk.Align.START)
-        self.flowbox.set_halign(Gtk.Align.CENTER)
-        self.flowbox.set_selection_mode(Gtk.SelectionMode.NONE)
-        
-        # Reduced min children to ensure it wraps nicely on 360px screens
-        self.flowbox.set_min_children_per_line(5) 
-        self.flowbox.set_max_children_per_line(60)
-        self.flowbox.set_row_spacing(3)
-        self.flowbox.set_column_spacing(3)
-        
-        content.append(self.flowbox)
+        # --- Heatmap ---
+        # A single custom-drawn widget; wraps from 5 to 60 days per row like the old grid
+        self.heatmap = HeatmapArea()
+        content.append(self.heatmap)
 
-        # --- Legend Grid (3x2) ---
+        # --- Legend Grid (4x2) ---
         legend_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
         legend_box.set_halign(Gtk.Align.CENTER)
         legend_box.set_margin_top(10)
@@ -113,17 +244,31 @@ class DashboardView(Gtk.Box):
         grid.attach(create_legend_item("hm-2", "Normal (30-50)"), 1, 1, 1, 1)  
         grid.attach(create_legend_item("hm-3", "Heavy (50-100)"), 0, 2, 1, 1)  
         grid.attach(create_legend_item("hm-4", "Heroic (100+)"), 1, 2, 1, 1)   
+        grid.attach(create_legend_item("hm-f2", "Forecast (Due)"), 0, 3, 1, 1)
         
         legend_box.append(grid)
         content.append(legend_box)
 
+        # Activity and forecast arrive from the data worker; draw the empty grid meanwhile
+        self.heat_data = {}
+        self.forecast = {"daily": {}, "totals": {days: 0 for days in forecast.HORIZONS}}
         self.render_heatmap()
+        self.refresh()
 
     def refresh(self):
-        # 1. Reloads Stats
-        stats = db.load_stats()
-        self.lbl_streak_val.set_label(str(stats['streak']))
-        # 2. Redraws heatmap
+        # 1. Streak + heatmap counts (from the rollups, not the raw log)
+        self.load_activity()
+        # 2. Forecast cards and future heatmap cells
+        self.update_forecast()
+
+    def load_activity(self):
+        get_worker().get_activity(self.current_view_year, self.on_activity_ready)
+
+    def on_activity_ready(self, result):
+        year, streak, data = result
+        self.lbl_streak_val.set_label(str(streak))
+        if year != self.current_view_year: return # User already switched years again
+        self.heat_data = data
         self.render_heatmap()
 
     def create_stat_card(self, title, val_widget):
@@ -146,13 +291,26 @@ class DashboardView(Gtk.Box):
     def change_year(self, delta):
         self.current_view_year += delta
         self.lbl_year.set_label(f"{self.current_view_year} Contributions")
-        self.render_heatmap()
+        self.load_activity()
 
-    def render_heatmap(self):
-        while child := self.flowbox.get_first_child():
-            self.flowbox.remove(child)
+    def update_forecast(self):
+        get_worker().get_forecast(self.on_forecast_ready)
+
+    def on_forecast_ready(self, result):
+        self.forecast = result
+        for days, lbl in self.forecast_labels.items():
+            lbl.set_label(str(self.forecast["totals"][days]))
+        self.render_heatmap() # Only the future cells that changed get repainted
+
+    def intensity_class(self, count, prefix="hm-"):
+        if count > 100: return f"{prefix}4"      # Heroic
+        if count > 50: return f"{prefix}3"       # Heavy
+        if count >= 30: return f"{prefix}2"      # Normal
+        return f"{prefix}1"                      # Light (<30)
 
-        data = db.get_heatmap_data() 
+    def render_heatmap(self):
+        data = self.heat_data
+        projected = self.forecast["daily"]
         today = datetime.today().date()
         
         target_year = self.current_view_year
@@ -160,6 +318,7 @@ class DashboardView(Gtk.Box):
         next_year_start = datetime(target_year + 1, 1, 1).date()
         days_in_year = (next_year_start - start_date).days
         
+        buckets, tooltips = [], []
         for i in range(days_in_year):
             curr_date = start_date + timedelta(days=i)
             date_str = curr_date.strftime("%Y-%m-%d")
@@ -169,19 +328,14 @@ class DashboardView(Gtk.Box):
             tooltip = f"{date_str}: {count} reviews"
 
             if curr_date > today:
-                color_class = "hm-future" 
-                tooltip = f"{date_str}"
+                # Future days show the projected workload instead of history
+                due = projected.get(date_str, 0)
+                color_class = self.intensity_class(due, "hm-f") if due else "hm-future"
+                tooltip = f"{date_str}: {due} reviews due (forecast)" if due else f"{date_str}"
             elif count > 0:
-                # Thresholds
-                if count > 100: color_class = "hm-4"      # Heroic
-                elif count > 50: color_class = "hm-3"     # Heavy
-                elif count >= 30: color_class = "hm-2"    # Normal
-                else: color_class = "hm-1"                # Light (<30)
-            
-            box = Gtk.Box()
-            box.set_size_request(14, 14)
-            box.add_css_class("heatmap-box")
-            box.add_css_class(color_class)
-            box.set_tooltip_text(tooltip)
+                color_class = self.intensity_class(count)
             
-            self.flowbox.append(box)
\ No newline at end of file
+            buckets.append(color_class)
+            tooltips.append(tooltip)
+
+        self.heatmap.set_cells(buckets, tooltips)
@@ -1,4 +1,5 @@
 import json
+import copy
 import os
 import csv
 import datetime
@@ -10,6 +11,14 @@ import sqlite3
 import re
 import tempfile
 import sys
+import bisect
+import struct
+import scheduler
+import card_model
+import deck_index
+import locks
+import events
+import profiler
 
 # --- PATH CONFIGURATION ---
 
@@ -30,37 +39,54 @@ DATA_DIR = os.path.join(BASE_DIR, "decks")       # <--- JSON files go here
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")     # <--- User images/audio go here
 BACKUP_DIR = os.path.join(BASE_DIR, "backups")
 
-# 3. Create them if they don't exist
-for d in [BASE_DIR, DATA_DIR, ASSETS_DIR, BACKUP_DIR]:
-    os.makedirs(d, exist_ok=True)
-
-DATA_DIR = os.path.join(BASE_DIR, "decks")
-ASSETS_DIR = os.path.join(BASE_DIR, "assets")
-BACKUP_DIR = os.path.join(BASE_DIR, "backups")
 STATS_FILE = os.path.join(BASE_DIR, "stats.json")
 SETTINGS_FILE = os.path.join(BASE_DIR, "settings.json")
 HISTORY_FILE = os.path.join(BASE_DIR, "history.json")
 CATEGORIES_FILE = os.path.join(BASE_DIR, "categories.json")
 DECK_META_FILE = os.path.join(BASE_DIR, "deck_meta.json")
 COLORS_FILE = os.path.join(BASE_DIR, "deck_colors.json")
+ROLLUPS_FILE = os.path.join(BASE_DIR, "rollups.json")
+ARCHIVE_FILE = os.path.join(BASE_DIR, "history_archive.json")
+LIBRARY_SNAPSHOT_FILE = os.path.join(BASE_DIR, "library_snapshot.json")
+DECK_STATS_DIR = os.path.join(BASE_DIR, "deck_stats")
+INDEX_DIR = os.path.join(BASE_DIR, "deck_index")     # <--- Per-deck scheduling sidecars
+LOCK_DIR = os.path.join(BASE_DIR, ".locks")
+
+# 3. Create them if they don't exist (once, at import)
+for d in [DATA_DIR, ASSETS_DIR, BACKUP_DIR, DECK_STATS_DIR, INDEX_DIR]:
+    os.makedirs(d, exist_ok=True)
 
-# Ensure directories exist
-for d in [BASE_DIR, DATA_DIR, ASSETS_DIR, BACKUP_DIR]:
-    if not os.path.exists(d):
-        os.makedirs(d)
+# --- Locking ---
+# Every read-modify-write below holds the advisory lock of the file(s) it rewrites, so a
+# second process (or thread) can't interleave and lose an update. See locks.py.
+locks.init(LOCK_DIR)
+
+def _deck_locked(fn):
+    """Holds the lock of the deck named by the function's first argument."""
+    return locks.holding(lambda filename, *a, **k: (locks.deck_key(filename),))(fn)
 
 # --- Settings ---
+# settings.json is parsed once and kept until the file changes on disk (the review
+# path reads it on every answer). Callers get their own copy, so they may edit it.
+_settings = {"stamp": None, "values": {}}
+
 def load_settings():
-    default = {"sound_enabled": True}
-    if not os.path.exists(SETTINGS_FILE): return default
-    try:
-        with open(SETTINGS_FILE, "r") as f:
-            return {**default, **json.load(f)}
-    except: return default
+    default = {"sound_enabled": True, "due_limit_per_deck": 0, "new_per_day": 0, "reviews_per_day": 0,
+               "scheduler": scheduler.DEFAULT_SCHEDULER, "history_keep_days": 90}
+    stamp = _file_stamp(SETTINGS_FILE)
+    if stamp is None: return default
+    if stamp != _settings["stamp"]:
+        try:
+            with open(SETTINGS_FILE, "r") as f:
+                values = json.load(f)
+        except: values = {}
+        _settings["stamp"], _settings["values"] = stamp, values
+    return {**default, **copy.deepcopy(_settings["values"])}
 
 def save_settings(settings):
     with open(SETTINGS_FILE, "w") as f:
         json.dump(settings, f)
+    _settings["stamp"], _settings["values"] = _file_stamp(SETTINGS_FILE), copy.deepcopy(settings)
 
 # --- Categories ---
 def get_categories():
@@ -75,13 +101,16 @@ def get_categories():
     except:
         return ["Uncategorized"]
 
+@locks.holding(lambda name: (locks.CATEGORIES,))
 def add_category(name):
     cats = get_categories()
     if name not in cats:
         cats.append(name)
         with open(CATEGORIES_FILE, "w") as f:
             json.dump(cats, f)
+        events.publish(events.CategoriesChanged())
 
+@locks.holding(lambda name: (locks.CATEGORIES,))
 def delete_category(name):
     if name == "Uncategorized": return
     cats = get_categories()
@@ -89,18 +118,27 @@ def delete_category(name):
         cats.remove(name)
         with open(CATEGORIES_FILE, "w") as f:
             json.dump(cats, f)
+        events.publish(events.CategoriesChanged())
 
-def get_deck_category(filename):
-    meta = {}
+def get_deck_categories():
+    """{filename: category} for every deck that has one (others are Uncategorized)."""
     if os.path.exists(DECK_META_FILE):
         try:
             with open(DECK_META_FILE, "r") as f:
-                meta = json.load(f)
+                return json.load(f)
         except:
             pass
-    return meta.get(filename, "Uncategorized")
+    return {}
+
+def get_deck_category(filename):
+    return get_deck_categories().get(filename, "Uncategorized")
 
 def set_deck_category(filename, category):
+    _write_deck_category(filename, category)
+    events.publish(events.DeckMoved(filename, category))
+
+@locks.holding(lambda filename, category: (locks.DECK_META,))
+def _write_deck_category(filename, category):
     meta = {}
     if os.path.exists(DECK_META_FILE):
         try:
@@ -246,21 +284,212 @@ def load_deck(filename):
     except:
         return []
 
-def save_deck(filename, cards):
-    with open(os.path.join(DATA_DIR, filename), "w") as f:
-        json.dump(cards, f, indent=2)
+@_deck_locked
+def save_deck(filename, cards, changed=None):
+    """
+    Writes a deck and brings its caches and sidecar along. `changed`: rows whose
+    scheduling fields are the only thing that changed (same cards, same order), so
+    the sidecar can be patched in place instead of rewritten.
+    """
+    # Write-then-rename, so a reader (e.g. on the data worker) never sees a half-written deck
+    tmp = os.path.join(DATA_DIR, f".{filename}.tmp")
+    with open(tmp, "w") as f:
+        spans = _dump_deck(cards, f)
+    _swap_in_deck(filename, tmp, cards, spans, changed)
 
-def create_empty_deck(name, category="Uncategorized"):
+def _swap_in_deck(filename, tmp, cards, spans, changed=None):
+    """
+    Moves a staged deck file (written by _dump_deck) into place and updates everything
+    derived from the deck file: schedule columns, sidecar, due index. Every deck write
+    goes through here, so a sidecar never outlives the file it describes.
+    """
+    path = os.path.join(DATA_DIR, filename)
+    previous = _file_stamp(path)
+    os.replace(tmp, path)
+    stamp = _file_stamp(path)
+    _schedules[filename] = (stamp, card_model.DeckSchedule(cards))
+    _update_sidecar(filename, cards, spans, stamp, previous, changed)
+    reindex_deck_due(filename, cards)
+
+# --- Card Spans ---
+# Where each card object sits in its deck file (character offsets; decks are written
+# ASCII-only, so they are byte offsets too), packed as start << 32 | length. They are
+# kept in the deck's sidecar (below), so a session reads only the cards it is about to
+# show instead of parsing the whole deck.
+_SKIP_SEP = re.compile(r"[\s,]*")
+
+def _dump_deck(cards, f):
+    """Writes exactly what json.dump(cards, f, indent=2) would; returns the cards' packed spans."""
+    if not cards:
+        f.write("[]")
+        return []
+    spans, pos = [], 1
+    f.write("[")
+    for i, card in enumerate(cards):
+        text = json.dumps(card_model.plain(card), indent=2).replace("\n", "\n  ")
+        lead = ",\n  " if i else "\n  "
+        f.write(lead + text)
+        pos += len(lead)
+        spans.append(pos << 32 | len(text))
+        pos += len(text)
+    f.write("\n]")
+    return spans
+
+def _scan_deck(text):
+    """Yields (card, start, end) for each card of a deck file's text, decoding one card at a time."""
+    decoder = json.JSONDecoder()
+    pos = text.find("[") + 1
+    if not pos: return
+    while True:
+        pos = _SKIP_SEP.match(text, pos).end()
+        if pos >= len(text) or text[pos] == "]": return
+        card, end = decoder.raw_decode(text, pos)
+        yield card, pos, end
+        pos = end
+
+# --- Deck Schedules ---
+# The scheduling fields of each deck as NumPy columns (card_model.DeckSchedule), for
+# the forecast and the due index. Cached per deck until its file changes; save_deck()
+# refreshes the entry from the cards it writes, so our own writes never cost a re-read.
+_schedules = {}     # filename -> ((mtime, size) of the file, DeckSchedule)
+_SCHEDULE_KEYS = ("id",) + card_model.SCHEDULE_FIELDS
+
+@_deck_locked # Readers fill the caches too: never alongside a write swapping the deck in
+def _scan_deck_file(filename):
+    """
+    One pass over a deck file, decoding a card at a time and keeping only its scheduling
+    fields: refreshes the deck's DeckSchedule and sidecar, returns the rows.
+    """
+    try:
+        with open(os.path.join(DATA_DIR, filename), "rb") as f:
+            st = os.fstat(f.fileno())
+            raw = f.read()
+    except OSError:
+        return []
+    stamp = (st.st_mtime_ns, st.st_size)
+    rows, spans = [], []
+    try:
+        if raw.isascii():
+            for card, start, end in _scan_deck(raw.decode("ascii")):
+                rows.append({k: card[k] for k in _SCHEDULE_KEYS if k in card})
+                spans.append(start << 32 | end - start)
+        else: # Offsets would no longer be byte offsets: no spans (reads fall back to load_deck)
+            rows = [{k: c[k] for k in _SCHEDULE_KEYS if k in c} for c in json.loads(raw)]
+            spans = [0] * len(rows)
+    except ValueError:
+        rows, spans = [], [] # Corrupt: same as load_deck(), no cards
+    _schedules[filename] = (stamp, card_model.DeckSchedule(rows))
+    _write_sidecar(filename, deck_index.build(rows, spans), stamp)
+    return rows
+
+def load_schedule(filename):
+    cached = _schedules.get(filename)
+    if cached and cached[0] == _file_stamp(os.path.join(DATA_DIR, filename)): return cached[1]
+    rows = _scan_deck_file(filename)
+    cached = _schedules.get(filename)
+    return cached[1] if cached else card_model.DeckSchedule(rows)
+
+# --- Deck Index Sidecars ---
+# deck_index/<deck>.idx: per card id hash, span, next review day, bucket, miss streak
+# and flags, memory-mapped (see deck_index.py). Due counts, mastery and session
+# planning read these instead of the JSON. A progress update patches its card's record
+# in place; other writes rewrite the file; a sidecar that no longer matches its deck
+# file (changed by another program, or from before sidecars) is rebuilt on first use.
+_sidecars = {}      # filename -> mapped deck_index.Sidecar
+
+def _sidecar_path(filename):
+    return os.path.join(INDEX_DIR, os.path.splitext(filename)[0] + ".idx")
+
+def _write_sidecar(filename, records, stamp):
+    try:
+        deck_index.write(_sidecar_path(filename), records, stamp)
+    except OSError as e:
+        print(f"Could not write deck index for {filename}: {e}")
+        _drop_sidecar(filename) # Don't leave the old one around to be trusted
+    _sidecars.pop(filename, None)
+
+def _update_sidecar(filename, cards, spans, stamp, previous, changed):
+    if changed is not None and previous is not None:
+        rows = {row: cards[row] for row in changed}
+        if deck_index.patch(_sidecar_path(filename), rows, spans, stamp, previous): return
+    _write_sidecar(filename, deck_index.build(cards, spans), stamp)
+
+def _drop_sidecar(filename):
+    _sidecars.pop(filename, None)
+    try: os.remove(_sidecar_path(filename))
+    except OSError: pass
+
+def load_sidecar(filename):
+    """The deck's mapped sidecar, rebuilt first if it doesn't describe the deck file as it is now."""
+    side = _sidecars.get(filename)
+    if side is not None and side.deck_stamp == _file_stamp(os.path.join(DATA_DIR, filename)): return side
+    # Held while checking and installing, so a reader (any worker thread) can't install a
+    # sidecar for a deck file a concurrent write has just replaced
+    with locks.locked(locks.deck_key(filename)):
+        stamp = _file_stamp(os.path.join(DATA_DIR, filename))
+        if stamp is None: return None
+        side = deck_index.open_sidecar(_sidecar_path(filename))
+        if side is None or side.deck_stamp != stamp:
+            _scan_deck_file(filename)
+            side = deck_index.open_sidecar(_sidecar_path(filename))
+        if side is None or side.deck_stamp != stamp: return None
+        _sidecars[filename] = side
+        return side
+
+def load_cards(filename, card_ids=None, hashes=None):
+    """
+    The given cards of a deck (by id, or by deck_index.id_hash), in the order asked;
+    cards no longer in the deck are skipped. Only those cards are read, through the
+    spans in the sidecar; they come back as card_model.Card, whose text fields stay
+    undecoded until first read.
+    """
+    if hashes is None: hashes = [deck_index.id_hash(cid) for cid in card_ids]
+    for _ in range(2): # A second go if the deck was rewritten between the sidecar check and the read
+        side = load_sidecar(filename)
+        if side is None: return []
+        rows = side.rows_of(hashes)
+        spans = side.records["span"][rows[rows >= 0]].tolist()
+        if not all(span & 0xFFFFFFFF for span in spans): break # Unknown spans: read it all below
+        try:
+            with open(os.path.join(DATA_DIR, filename), "rb") as f:
+                st = os.fstat(f.fileno())
+                if (st.st_mtime_ns, st.st_size) != side.deck_stamp: continue
+                cards = []
+                for span in spans:
+                    f.seek(span >> 32)
+                    raw = f.read(span & 0xFFFFFFFF).decode("ascii")
+                    cards.append(card_model.Card(json.loads(raw), raw))
+                return cards
+        except (OSError, ValueError):
+            return []
+    wanted = [int(h) for h in hashes]
+    by_hash = {deck_index.id_hash(c["id"]): c for c in load_deck(filename)}
+    return [by_hash[h] for h in wanted if h in by_hash]
+
+def get_deck_hashes(filename):
+    """Id hashes of every card of a deck, in file order (a copy)."""
+    side = load_sidecar(filename)
+    return side.records["id_hash"].copy() if side is not None else deck_index.build([])["id_hash"]
+
+def deck_filename(name):
+    """The deck file a display name maps to."""
     safe = "".join([c for c in name if c.isalnum() or c in (' ', '_')]).strip()
-    fname = f"{safe.lower().replace(' ', '_')}.json"
+    return f"{safe.lower().replace(' ', '_')}.json"
+
+def create_empty_deck(name, category="Uncategorized"):
+    fname = deck_filename(name)
     save_deck(fname, [])
-    set_deck_category(fname, category)
+    _write_deck_category(fname, category)
+    events.publish(events.DeckCreated(fname, category))
     return fname
 
+@locks.holding(lambda filename: (locks.deck_key(filename), locks.stats_key(filename), locks.HISTORY))
 def delete_deck(filename):
     path = os.path.join(DATA_DIR, filename)
     if os.path.exists(path):
         os.remove(path)
+    _drop_sidecar(filename)
+    reindex_deck_due(filename, [])
     if os.path.exists(HISTORY_FILE):
         try:
             with open(HISTORY_FILE, "r") as f:
@@ -270,14 +499,49 @@ def delete_deck(filename):
                 json.dump(new_h, f, indent=2)
         except:
             pass
+    _drop_deck_archive(filename)
+    _drop_deck_rollups(filename)
+    _drop_deck_stats(filename)
+    events.publish(events.DeckDeleted(filename))
 
 def get_deck_mastery(filename):
-    cards = load_deck(filename)
-    if not cards: return 0.0
-    learned = len([c for c in cards if c.get("bucket", 0) > 0 and not c.get("suspended", False)])
-    return learned / len(cards)
+    side = load_sidecar(filename)
+    return deck_index.mastery(side.records) if side is not None else 0.0
+
+def get_deck_summary(filename):
+    """(mastery, due count) of one deck, from its sidecar."""
+    side = load_sidecar(filename)
+    if side is None: return (0.0, 0)
+    return (deck_index.mastery(side.records), sum(deck_index.due_counts(side.records)))
+
+def get_decks_summary(filenames):
+    """{filename: (mastery, due count)} for several decks (one worker job for the whole sidebar)."""
+    return {f: get_deck_summary(f) for f in filenames}
+
+# --- Library Snapshot ---
+# The sidebar as it was last drawn (categories, deck order, mastery, due counts), saved
+# when the window closes so the next start can draw the library without reading any deck.
+# It is only a cache: the UI reconciles it against get_library_state() right after.
+def get_library_state():
+    files = get_all_decks()
+    return {"categories": get_categories(), "meta": get_deck_categories(), "summaries": get_decks_summary(files)}
+
+def load_library_snapshot():
+    try:
+        with open(LIBRARY_SNAPSHOT_FILE, "r") as f:
+            snapshot = json.load(f)
+        return snapshot if snapshot.get("version") == 1 else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def save_library_snapshot(snapshot):
+    tmp_path = LIBRARY_SNAPSHOT_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({**snapshot, "version": 1}, f)
+    os.replace(tmp_path, LIBRARY_SNAPSHOT_FILE)
 
 # --- Card Logic ---
+@_deck_locked
 def add_card_to_deck(filename, front, back, image_path=None, audio_path=None, tags=None, hint=None):
     cards = load_deck(filename)
     img_file = save_asset(image_path) if image_path else None
@@ -295,7 +559,9 @@ def add_card_to_deck(filename, front, back, image_path=None, audio_path=None, ta
         "suspended": False
     })
     save_deck(filename, cards)
+    events.publish(events.CardAdded(filename, dict(cards[-1])))
 
+@_deck_locked
 def edit_card(filename, card_id, f_txt, b_txt, img_path=None, aud_path=None, tags=None, suspended=False, hint=None):
     cards = load_deck(filename)
     for c in cards:
@@ -320,91 +586,651 @@ def edit_card(filename, card_id, f_txt, b_txt, img_path=None, aud_path=None, tag
             c["hint"] = hint or ""
             c["suspended"] = suspended
             if not suspended: c["miss_streak"] = 0
+            edited = dict(c)
             break
+    else:
+        edited = None
     save_deck(filename, cards)
+    if edited: events.publish(events.CardUpdated(filename, edited))
 
+@_deck_locked
 def delete_card(filename, cid):
     cards = load_deck(filename)
     new_c = [c for c in cards if c["id"] != cid]
     save_deck(filename, new_c)
+    if len(new_c) != len(cards): events.publish(events.CardDeleted(filename, cid))
+
+# --- Batch Operations ---
+BATCH_OPS = ("edit", "tag", "untag", "suspend", "unsuspend", "move", "delete")
+
+def _batch_locks(operations):
+    decks = {op.get("deck") for op in operations} | {op.get("to") for op in operations}
+    return [locks.deck_key(f) for f in decks if f]
+
+@locks.holding(_batch_locks)
+def apply_card_batch(operations):
+    """
+    Applies a list of card operations in memory and writes every touched deck exactly once.
+    Each operation is a dict: {"op": ..., "deck": filename, "id": card_id, ...}
+      - "edit":      "fields" -> dict of card keys to overwrite (front, back, hint...)
+      - "tag":       "tags" -> tags to add
+      - "untag":     "tags" -> tags to remove
+      - "suspend" / "unsuspend" / "delete"
+      - "move":      "to" -> destination deck filename
+    The batch is all-or-nothing: if any operation is invalid (unknown op, missing deck or card),
+    nothing is written and False is returned.
+    """
+    if not operations: return True
+    existing = set(get_all_decks())
+    decks = {}   # filename -> list of cards (working copies)
+    index = {}   # filename -> {card_id: card}
+    touched = {} # (filename, card_id) -> "updated" / "deleted" / "added", for the change events
+
+    def open_deck(fname):
+        if fname not in decks:
+            if fname not in existing: raise KeyError(fname)
+            decks[fname] = load_deck(fname)
+            index[fname] = {c["id"]: c for c in decks[fname]}
+        return decks[fname]
+
+    try:
+        for op in operations:
+            kind = op.get("op")
+            if kind not in BATCH_OPS: raise ValueError(f"Unknown batch op: {kind}")
+            fname, cid = op["deck"], op["id"]
+            open_deck(fname)
+            card = index[fname].get(cid)
+            if card is None: raise KeyError(cid)
+
+            if kind not in ("delete", "move"): touched.setdefault((fname, cid), "updated")
+
+            if kind == "edit":
+                for key, val in op.get("fields", {}).items():
+                    if key in ("id", "bucket", "next_review"): continue # Scheduling is not editable here
+                    card[key] = val
+            elif kind == "tag":
+                tags = card.setdefault("tags", [])
+                for t in op.get("tags", []):
+                    if t not in tags: tags.append(t)
+            elif kind == "untag":
+                drop = {t.lower() for t in op.get("tags", [])}
+                card["tags"] = [t for t in card.get("tags", []) if t.lower() not in drop]
+            elif kind == "suspend":
+                card["suspended"] = True
+            elif kind == "unsuspend":
+                card["suspended"] = False
+                card["miss_streak"] = 0
+            elif kind == "delete":
+                decks[fname].remove(card)
+                del index[fname][cid]
+                touched[(fname, cid)] = "deleted"
+            elif kind == "move":
+                dest = op["to"]
+                if dest == fname: continue
+                open_deck(dest)
+                decks[fname].remove(card)
+                del index[fname][cid]
+                decks[dest].append(card)
+                index[dest][cid] = card
+                touched[(fname, cid)] = "deleted"
+                touched[(dest, cid)] = "added"
+    except (KeyError, ValueError) as e:
+        print(f"Batch rejected: {e}")
+        return False
+
+    # Stage every deck to a temp file first, then swap them in, so a failed write
+    # can't leave half of the batch applied.
+    staged, spans = [], {}
+    try:
+        for fname, cards in decks.items():
+            tmp_path = os.path.join(DATA_DIR, f".{fname}.tmp")
+            staged.append((tmp_path, fname))
+            with open(tmp_path, "w") as f:
+                spans[fname] = _dump_deck(cards, f)
+    except Exception as e:
+        print(f"Batch write failed: {e}")
+        for tmp_path, _ in staged:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+        return False
+
+    for tmp_path, fname in staged:
+        _swap_in_deck(fname, tmp_path, decks[fname], spans[fname])
+    for (fname, cid), change in touched.items():
+        if change == "deleted": events.publish(events.CardDeleted(fname, cid))
+        elif change == "added": events.publish(events.CardAdded(fname, dict(index[fname][cid])))
+        else: events.publish(events.CardUpdated(fname, dict(index[fname][cid])))
+    return True
+
+# --- Global Due Index ---
+# A sorted index of (next_review, deck, card_id) over the whole collection, so the
+# cross-deck "Study All Due" session can start from the most overdue cards without
+# re-reading and re-sorting every deck (a single deck's session plans from its
+# sidecar instead, see session_queue). New cards have no next_review and sort first.
+# Built lazily on first use and kept current by save_deck(), which every progress
+# update goes through.
+ALL_DUE = "__all_due__"
+
+_due_keys = None     # sorted [(next_review or "", filename, card_id), ...]
+_due_lookup = {}     # filename -> {card_id: next_review or ""}
+_deck_stamps = {}    # filename -> (mtime, size) of the deck file as we last wrote it
+
+def _build_due_index():
+    global _due_keys
+    _due_keys = []
+    _due_lookup.clear()
+    for fname in get_all_decks():
+        entries = {c["id"]: c.get("next_review") or "" for c in _scan_deck_file(fname) if not c.get("suspended")}
+        _due_lookup[fname] = entries
+        _due_keys.extend((nr, fname, cid) for cid, nr in entries.items())
+    _due_keys.sort()
+
+def _remove_key(keys, key):
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key: del keys[i]
+
+def reindex_deck_due(filename, cards):
+    """Diffs a deck's cards against the index and moves only the entries that changed."""
+    _deck_stamps[filename] = _file_stamp(os.path.join(DATA_DIR, filename))
+    if _due_keys is None: return # Not built yet, nothing to maintain
+    old = _due_lookup.get(filename, {})
+    new = {c["id"]: c.get("next_review") or "" for c in cards if not c.get("suspended")}
+    for cid, nr in old.items():
+        if new.get(cid) != nr: _remove_key(_due_keys, (nr, filename, cid))
+    for cid, nr in new.items():
+        if old.get(cid) != nr: bisect.insort(_due_keys, (nr, filename, cid))
+    if new: _due_lookup[filename] = new
+    else: _due_lookup.pop(filename, None)
+
+def count_deck_due(filename, today=None):
+    """(new, review) counts of a deck's due cards (today: a date), from its sidecar."""
+    side = load_sidecar(filename)
+    return deck_index.due_counts(side.records, today) if side is not None else (0, 0)
+
+def iter_due_keys(after=None, today=None):
+    """
+    Yields (filename, card_id, is_new, key) for the due cards of the whole collection,
+    in index order, starting after index key `after`. Consume it within one worker job:
+    the index may move between jobs, which is why callers resume from a key, not a position.
+    """
+    if _due_keys is None: _build_due_index()
+    today = today or datetime.date.today().isoformat()
+    end = bisect.bisect_right(_due_keys, (today, "\uffff", "\uffff"))
+    i = bisect.bisect_right(_due_keys, after) if after is not None else 0
+    while i < end:
+        key = _due_keys[i]
+        yield key[1], key[2], key[0] == "", key
+        i += 1
+
+def get_global_due(per_deck_limit=0, today=None):
+    """
+    Returns [(filename, card_id), ...] for every due card in the collection,
+    most overdue first. per_deck_limit > 0 caps how many cards one deck contributes.
+    """
+    if _due_keys is None: _build_due_index()
+    today = today or datetime.date.today().isoformat()
+    end = bisect.bisect_right(_due_keys, (today, "\uffff", "\uffff"))
+    taken = {}
+    due = []
+    for nr, fname, cid in _due_keys[:end]:
+        if per_deck_limit > 0:
+            if taken.get(fname, 0) >= per_deck_limit: continue
+            taken[fname] = taken.get(fname, 0) + 1
+        due.append((fname, cid))
+    return due
+
+def sync_external_changes(decks=(), history=False):
+    """
+    Brings the caches in line with files changed by someone else (a sync, a restore...).
+    `decks`: deck filenames whose files changed; `history`: history.json changed.
+    Our own writes are recognised by their stamp and skipped. Only the touched decks'
+    due index entries are redone; the history/archive/analytics caches revalidate
+    themselves by stamp, so the log only needs its rollups rebuilt when they didn't
+    move along with it. Returns (set of externally changed decks, history changed).
+    """
+    changed = set()
+    for fname in decks:
+        stamp = _file_stamp(os.path.join(DATA_DIR, fname))
+        if fname in _deck_stamps and stamp == _deck_stamps[fname]: continue
+        with locks.locked(locks.deck_key(fname)):
+            reindex_deck_due(fname, load_deck(fname) if stamp else [])
+        changed.add(fname)
+
+    history_changed = False
+    if history:
+        with locks.locked(locks.HISTORY): # Let a writer in another process finish its log + rollups
+            history_changed = _history_stamp() != _history["stamp"]
+            if history_changed and _rollups and _rollups_file_stamp() == _rollups_stamp:
+                rebuild_rollups()
+    return changed, history_changed
+
+def load_global_due_cards(per_deck_limit=0):
+    """
+    Materializes the cards returned by get_global_due(). Each deck is read once and
+    every card is tagged with its owning deck under "_deck" (never written back).
+    """
+    due = get_global_due(per_deck_limit)
+    wanted = {}
+    for fname, cid in due:
+        wanted.setdefault(fname, set()).add(cid)
+    by_key = {}
+    for fname, ids in wanted.items():
+        for c in load_deck(fname):
+            if c["id"] in ids:
+                c["_deck"] = fname
+                by_key[(fname, c["id"])] = c
+    return [by_key[k] for k in due if k in by_key]
+
+def count_indexed_cards():
+    if _due_keys is None: _build_due_index()
+    return len(_due_keys)
 
 # --- Progress ---
-# UPDATED: Added hint_used logic
-def log_review(deck, rating, sid=None, hint_used=False):
+# --- History Cache & Per-Card Index ---
+# history.json is parsed once and kept in memory until the file changes on disk.
+# Alongside it we keep card_id -> [absolute positions], so one card's reviews can be
+# fetched without scanning the log. Positions are absolute (they never shift): entries
+# trimmed off the front only bump "dropped", and stale positions are skipped on read.
+# Old reviews are not thrown away: compaction folds them into history_archive.json
+# (and re-indexes the much shorter raw log). MAX_HISTORY bounds the raw tier.
+MAX_HISTORY = 10000
+_history = {"stamp": None, "entries": [], "dropped": 0, "by_card": {}}
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _history_stamp():
+    return _file_stamp(HISTORY_FILE)
+
+def _index_history(entries, dropped):
+    by_card = {}
+    for i, e in enumerate(entries):
+        cid = e.get("card_id")
+        if cid: by_card.setdefault(cid, []).append(dropped + i)
+    _history.update(entries=entries, dropped=dropped, by_card=by_card)
+
+def load_history():
+    """Returns the (cached) review log. Treat the returned list as read-only."""
+    stamp = _history_stamp()
+    if stamp != _history["stamp"]:
+        entries = []
+        if stamp:
+            try:
+                with open(HISTORY_FILE, "r") as f:
+                    entries = json.load(f)
+            except:
+                pass
+        _index_history(entries, 0)
+        _history["stamp"] = stamp
+    return _history["entries"]
+
+def get_history_stamp():
+    """Changes whenever the review log changes (lets callers cache derived data)."""
+    return _history["stamp"]
+
+# UPDATED: Added hint_used logic, card_id, answer latency and the card's bucket before review
+@locks.holding(lambda *a, **k: (locks.HISTORY,))
+def log_review(deck, rating, sid=None, hint_used=False, card_id=None, response_ms=None, bucket=None, is_new=False):
     entry = { 
         "timestamp": datetime.datetime.now().isoformat(), 
         "deck": deck, 
         "rating": rating, 
         "session_id": sid,
-        "hint_used": hint_used 
+        "hint_used": hint_used,
+        "card_id": card_id,
+        "response_ms": response_ms,
+        "bucket": bucket
     }
-    hist = []
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                hist = json.load(f)
-        except:
-            pass
+    if is_new: entry["new"] = True # First review of the card (daily new-card caps count these)
+    hist = load_history()
+    rollups = load_rollups() # Built (if needed) before the new entry lands in the log
     hist.append(entry)
-    if len(hist) > 10000:
-        hist = hist[-10000:]
+    if card_id: _history["by_card"].setdefault(card_id, []).append(_history["dropped"] + len(hist) - 1)
+    if _needs_compaction(hist): _fold_history(hist)
     with open(HISTORY_FILE, "w") as f:
         json.dump(hist, f, indent=2)
         f.flush()
         os.fsync(f.fileno())
+    _history["stamp"] = _history_stamp()
+    _bump_rollups(rollups, deck, entry["timestamp"], is_new)
+    _save_rollups()
+
+# --- History Compaction ---
+# Raw reviews older than settings["history_keep_days"] (or beyond MAX_HISTORY) are folded
+# into history_archive.json, one summary per deck:
+#   sessions: [group_into_sessions() dicts]
+#   days:     {"YYYY-MM-DD": [count, good, hard, miss, score]}
+#   hour_counts / hour_scores: 24 ints / floats
+#   buckets:  {bucket: [reviews, recalled]}
+# The stats screens merge these summaries with the raw log, so lifetime numbers survive.
+COMPACT_SLACK_DAYS = 7  # Let the oldest raw entry age this much past the cutoff before compacting again
+_archive = {"stamp": None, "decks": {}}
+
+def _entry_time(e):
+    return e.get("timestamp") or e.get("date") or ""
+
+def _archive_stamp():
+    return _file_stamp(ARCHIVE_FILE)
+
+def load_archive():
+    """{deck: summary} of compacted history (cached). Treat as read-only."""
+    stamp = _archive_stamp()
+    if stamp != _archive["stamp"]:
+        decks = {}
+        if stamp:
+            try:
+                with open(ARCHIVE_FILE, "r") as f:
+                    decks = json.load(f).get("decks", {})
+            except:
+                pass
+        _archive.update(stamp=stamp, decks=decks)
+    return _archive["decks"]
+
+def get_archive_stamp():
+    return _archive["stamp"]
+
+def _save_archive(decks):
+    with open(ARCHIVE_FILE, "w") as f:
+        json.dump({"version": 1, "decks": decks}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    _archive.update(stamp=_archive_stamp(), decks=decks)
+
+def _merge_summary(into, part):
+    into.setdefault("sessions", []).extend(part["sessions"])
+    into["sessions"].sort(key=lambda x: x["start_time"])
+    days = into.setdefault("days", {})
+    for day, row in part["days"].items():
+        days[day] = [a + b for a, b in zip(days.get(day, [0] * len(row)), row)]
+    for key in ("hour_counts", "hour_scores"):
+        into[key] = [a + b for a, b in zip(into.get(key, [0] * 24), part[key])]
+    buckets = into.setdefault("buckets", {})
+    for b, row in part["buckets"].items():
+        buckets[b] = [x + y for x, y in zip(buckets.get(b, [0, 0]), row)]
+
+def _compaction_cutoff(keep_days=None):
+    if keep_days is None: keep_days = load_settings().get("history_keep_days", 90)
+    return (datetime.datetime.now() - datetime.timedelta(days=keep_days)).isoformat()
+
+def _needs_compaction(hist):
+    if len(hist) > MAX_HISTORY: return True
+    slack = _compaction_cutoff(load_settings().get("history_keep_days", 90) + COMPACT_SLACK_DAYS)
+    return bool(hist) and _entry_time(hist[0]) < slack
+
+def _fold_history(hist, keep_days=None):
+    """Moves old entries of `hist` (in place) into the archive. Returns how many were folded."""
+    import analytics # Local import: analytics itself imports this module
+
+    cutoff = _compaction_cutoff(keep_days)
+    n_old = 0
+    while n_old < len(hist) and _entry_time(hist[n_old]) < cutoff: n_old += 1
+    n_old = max(n_old, len(hist) - MAX_HISTORY)
+
+    # Never split a session: back the cut off any run of reviews closer than the idle gap
+    def gap(i):
+        try:
+            a = datetime.datetime.fromisoformat(_entry_time(hist[i - 1]))
+            b = datetime.datetime.fromisoformat(_entry_time(hist[i]))
+            return (b - a).total_seconds()
+        except ValueError:
+            return float("inf")
+    while 0 < n_old < len(hist) and gap(n_old) <= analytics.SESSION_GAP: n_old -= 1
+    if n_old <= 0: return 0
+
+    # ...and entries sharing a session_id with the kept part stay raw too
+    live_sids = {e.get("session_id") for e in hist[n_old:] if e.get("session_id")}
+    folded = [e for e in hist[:n_old] if not (e.get("session_id") in live_sids)]
+    carried = [e for e in hist[:n_old] if e.get("session_id") in live_sids]
+    if not folded: return 0
+
+    decks = {k: v for k, v in load_archive().items()}
+    for deck, part in analytics.summarize_entries(folded).items():
+        _merge_summary(decks.setdefault(deck, {}), part)
+    _save_archive(decks) # Archive first: a crash in between double-counts rather than loses
+
+    hist[:n_old] = carried
+    _index_history(hist, 0)
+    return len(folded)
+
+@locks.holding(lambda keep_days=None: (locks.HISTORY,))
+def compact_history(keep_days=None):
+    """Folds raw reviews older than `keep_days` (default: the setting) into the archive."""
+    hist = load_history()
+    folded = _fold_history(hist, keep_days)
+    if folded:
+        with open(HISTORY_FILE, "w") as f:
+            json.dump(hist, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        _history["stamp"] = _history_stamp()
+    return folded
+
+def _drop_deck_archive(filename):
+    decks = load_archive()
+    if filename in decks: _save_archive({k: v for k, v in decks.items() if k != filename})
+
+def _rename_deck_archive(old_filename, new_filename):
+    decks = load_archive()
+    if old_filename in decks:
+        decks = {(new_filename if k == old_filename else k): v for k, v in decks.items()}
+        _save_archive(decks)
+
+def get_card_history(card_id):
+    """All logged reviews of one card, oldest first. Cost is O(reviews of that card)."""
+    hist = load_history()
+    positions = _history["by_card"].get(card_id, [])
+    dropped = _history["dropped"]
+    live = [p for p in positions if p >= dropped]
+    if len(live) != len(positions): _history["by_card"][card_id] = live
+    return [hist[p - dropped] for p in live]
 
 def get_deck_history(filename):
-    if not os.path.exists(HISTORY_FILE): return []
-    try:
-        with open(HISTORY_FILE, "r") as f:
-            data = json.load(f)
-            return [d for d in data if d["deck"] == filename]
-    except:
-        return []
-
-def get_heatmap_data():
-    if not os.path.exists(HISTORY_FILE): return {}
-    try:
-        with open(HISTORY_FILE, "r") as f:
-            history = json.load(f)
-        data = {}
-        for h in history:
-            ts = h.get("timestamp", h.get("date"))
-            if not ts: continue
-            day = ts.split("T")[0]
-            data[day] = data.get(day, 0) + 1
-        return data
-    except:
-        return {}
+    return [d for d in load_history() if d.get("deck") == filename]
+
+# --- Review Rollups ---
+# Pre-aggregated counters so the dashboard never has to scan the raw log:
+#   days:   {"YYYY-MM-DD": reviews}           (heatmap, year switcher)
+#   decks:  {deck: {"YYYY-MM-DD": reviews}}   (lets deck delete/rename patch the totals)
+#   hours:  {deck: [reviews per hour x 24]}
+#   new:    {deck: {"YYYY-MM-DD": first reviews of new cards}}  (daily new-card caps)
+#   streak / last_day: current study streak, advanced as reviews come in
+# Updated incrementally by log_review; rebuild_rollups() regenerates it from history.json.
+_rollups = {}
+_rollups_stamp = None # rollups.json as of our last read/write; another process may move it on
+
+def _empty_rollups():
+    return {"days": {}, "decks": {}, "hours": {}, "new": {}, "streak": 0, "last_day": None}
+
+def _bump_rollups(r, deck, ts, is_new=False):
+    day, hour = ts[:10], int(ts[11:13]) if len(ts) > 12 else None
+    r["days"][day] = r["days"].get(day, 0) + 1
+    per_deck = r["decks"].setdefault(deck, {})
+    per_deck[day] = per_deck.get(day, 0) + 1
+    if is_new:
+        new = r["new"].setdefault(deck, {})
+        new[day] = new.get(day, 0) + 1
+    if hour is not None:
+        r["hours"].setdefault(deck, [0] * 24)[hour] += 1
+
+    last = r["last_day"]
+    if last == day: return
+    if last and (datetime.date.fromisoformat(day) - datetime.date.fromisoformat(last)).days == 1:
+        r["streak"] += 1
+    elif last and day < last:
+        return # Out-of-order (rebuild of an unsorted log); streak is recomputed afterwards
+    else:
+        r["streak"] = 1
+    r["last_day"] = day
+
+def _streak_from_days(days, last_day):
+    streak, d = 0, datetime.date.fromisoformat(last_day)
+    while d.isoformat() in days:
+        streak += 1
+        d -= datetime.timedelta(days=1)
+    return streak
+
+def _rollups_file_stamp():
+    return _file_stamp(ROLLUPS_FILE)
+
+def _save_rollups():
+    global _rollups_stamp
+    with open(ROLLUPS_FILE, "w") as f:
+        json.dump(_rollups, f)
+    _rollups_stamp = _rollups_file_stamp()
+
+@locks.holding(lambda: (locks.HISTORY,))
+def rebuild_rollups():
+    """Regenerates rollups.json from the compacted archive plus the raw review log."""
+    r = _empty_rollups()
+    for deck, summary in load_archive().items():
+        per_deck = r["decks"].setdefault(deck, {})
+        for day, row in summary.get("days", {}).items():
+            per_deck[day] = per_deck.get(day, 0) + row[0]
+            r["days"][day] = r["days"].get(day, 0) + row[0]
+        r["hours"][deck] = list(summary.get("hour_counts", [0] * 24))
+    for h in load_history():
+        ts = h.get("timestamp", h.get("date"))
+        if ts: _bump_rollups(r, h.get("deck"), ts, h.get("new", False))
+    if r["days"]:
+        r["last_day"] = max(r["days"])
+        r["streak"] = _streak_from_days(r["days"], r["last_day"])
+        # The log is capped, so a long streak may predate it: trust the legacy stats.json if it agrees
+        legacy = load_stats()
+        if legacy.get("last_study_date") == r["last_day"]:
+            r["streak"] = max(r["streak"], legacy.get("streak", 0))
+    _rollups.clear()
+    _rollups.update(r)
+    _save_rollups()
+    return _rollups
+
+def load_rollups():
+    """Returns the (cached) rollups, building them from the log the first time."""
+    global _rollups_stamp
+    stamp = _rollups_file_stamp()
+    if not _rollups or stamp != _rollups_stamp:
+        try:
+            with open(ROLLUPS_FILE, "r") as f:
+                loaded = json.load(f)
+            _rollups.clear()
+            _rollups.update({**_empty_rollups(), **loaded})
+            _rollups_stamp = stamp
+        except:
+            rebuild_rollups()
+    return _rollups
+
+def _drop_deck_rollups(filename):
+    r = load_rollups()
+    for day, n in r["decks"].pop(filename, {}).items():
+        left = r["days"].get(day, 0) - n
+        if left > 0: r["days"][day] = left
+        else: r["days"].pop(day, None)
+    r["hours"].pop(filename, None)
+    r["new"].pop(filename, None)
+    _save_rollups()
+
+def _rename_deck_rollups(old_filename, new_filename):
+    r = load_rollups()
+    if old_filename in r["decks"]: r["decks"][new_filename] = r["decks"].pop(old_filename)
+    if old_filename in r["hours"]: r["hours"][new_filename] = r["hours"].pop(old_filename)
+    if old_filename in r["new"]: r["new"][new_filename] = r["new"].pop(old_filename)
+    _save_rollups()
+
+def get_heatmap_data(year=None):
+    """{"YYYY-MM-DD": reviews}, optionally only for one year."""
+    days = load_rollups()["days"]
+    if year is None: return dict(days)
+    prefix = f"{year}-"
+    return {d: n for d, n in days.items() if d.startswith(prefix)}
+
+def get_hourly_counts(filename=None):
+    """Reviews per hour of day (24 ints), for one deck or all of them."""
+    hours = load_rollups()["hours"]
+    rows = [hours.get(filename, [0] * 24)] if filename else list(hours.values())
+    return [sum(col) for col in zip(*rows)] if rows else [0] * 24
+
+def get_studied_today(filename):
+    """(new cards started, reviews done) today in one deck, for the daily caps."""
+    r, today = load_rollups(), datetime.date.today().isoformat()
+    return r["new"].get(filename, {}).get(today, 0), r["decks"].get(filename, {}).get(today, 0)
+
+def get_streak():
+    """Current streak: alive while the last study day is today or yesterday."""
+    r = load_rollups()
+    if not r["last_day"]: return 0
+    gap = (datetime.date.today() - datetime.date.fromisoformat(r["last_day"])).days
+    return r["streak"] if gap <= 1 else 0
 
 # UPDATED: Added hint_used param
-def update_card_progress(filename, card_id, rating, session_id=None, hint_used=False):
-    log_review(filename, rating, session_id, hint_used)
+@_deck_locked
+def update_card_progress(filename, card_id, rating, session_id=None, hint_used=False, response_ms=None):
     cards = load_deck(filename)
+    prev = next((c for c in cards if c["id"] == card_id), None)
+    prev_bucket = prev.get("bucket", 0) if prev else None
+    is_new = bool(prev) and not prev.get("next_review")
+    log_stats(filename, rating, hint_used) # Before log_review, so a first-time backfill doesn't count this review twice
+    log_review(filename, rating, session_id, hint_used, card_id, response_ms, prev_bucket, is_new)
     leech_alert = False
     
-    for c in cards:
+    sched = scheduler.get_scheduler(load_settings())
+    today = datetime.date.today()
+    
+    changed = []
+    for row, c in enumerate(cards):
         if c["id"] == card_id:
             if rating == 1:
                 c["miss_streak"] = c.get("miss_streak", 0) + 1
+                c["lapses"] = c.get("lapses", 0) + 1
                 if c["miss_streak"] >= 8:
                     c["suspended"] = True
                     leech_alert = True
             else:
                 c["miss_streak"] = 0
 
-            if rating == 3: c["bucket"] = c.get("bucket", 0) + 1
-            elif rating == 1: c["bucket"] = 0
-            if rating == 2 and c.get("bucket", 0) == 0: c["bucket"] = 1
-            
-            days = 0 if c.get("bucket", 0) == 0 else 2 ** c["bucket"]
-            c["next_review"] = (datetime.date.today() + datetime.timedelta(days=days)).isoformat()
+            sched.review(c, rating, today)
+            c["last_review"] = today.isoformat()
+            reviewed = dict(c)
+            changed.append(row)
             break
+    else:
+        reviewed = None
             
-    save_deck(filename, cards)
-    update_streak()
+    save_deck(filename, cards, changed) # Only scheduling fields moved: the sidecar is patched in place
+    if reviewed: events.publish(events.ProgressLogged(filename, reviewed, rating, leech_alert))
     return leech_alert
 
+@locks.holding(lambda sched=None: [locks.deck_key(f) for f in get_all_decks()])
+def reschedule_collection(sched=None):
+    """
+    Recomputes next_review for every card in every deck with the active scheduler.
+    The math runs on NumPy arrays over the whole collection; each deck is then written once.
+    Returns the number of cards processed.
+    """
+    sched = sched or scheduler.get_scheduler(load_settings())
+    decks = {f: load_deck(f) for f in get_all_decks()}
+    flat = [c for cards in decks.values() for c in cards]
+    if not flat: return 0
+
+    result = sched.reschedule(scheduler.card_arrays(flat))
+    next_iso = scheduler.days_to_iso(result["next_day"])
+    last_iso = scheduler.days_to_iso(result["last_day"])
+    extra = {k: v.tolist() for k, v in result.items() if k not in ("next_day", "last_day")}
+    for i, c in enumerate(flat):
+        c["next_review"] = next_iso[i]
+        # Keep the estimated last review, so the next reschedule starts from it rather than re-estimating
+        if not c.get("last_review") and last_iso[i]: c["last_review"] = last_iso[i]
+        for key, values in extra.items(): c[key] = values[i]
+
+    for fname, cards in decks.items():
+        save_deck(fname, cards)
+    return len(flat)
+
+def get_schedule_arrays():
+    """Scheduling fields of every active (non-suspended) card, packed as NumPy arrays."""
+    return card_model.collection_arrays([load_schedule(f) for f in get_all_decks()])
+
 def create_backup():
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     zip_name = os.path.join(BACKUP_DIR, f"flipstack_backup_{ts}")
@@ -415,71 +1241,107 @@ def create_backup():
         return False
 
 # --- STATISTICS ENGINE ---
-def log_stats(deck_name, rating):
+# Per-deck daily accuracy lives in DECK_STATS_DIR/<deck>.bin as fixed-size records,
+# one per study day, oldest first:  day number, reviews, correct, credit x2
+# (credit: Good 1, Hard 1 or 0.5 with a hint, Miss 0 -- doubled to stay an integer).
+# A review rewrites today's record in place or appends a new one, so logging is O(1)
+# and the last N days are read straight from the end of one deck's file.
+_STAT_REC = struct.Struct("<iIII")
+
+def _deck_stats_path(deck_name):
+    return os.path.join(DECK_STATS_DIR, deck_name.replace(".json", "") + ".bin")
+
+def _ensure_deck_stats(deck_name):
+    """First use of a deck: backfill its records from the review history (archive + raw log)."""
+    path = _deck_stats_path(deck_name)
+    if os.path.exists(path): return path
+    with locks.locked(locks.stats_key(deck_name)):
+        if not os.path.exists(path): _backfill_deck_stats(deck_name, path) # Another process may have won
+    return path
+
+def _backfill_deck_stats(deck_name, path):
+    days = {}
+    for day, row in load_archive().get(deck_name, {}).get("days", {}).items():
+        count, good, hard, miss, score = row
+        days[day] = [count, good + hard, int(round(score * 2))]
+    for e in load_history():
+        if e.get("deck") != deck_name or not _entry_time(e): continue
+        rating = e.get("rating", 0)
+        rec = days.setdefault(_entry_time(e)[:10], [0, 0, 0])
+        rec[0] += 1
+        rec[1] += rating >= 2
+        rec[2] += 2 if rating == 3 else (1 if e.get("hint_used") else 2) if rating == 2 else 0
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for day in sorted(days):
+            f.write(_STAT_REC.pack(datetime.date.fromisoformat(day).toordinal(), *days[day]))
+    os.replace(tmp, path)
+
+@locks.holding(lambda deck_name, *a, **k: (locks.stats_key(deck_name),))
+def log_stats(deck_name, rating, hint_used=False):
     """
-    Logs a review event to stats.json.
+    Counts one review in the deck's daily accuracy store.
     Rating: 3=Good (Correct), 2=Hard (Correct), 1=Miss (Incorrect)
     """
-    stats_path = os.path.join(DATA_DIR, 'stats.json')
-    today = datetime.now().strftime("%Y-%m-%d")
-    
-    data = {}
-    if os.path.exists(stats_path):
-        try:
-            with open(stats_path, 'r') as f:
-                data = json.load(f)
-        except: pass
-
-    # Initialize structure: data[deck_name][date]
-    if deck_name not in data: data[deck_name] = {}
-    if today not in data[deck_name]: 
-        data[deck_name][today] = {"correct": 0, "total": 0}
-
-    # Update counts
-    data[deck_name][today]["total"] += 1
-    # We count Good (3) and Hard (2) as "Correct" for accuracy tracking
-    if rating >= 2:
-        data[deck_name][today]["correct"] += 1
-        
+    path = _ensure_deck_stats(deck_name)
+    today = datetime.date.today().toordinal()
+    correct = 1 if rating >= 2 else 0
+    credit = 2 if rating == 3 else (1 if hint_used else 2) if rating == 2 else 0
     try:
-        with open(stats_path, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            size -= size % _STAT_REC.size # Ignore a torn trailing record
+            if size:
+                f.seek(size - _STAT_REC.size)
+                day, total, n_correct, n_credit = _STAT_REC.unpack(f.read(_STAT_REC.size))
+                if day == today:
+                    f.seek(size - _STAT_REC.size)
+                    f.write(_STAT_REC.pack(day, total + 1, n_correct + correct, n_credit + credit))
+                    return
+            f.seek(size)
+            f.write(_STAT_REC.pack(today, 1, correct, credit))
+            f.truncate()
+    except OSError as e:
         print(f"Failed to save stats: {e}")
 
-def get_stats_history(deck_name):
-    """Returns the last 7 days of stats for the graph."""
-    stats_path = os.path.join(DATA_DIR, 'stats.json')
-    if not os.path.exists(stats_path): return {}
+def get_stats_history(deck_name, last_n=7):
+    """
+    The deck's last `last_n` study days, oldest first:
+    {"YYYY-MM-DD": {"total": n, "correct": n, "accuracy": 0..1}}
+    """
+    path = _ensure_deck_stats(deck_name)
     try:
-        with open(stats_path, 'r') as f:
-            full_data = json.load(f)
-            return full_data.get(deck_name, {})
-    except: return {}
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            size -= size % _STAT_REC.size
+            start = max(0, size - last_n * _STAT_REC.size)
+            f.seek(start)
+            raw = f.read(size - start)
+    except OSError:
+        return {}
+    out = {}
+    for day, total, correct, credit in _STAT_REC.iter_unpack(raw):
+        out[datetime.date.fromordinal(day).isoformat()] = {
+            "total": total, "correct": correct, "accuracy": credit / 2 / total if total else 0.0
+        }
+    return out
+
+def _drop_deck_stats(deck_name):
+    path = _deck_stats_path(deck_name)
+    if os.path.exists(path): os.remove(path)
+
+def _rename_deck_stats(old_filename, new_filename):
+    path = _deck_stats_path(old_filename)
+    if os.path.exists(path): os.replace(path, _deck_stats_path(new_filename))
 
 # --- Utils ---
 def load_stats():
+    """Legacy stats.json (streak is now tracked in the rollups, see get_streak)."""
     if not os.path.exists(STATS_FILE): return {"streak": 0, "last_study_date": None}
     try:
         with open(STATS_FILE, "r") as f: return json.load(f)
     except: return {"streak": 0, "last_study_date": None}
 
-def save_stats(stats):
-    with open(STATS_FILE, "w") as f: json.dump(stats, f)
-
-def update_streak():
-    stats = load_stats()
-    today = datetime.date.today().isoformat()
-    if stats.get("last_study_date") == today: return stats["streak"]
-    if stats.get("last_study_date"):
-        delta = (datetime.date.today() - datetime.date.fromisoformat(stats["last_study_date"])).days
-        if delta == 1: stats["streak"] += 1
-        else: stats["streak"] = 1
-    else: stats["streak"] = 1
-    stats["last_study_date"] = today
-    save_stats(stats)
-    return stats["streak"]
-
 # --- MARKDOWN PARSER (FINAL ROBUST VERSION) ---
 def format_text(text):
     if not text: return ""
@@ -636,14 +1498,19 @@ def export_deck_to_json(fname, path):
         return True
     except: return False
 
+def _rename_locks(old_filename, new_display_name):
+    new_filename = deck_filename(new_display_name)
+    return (locks.deck_key(old_filename), locks.deck_key(new_filename), locks.DECK_META,
+            locks.stats_key(old_filename), locks.stats_key(new_filename), locks.HISTORY)
+
+@locks.holding(_rename_locks)
 def rename_deck(old_filename, new_display_name):
     """
     Renames a deck file and updates all references in history and meta files.
     Returns the new filename.
     """
     # 1. Generate new safe filename
-    safe = "".join([c for c in new_display_name if c.isalnum() or c in (' ', '_')]).strip()
-    new_filename = f"{safe.lower().replace(' ', '_')}.json"
+    new_filename = deck_filename(new_display_name)
     
     if new_filename == old_filename:
         return old_filename
@@ -657,6 +1524,11 @@ def rename_deck(old_filename, new_display_name):
     try:
         # 2. Rename the actual file
         os.rename(old_path, new_path)
+        if os.path.exists(_sidecar_path(old_filename)): # Same file, same stamp: still valid under the new name
+            os.replace(_sidecar_path(old_filename), _sidecar_path(new_filename))
+        _sidecars.pop(old_filename, None); _schedules.pop(old_filename, None)
+        reindex_deck_due(old_filename, [])
+        reindex_deck_due(new_filename, load_deck(new_filename))
         
         # 3. Update Category Meta (deck_meta.json)
         if os.path.exists(DECK_META_FILE):
@@ -679,12 +1551,17 @@ def rename_deck(old_filename, new_display_name):
             if changed:
                 with open(HISTORY_FILE, "w") as f:
                     json.dump(history, f, indent=2)
+        _rename_deck_archive(old_filename, new_filename)
+        _rename_deck_rollups(old_filename, new_filename)
+        _rename_deck_stats(old_filename, new_filename)
+        events.publish(events.DeckRenamed(old_filename, new_filename))
                     
         return new_filename
     except Exception as e:
         print(f"Rename failed: {e}")
         return None
 
+@locks.holding(lambda old_name, new_name: (locks.CATEGORIES, locks.DECK_META))
 def rename_category(old_name, new_name):
     """
     Renames a category in the list and updates all decks assigned to it.
@@ -712,9 +1589,9 @@ def rename_category(old_name, new_name):
             if changed:
                 with open(DECK_META_FILE, "w") as f:
                     json.dump(meta, f)
-            return True
         except:
             return False
+    events.publish(events.CategoriesChanged())
     return True
 
 def create_tutorial_deck():
@@ -811,4 +1688,9 @@ def create_tutorial_deck():
         "How do you change the **Font**?",
         "Open the **Main Menu (≡)** and select **Text Settings**.\n\nYou can adjust the font family and size for all cards to improve readability.",
         None, None, ["appearance"], "Hamburger Menu")
-    return deck_name
\ No newline at end of file
+    return deck_name
+
+# --- PROFILING (opt-in, see profiler.py) ---
+# Must stay at the bottom: wraps every public function defined above.
+if profiler.requested(load_settings()):
+    profiler.install(sys.modules[__name__], os.path.join(BASE_DIR, "profile.json"))
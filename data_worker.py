@@ -0,0 +1,218 @@
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+gi.require_version('GLib', '2.0')
+from gi.repository import GLib
+
+import data_engine as db
+import analytics
+import forecast
+import events
+import tracing
+
+# data_engine publishes change events from whichever thread did the write; hand them to the main loop
+events.set_dispatcher(GLib.idle_add)
+
+# --- DATA WORKER ---
+# Runs data_engine calls off the GTK main thread. Results (or errors) come back on the
+# main loop via GLib.idle_add, so callbacks may touch widgets freely.
+#   read(fn, ...)            -> runs on any free worker thread
+#   read(fn, ..., after=key) -> runs once every write already queued for `key` is done
+#   write(key, fn, ...)      -> queued on the lane for `key` (usually a deck filename);
+#                               writes to the same key always run in submission order
+#   read(fn, ..., exclusive=True) -> runs once every write already queued (any key) is done
+# data_engine keeps shared caches (history, rollups, due index), so writes never run
+# concurrently with each other, nor with exclusive reads of those caches; lanes only
+# add per-deck ordering on top.
+MAX_WORKERS = 2
+SHARED = "__shared__" # Lane for writes that are not about one deck (imports, backups...)
+
+class DataWorker:
+    def __init__(self, workers=MAX_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flipstack-data")
+        self._lanes = {}                  # key -> deque of pending jobs
+        self._lanes_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+
+    # --- Core ---
+    def read(self, fn, *args, callback=None, error=None, after=None, exclusive=False, **kwargs):
+        if after is not None:
+            self.write(after, fn, *args, callback=callback, error=error, **kwargs)
+        elif exclusive:
+            self._after_all_writes((fn, args, kwargs, callback, error))
+        else:
+            self._pool.submit(self._run, (fn, args, kwargs, callback, error))
+
+    def write(self, key, fn, *args, callback=None, error=None, **kwargs):
+        job = (fn, args, kwargs, callback, error)
+        with self._lanes_lock:
+            lane = self._lanes.get(key)
+            if lane is not None:
+                lane.append(job) # A drainer is already working through this lane
+                return
+            self._lanes[key] = deque([job])
+        self._pool.submit(self._drain, key)
+
+    def _drain(self, key):
+        while True:
+            with self._lanes_lock:
+                lane = self._lanes[key]
+                if not lane:
+                    del self._lanes[key]
+                    return
+                job = lane.popleft()
+            self._run_locked(job)
+
+    def _after_all_writes(self, job):
+        with self._lanes_lock: keys = list(self._lanes)
+        if not keys:
+            self._pool.submit(self._run_locked, job)
+            return
+        # Drop a marker at the end of every busy lane; the last marker to run fires the job
+        remaining = [len(keys)]
+        counter_lock = threading.Lock()
+        def marker():
+            with counter_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last: self._run(job) # Already holding the write lock (markers run on a lane)
+        for key in keys: self.write(key, marker)
+
+    def _run_locked(self, job):
+        with self._write_lock:
+            self._run(job)
+
+    def _run(self, job):
+        fn, args, kwargs, callback, error = job
+        try:
+            with tracing.span(getattr(fn, "__name__", "job"), cat="worker"):
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            if error: GLib.idle_add(_deliver, error, e)
+            return
+        if callback: GLib.idle_add(_deliver, callback, result)
+
+    def shutdown(self, wait=True):
+        """Finishes queued work (pending writes are never dropped)."""
+        self._pool.shutdown(wait=wait)
+
+    # --- Async data_engine API ---
+    def load_deck(self, filename, callback, error=None):
+        # Ordered after pending writes to the deck, so callers always see their own changes
+        self.read(db.load_deck, filename, callback=callback, error=error, after=filename)
+
+    def load_cards(self, filename, card_ids, callback, error=None):
+        """Just the given cards of a deck (data_engine.load_cards), after pending writes to the deck."""
+        self.read(db.load_cards, filename, card_ids, callback=callback, error=error, after=filename)
+
+    def save_deck(self, filename, cards, callback=None, error=None):
+        self.write(filename, db.save_deck, filename, cards, callback=callback, error=error)
+
+    def update_card_progress(self, filename, card_id, rating, session_id=None, hint_used=False, response_ms=None, callback=None, error=None):
+        self.write(filename, db.update_card_progress, filename, card_id, rating, session_id, hint_used, response_ms, callback=callback, error=error)
+
+    def add_card(self, filename, *fields, callback=None, error=None):
+        self.write(filename, db.add_card_to_deck, filename, *fields, callback=callback, error=error)
+
+    def edit_card(self, filename, card_id, *fields, callback=None, error=None):
+        self.write(filename, db.edit_card, filename, card_id, *fields, callback=callback, error=error)
+
+    def delete_card(self, filename, card_id, callback=None, error=None):
+        self.write(filename, db.delete_card, filename, card_id, callback=callback, error=error)
+
+    def apply_card_batch(self, operations, callback=None, error=None):
+        self.write(SHARED, db.apply_card_batch, operations, callback=callback, error=error)
+
+    def rename_deck(self, filename, new_name, callback=None, error=None):
+        self.write(filename, db.rename_deck, filename, new_name, callback=callback, error=error)
+
+    def delete_deck(self, filename, callback=None, error=None):
+        self.write(filename, db.delete_deck, filename, callback=callback, error=error)
+
+    def create_deck(self, name, category, callback=None, error=None):
+        self.write(db.deck_filename(name), db.create_empty_deck, name, category, callback=callback, error=error)
+
+    def create_tutorial_deck(self, callback=None, error=None):
+        self.write(SHARED, db.create_tutorial_deck, callback=callback, error=error)
+
+    def set_deck_category(self, filename, category, callback=None, error=None):
+        self.write(filename, db.set_deck_category, filename, category, callback=callback, error=error)
+
+    # Categories live in one shared file: their writes share a lane
+    def add_category(self, name, callback=None, error=None):
+        self.write(SHARED, db.add_category, name, callback=callback, error=error)
+
+    def delete_category(self, name, callback=None, error=None):
+        self.write(SHARED, db.delete_category, name, callback=callback, error=error)
+
+    def rename_category(self, old_name, new_name, callback=None, error=None):
+        self.write(SHARED, db.rename_category, old_name, new_name, callback=callback, error=error)
+
+    def search_global(self, query, callback, error=None):
+        self.read(db.search_global, query, callback=callback, error=error)
+
+    def import_deck(self, path, name, callback=None, error=None):
+        importer = db.import_anki_apkg if path.endswith(".apkg") else db.import_csv
+        self.write(SHARED, importer, path, name, callback=callback, error=error)
+
+    def export_deck(self, filename, path, callback=None, error=None):
+        exporter = db.export_deck_to_json if path.endswith(".json") else db.export_deck_to_csv
+        self.write(filename, exporter, filename, path, callback=callback, error=error)
+
+    def create_backup(self, callback=None, error=None):
+        self.write(SHARED, db.create_backup, callback=callback, error=error)
+
+    def sync_external_changes(self, decks, history, callback=None, error=None):
+        self.write(SHARED, db.sync_external_changes, decks, history, callback=callback, error=error)
+
+    def start_session(self, queue, callback, error=None):
+        """SessionQueue.start(): (first cards, cards in the deck), after the deck's pending writes."""
+        self._session_read(queue, queue.start, callback, error)
+
+    def next_session_batch(self, queue, callback, error=None):
+        self._session_read(queue, queue.next_batch, callback, error)
+
+    def _session_read(self, queue, fn, callback, error):
+        # The queue walks the due index, which writes move: one deck's lane is enough, All Due needs them all
+        if queue.is_all_due: self.read(fn, callback=callback, error=error, exclusive=True)
+        else: self.read(fn, callback=callback, error=error, after=queue.filename)
+
+    def get_activity(self, year, callback, error=None):
+        """(year, streak, {day: reviews}) from the rollups, for the dashboard."""
+        def job():
+            return year, db.get_streak(), db.get_heatmap_data(year)
+        self.read(job, callback=callback, error=error, exclusive=True)
+
+    def get_deck_performance(self, filename, callback, error=None):
+        """Everything PerformanceView charts for one deck, computed in one go."""
+        def job():
+            log = analytics.get_review_log() # Columnar log, shared and cached across all stats screens
+            return {
+                "has_history": bool(log.deck_mask(filename).any() or log.archived(filename)),
+                "sessions": analytics.group_into_sessions(log, filename),
+                "overall": analytics.overall_accuracy(log, filename),
+                "daily": db.get_stats_history(filename, last_n=7),
+                "retention": analytics.retention_by_bucket(log, filename),
+                "hourly": analytics.hourly_accuracy(log, filename),
+            }
+        self.read(job, callback=callback, error=error, exclusive=True)
+
+    def get_forecast(self, callback, error=None):
+        self.read(forecast.get_forecast, callback=callback, error=error, exclusive=True)
+
+def _deliver(fn, value):
+    with tracing.span(getattr(fn, "__qualname__", "callback"), cat="callback"):
+        fn(value)
+    return False
+
+_worker = None
+
+def get_worker():
+    """The app-wide worker (created on first use)."""
+    global _worker
+    if _worker is None: _worker = DataWorker()
+    return _worker
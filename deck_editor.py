@@ -1,8 +1,12 @@
 import gi
 import data_engine as db
+import events
+from data_worker import get_worker
+import card_dialog
 import os
 import html
 import re
+import bisect
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
@@ -16,6 +20,17 @@ class DeckEditor(Gtk.Box):
         self.highlight_card_id = highlight_card_id # <--- Store it
         # 0 = Default (Creation Date), 1 = A-Z, 2 = Z-A
         self.sort_mode = 0
+        # Multi-select state (bulk actions)
+        self.select_mode = False
+        self.selected_ids = set()
+        self.cards = [] # As listed (sorted); self.list_box rows follow the same order
+        self.sort_keys = [] # get_clean_text() of each listed card, computed once per card
+        self.rows = {}      # card id -> its row, so card events don't scan the list
+        self.card_events = {
+            events.CardAdded: self.on_card_added,
+            events.CardUpdated: self.on_card_updated,
+            events.CardDeleted: self.on_card_deleted,
+        }
         
         # --- 1. Compact Header ---
         header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -30,10 +45,10 @@ class DeckEditor(Gtk.Box):
             header_box.append(btn_back)
         
         title_text = filename.replace('.json', '').replace('_', ' ').title()
-        title = Gtk.Label(label=f"Edit: {title_text}")
-        title.add_css_class("title-2")
-        title.set_ellipsize(3) 
-        header_box.append(title)
+        self.lbl_title = Gtk.Label(label=f"Edit: {title_text}")
+        self.lbl_title.add_css_class("title-2")
+        self.lbl_title.set_ellipsize(3) 
+        header_box.append(self.lbl_title)
 
         # Spacer to push Add button to the right
         header_box.append(Gtk.Label(hexpand=True))
@@ -46,6 +61,13 @@ class DeckEditor(Gtk.Box):
         self.btn_sort.connect("clicked", self.toggle_sort)
         header_box.append(self.btn_sort)
 
+        # Multi-Select Toggle
+        self.btn_select = Gtk.ToggleButton(icon_name="selection-mode-symbolic")
+        self.btn_select.add_css_class("flat")
+        self.btn_select.set_tooltip_text("Select Cards")
+        self.select_handler = self.btn_select.connect("toggled", self.on_select_toggled)
+        header_box.append(self.btn_select)
+
         # Add "New Card" Button
         btn_add = Gtk.Button(icon_name="list-add-symbolic")
         btn_add.add_css_class("suggested-action")
@@ -70,6 +92,40 @@ class DeckEditor(Gtk.Box):
         self.list_box.add_css_class("boxed-list")
         self.list_box.set_selection_mode(Gtk.SelectionMode.NONE)
         self.clamp.set_child(self.list_box)
+
+        # --- 3. Bulk Action Bar (Only visible in select mode) ---
+        self.bulk_revealer = Gtk.Revealer()
+        self.bulk_revealer.set_transition_type(Gtk.RevealerTransitionType.SLIDE_UP)
+        action_bar = Gtk.ActionBar()
+
+        self.lbl_selected = Gtk.Label(label="0 selected")
+        self.lbl_selected.add_css_class("dim-label")
+        action_bar.pack_start(self.lbl_selected)
+
+        bulk_buttons = [
+            ("tag-symbolic", "Add Tags", self.on_bulk_tag),
+            ("folder-symbolic", "Move to Deck", self.on_bulk_move),
+            ("media-playback-pause-symbolic", "Suspend", lambda b: self.run_bulk("suspend")),
+            ("media-playback-start-symbolic", "Unsuspend", lambda b: self.run_bulk("unsuspend")),
+        ]
+        self.bulk_widgets = []
+        for icon, tip, cb in bulk_buttons:
+            btn = Gtk.Button(icon_name=icon)
+            btn.add_css_class("flat"); btn.set_tooltip_text(tip)
+            btn.connect("clicked", cb)
+            action_bar.pack_end(btn)
+            self.bulk_widgets.append(btn)
+
+        btn_bulk_del = Gtk.Button(icon_name="user-trash-symbolic")
+        btn_bulk_del.add_css_class("flat"); btn_bulk_del.add_css_class("destructive-action")
+        btn_bulk_del.set_tooltip_text("Delete Selected")
+        btn_bulk_del.connect("clicked", self.on_bulk_delete)
+        action_bar.pack_end(btn_bulk_del)
+        self.bulk_widgets.append(btn_bulk_del)
+
+        self.bulk_revealer.set_child(action_bar)
+        self.append(self.bulk_revealer)
+        self.update_selection_label()
         
         self.refresh_list()
 
@@ -101,17 +157,58 @@ class DeckEditor(Gtk.Box):
         return clean
 
     def refresh_list(self):
+        # Read on the data worker, queued behind any pending writes to this deck
+        filename = self.filename
+        get_worker().load_deck(filename, lambda cards: self.populate_list(cards) if filename == self.filename else None)
+
+    def rebind(self, filename, highlight_card_id=None):
+        """
+        Reuses this editor (see the view pool in main). For the deck it already shows the
+        rows are current (card events keep them so), so only the highlight moves.
+        """
+        if filename == self.filename:
+            if not self.cards: self.highlight_card_id = highlight_card_id # Still loading: populate_list flashes it
+            self.highlight(highlight_card_id)
+            return
+        self.filename = filename
+        self.highlight_card_id = highlight_card_id
+        self.lbl_title.set_label("Edit: " + filename.replace('.json', '').replace('_', ' ').title())
+        with self.btn_select.handler_block(self.select_handler): self.btn_select.set_active(False)
+        self.select_mode = False
+        self.selected_ids.clear()
+        self.bulk_revealer.set_reveal_child(False)
+        self.update_selection_label()
+        self.cards, self.sort_keys, self.rows = [], [], {}
+        while child := self.list_box.get_first_child(): self.list_box.remove(child)
+        self.refresh_list()
+
+    def highlight(self, card_id):
+        row = self.list_box.get_first_child()
+        while row:
+            row.remove_css_class("flash-row")
+            row = row.get_next_sibling()
+        i = self.index_of(card_id) if card_id else None
+        if i is None: return
+        target = self.list_box.get_row_at_index(i)
+        target.add_css_class("flash-row")
+        GLib.timeout_add(100, lambda: target.grab_focus() and False)
+
+    def on_data_changed(self, changes):
+        """Files changed outside the app (see file_watcher): reload if this deck was one of them."""
+        if self.filename in changes["decks"]: self.refresh_list()
+
+    def populate_list(self, cards):
         while child := self.list_box.get_first_child(): self.list_box.remove(child)
-        cards = db.load_deck(self.filename)
 
        # --- 2-STATE SORTING ---
-        if self.sort_mode == 0:   # A -> Z
-            cards.sort(key=self.get_clean_text)
-        else:                     # Z -> A
-            cards.sort(key=self.get_clean_text, reverse=True)
+        keyed = sorted(((self.get_clean_text(c), c) for c in cards), key=lambda kc: kc[0],
+                       reverse=self.sort_mode != 0) # A -> Z, or Z -> A
+        self.sort_keys = [k for k, _ in keyed]
+        self.cards = [c for _, c in keyed]
+        self.rows = {}
         # -----------------------
         
-        if not cards:
+        if not self.cards:
             status = Adw.StatusPage(icon_name="folder-open-symbolic", title="No Cards", description="Click '+' to add a card.")
             status.set_vexpand(True)
             self.list_box.append(status)
@@ -119,44 +216,10 @@ class DeckEditor(Gtk.Box):
 
         target_row = None # <--- Tracker
         
-        for card in cards:
-            f_raw = card.get("front", "???")
-            b_raw = card.get("back", "???")
-            f_txt = html.escape(f_raw)
-            b_txt = html.escape(b_raw)
-            
-            row = Adw.ActionRow(title=f_txt, subtitle=b_txt)
-            row.set_title_lines(2)
-            row.set_subtitle_lines(2)
-
-            # --- HIGHLIGHT LOGIC ---
-            if self.highlight_card_id and card.get("id") == self.highlight_card_id:
-                row.add_css_class("flash-row") # We will define this CSS in main.py
-                target_row = row
-            # -----------------------
-            
-            icon_box = Gtk.Box(spacing=5)
-            if card.get("image"): icon_box.append(Gtk.Image.new_from_icon_name("image-x-generic-symbolic"))
-            if card.get("audio"): icon_box.append(Gtk.Image.new_from_icon_name("audio-x-generic-symbolic"))
-            if card.get("suspended"): 
-                lbl = Gtk.Label(label="⚠️"); lbl.set_tooltip_text("Leech (Suspended)")
-                icon_box.append(lbl)
-            
-            if icon_box.get_first_child(): row.add_prefix(icon_box)
-
-            # Edit Button triggers the Unified Dialog
-            btn_edit = Gtk.Button(icon_name="document-edit-symbolic")
-            btn_edit.add_css_class("flat")
-            btn_edit.set_tooltip_text("Edit")
-            btn_edit.connect("clicked", lambda b, c=card: self.show_card_dialog("edit", c))
-            row.add_suffix(btn_edit)
-            
-            btn_del = Gtk.Button(icon_name="user-trash-symbolic")
-            btn_del.add_css_class("flat"); btn_del.add_css_class("destructive-action")
-            btn_del.set_tooltip_text("Delete")
-            btn_del.connect("clicked", lambda b, c=card: self.confirm_delete(c))
-            row.add_suffix(btn_del)
-            
+        for card in self.cards:
+            row = self.build_card_row(card)
+            if row.has_css_class("flash-row"): target_row = row
+            self.rows[card.get("id")] = row
             self.list_box.append(row)
         
         # --- SCROLL LOGIC ---
@@ -170,144 +233,207 @@ class DeckEditor(Gtk.Box):
             # Clear the ID so it doesn't flash again on next refresh
             self.highlight_card_id = None
 
-    def on_delete_clicked(self, card_id):
-        if card_id: db.delete_card(self.filename, card_id); self.refresh_list()
-
-    # FIX: Unified Dialog for ADD and EDIT with Media Support
-    def show_card_dialog(self, mode, card=None):
-        title = "Add Card" if mode == "add" else "Edit Card"
-        dialog = Adw.MessageDialog(heading=title, transient_for=self.get_root())
-        dialog.set_modal(True)
-        dialog.add_response("cancel", "Cancel")
-        dialog.add_response("save", "Save")
-        dialog.set_response_appearance("save", Adw.ResponseAppearance.SUGGESTED)
+    def build_card_row(self, card):
+        f_raw = card.get("front", "???")
+        b_raw = card.get("back", "???")
+        f_txt = html.escape(f_raw)
+        b_txt = html.escape(b_raw)
         
-        # Responsive Height Logic
-        win_width = self.get_root().get_width()
-        is_narrow = win_width < 500
-        box_height = 90 if is_narrow else 120
+        row = Adw.ActionRow(title=f_txt, subtitle=b_txt)
+        row.set_title_lines(2)
+        row.set_subtitle_lines(2)
 
-        # Main Layout
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        
-        # Front
-        box.append(Gtk.Label(label="Front", xalign=0, css_classes=["heading"]))
-        tf = Gtk.TextView(); tf.set_wrap_mode(3)
-        tf.set_left_margin(10); tf.set_right_margin(10); tf.set_top_margin(10); tf.set_bottom_margin(10)
-        if card: tf.get_buffer().set_text(card.get("front", ""))
-        
-        scroll_f = Gtk.ScrolledWindow(min_content_height=box_height)
-        scroll_f.set_propagate_natural_height(True); scroll_f.set_hexpand(True)
-        scroll_f.set_child(tf)
-        box.append(Gtk.Frame(child=scroll_f))
-        
-        # Back
-        box.append(Gtk.Label(label="Back", xalign=0, css_classes=["heading"]))
-        tb = Gtk.TextView(); tb.set_wrap_mode(3)
-        tb.set_left_margin(10); tb.set_right_margin(10); tb.set_top_margin(10); tb.set_bottom_margin(10)
-        if card: tb.get_buffer().set_text(card.get("back", ""))
-        
-        scroll_b = Gtk.ScrolledWindow(min_content_height=box_height)
-        scroll_b.set_propagate_natural_height(True); scroll_b.set_hexpand(True)
-        scroll_b.set_child(tb)
-        box.append(Gtk.Frame(child=scroll_b))
-        
-        # Metadata
-        box.append(Gtk.Label(label="Hint", xalign=0, css_classes=["heading"]))
-        th = Gtk.Entry()
-        if card: th.set_text(card.get("hint", ""))
-        box.append(th)
-        
-        box.append(Gtk.Label(label="Tags", xalign=0, css_classes=["heading"]))
-        ent_tags = Gtk.Entry(); ent_tags.set_placeholder_text("tag1, tag2")
-        if card: ent_tags.set_text(", ".join(card.get("tags", [])))
-        box.append(ent_tags)
-        
-        # --- MEDIA CONTROLS ---
-        self.temp_img = card.get("image") if card else None
-        self.temp_aud = card.get("audio") if card else None
+        # --- HIGHLIGHT LOGIC ---
+        if self.highlight_card_id and card.get("id") == self.highlight_card_id:
+            row.add_css_class("flash-row") # We will define this CSS in main.py
+        # -----------------------
         
-        # FIX: The create_media_row function now correctly appends items to the row!
-        def create_media_row(label_text, current_val, type_hint):
-            row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-            lbl = Gtk.Label(label=os.path.basename(current_val) if current_val else f"No {label_text}", hexpand=True, xalign=0)
-            lbl.set_ellipsize(3)
-            
-            btn_del = Gtk.Button(icon_name="user-trash-symbolic", visible=bool(current_val))
-            btn_add = Gtk.Button(icon_name="list-add-symbolic")
-            if type_hint == "image": btn_add.set_icon_name("insert-image-symbolic")
-            if type_hint == "audio": btn_add.set_icon_name("audio-volume-high-symbolic")
-            
-            # CRITICAL FIX: Append the widgets to the row!
-            row.append(lbl)
-            row.append(btn_add)
-            row.append(btn_del)
-            
-            return row, lbl, btn_add, btn_del
-
-        # Image Row
-        row_img, lbl_img, btn_img_add, btn_img_del = create_media_row("Image", self.temp_img, "image")
-        def on_img_del(b): self.temp_img = None; lbl_img.set_label("No Image"); btn_img_del.set_visible(False)
-        def on_img_pick(b): self.pick_file("image", lambda p: setattr(self, 'temp_img', p) or lbl_img.set_label(os.path.basename(p)) or btn_img_del.set_visible(True))
-        btn_img_del.connect("clicked", on_img_del); btn_img_add.connect("clicked", on_img_pick)
-        box.append(row_img)
-
-        # Audio Row
-        row_aud, lbl_aud, btn_aud_add, btn_aud_del = create_media_row("Audio", self.temp_aud, "audio")
-        def on_aud_del(b): self.temp_aud = None; lbl_aud.set_label("No Audio"); btn_aud_del.set_visible(False)
-        def on_aud_pick(b): self.pick_file("audio", lambda p: setattr(self, 'temp_aud', p) or lbl_aud.set_label(os.path.basename(p)) or btn_aud_del.set_visible(True))
-        btn_aud_del.connect("clicked", on_aud_del); btn_aud_add.connect("clicked", on_aud_pick)
-        box.append(row_aud)
+        icon_box = Gtk.Box(spacing=5)
+        if card.get("image"): icon_box.append(Gtk.Image.new_from_icon_name("image-x-generic-symbolic"))
+        if card.get("audio"): icon_box.append(Gtk.Image.new_from_icon_name("audio-x-generic-symbolic"))
+        if card.get("suspended"): 
+            lbl = Gtk.Label(label="⚠️"); lbl.set_tooltip_text("Leech (Suspended)")
+            icon_box.append(lbl)
         
-        # Unsuspend (Only for Edit Mode)
-        self.unsuspend_flag = False
-        if mode == "edit" and card.get("suspended"):
-            btn_unsus = Gtk.Button(label="Unsuspend Leech"); box.append(Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)); box.append(btn_unsus)
-            def unsus(b): self.unsuspend_flag = True; b.set_sensitive(False)
-            btn_unsus.connect("clicked", unsus)
-
-        # Layout Inversion (Scroll -> Clamp -> Content)
-        scroll_main = Gtk.ScrolledWindow()
-        scroll_main.set_propagate_natural_height(True)
-        scroll_main.set_max_content_height(500)
-
-        clamp = Adw.Clamp(maximum_size=600)
-        clamp.set_margin_start(12); clamp.set_margin_end(12); clamp.set_margin_bottom(12)
-        clamp.set_child(box)
+        if icon_box.get_first_child(): row.add_prefix(icon_box)
+
+        # --- SELECT MODE: Checkbox instead of per-row buttons ---
+        if self.select_mode:
+            chk = Gtk.CheckButton(active=card.get("id") in self.selected_ids)
+            chk.set_valign(Gtk.Align.CENTER)
+            chk.connect("toggled", self.on_card_check_toggled, card.get("id"))
+            row.add_prefix(chk)
+            row.set_activatable_widget(chk)
+            return row
+
+        # Edit Button triggers the Unified Dialog
+        btn_edit = Gtk.Button(icon_name="document-edit-symbolic")
+        btn_edit.add_css_class("flat")
+        btn_edit.set_tooltip_text("Edit")
+        btn_edit.connect("clicked", lambda b, c=card: self.show_card_dialog("edit", c))
+        row.add_suffix(btn_edit)
         
-        scroll_main.set_child(clamp)
-        dialog.set_extra_child(scroll_main)
+        btn_del = Gtk.Button(icon_name="user-trash-symbolic")
+        btn_del.add_css_class("flat"); btn_del.add_css_class("destructive-action")
+        btn_del.set_tooltip_text("Delete")
+        btn_del.connect("clicked", lambda b, c=card: self.confirm_delete(c))
+        row.add_suffix(btn_del)
+        return row
+
+    # --- DATA EVENTS (patch single rows instead of reloading the deck) ---
+    def do_root(self):
+        Gtk.Box.do_root(self)
+        events.subscribe_all(self.card_events)
+
+    def do_unroot(self):
+        events.unsubscribe_all(self.card_events)
+        Gtk.Box.do_unroot(self)
+
+    def index_of(self, card_id):
+        row = self.rows.get(card_id)
+        return row.get_index() if row is not None else None
+
+    def sort_position(self, key):
+        """Where a card with this sort key goes in the listed order (after equal keys)."""
+        if self.sort_mode == 0: return bisect.bisect_right(self.sort_keys, key)
+        lo, hi = 0, len(self.sort_keys) # Z -> A: keys descend
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.sort_keys[mid] >= key: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def insert_card_row(self, card):
+        if not self.cards: # Drop the "No Cards" placeholder
+            while child := self.list_box.get_first_child(): self.list_box.remove(child)
+        key = self.get_clean_text(card)
+        i = self.sort_position(key)
+        self.cards.insert(i, card)
+        self.sort_keys.insert(i, key)
+        row = self.rows[card["id"]] = self.build_card_row(card)
+        self.list_box.insert(row, i)
+
+    def remove_card_row(self, i):
+        card = self.cards.pop(i)
+        del self.sort_keys[i]
+        self.list_box.remove(self.rows.pop(card.get("id")))
+        if not self.cards: self.populate_list([]) # Back to the "No Cards" placeholder
+
+    def on_card_added(self, e):
+        if e.deck == self.filename and self.index_of(e.card["id"]) is None: self.insert_card_row(e.card)
+
+    def on_card_updated(self, e):
+        if e.deck != self.filename: return
+        i = self.index_of(e.card["id"])
+        if i is None: return
+        del self.cards[i], self.sort_keys[i]
+        self.list_box.remove(self.rows.pop(e.card["id"]))
+        self.insert_card_row(e.card) # The front may have changed, and with it the sort position
+
+    def on_card_deleted(self, e):
+        if e.deck != self.filename: return
+        self.selected_ids.discard(e.card_id)
+        i = self.index_of(e.card_id)
+        if i is not None: self.remove_card_row(i)
+
+    # --- MULTI-SELECT & BULK ACTIONS ---
+    def on_select_toggled(self, btn):
+        self.select_mode = btn.get_active()
+        self.selected_ids.clear()
+        self.bulk_revealer.set_reveal_child(self.select_mode)
+        self.update_selection_label()
+        self.refresh_list()
+
+    def on_card_check_toggled(self, chk, card_id):
+        if chk.get_active(): self.selected_ids.add(card_id)
+        else: self.selected_ids.discard(card_id)
+        self.update_selection_label()
+
+    def update_selection_label(self):
+        count = len(self.selected_ids)
+        self.lbl_selected.set_label(f"{count} selected")
+        for w in self.bulk_widgets: w.set_sensitive(count > 0)
+
+    def run_bulk(self, op, **extra):
+        """Builds one batch for all selected cards so the deck is written once."""
+        if not self.selected_ids: return
+        ops = [{"op": op, "deck": self.filename, "id": cid, **extra} for cid in self.selected_ids]
+        self.selected_ids.clear()
+        self.update_selection_label()
+        get_worker().apply_card_batch(ops, callback=self.on_bulk_done)
+
+    def on_bulk_done(self, ok):
+        # On success the card events have already patched the rows
+        if not ok:
+            toast = Adw.Toast.new("Bulk action failed")
+            root = self.get_root()
+            if root and hasattr(root, "toast_overlay"): root.toast_overlay.add_toast(toast)
+            self.refresh_list() # Reset the checkboxes of the rejected selection
+
+    def on_bulk_tag(self, btn):
+        dialog = Adw.MessageDialog(heading="Add Tags", transient_for=self.get_root())
+        dialog.add_response("cancel", "Cancel")
+        dialog.add_response("apply", "Apply")
+        dialog.set_response_appearance("apply", Adw.ResponseAppearance.SUGGESTED)
+        entry = Gtk.Entry(placeholder_text="tag1, tag2")
+        entry.connect("activate", lambda w: dialog.response("apply"))
+        dialog.set_extra_child(entry)
 
         def on_response(d, r):
-            if r == "save":
-                buf_f = tf.get_buffer(); buf_b = tb.get_buffer()
-                s, e = buf_f.get_bounds(); new_f = buf_f.get_text(s, e, True).strip()
-                s, e = buf_b.get_bounds(); new_b = buf_b.get_text(s, e, True).strip()
-                tags = [t.strip() for t in ent_tags.get_text().split(",") if t.strip()]
-                hint_val = th.get_text().strip()
-                
-                if new_f and new_b:
-                    if mode == "add":
-                        db.add_card_to_deck(self.filename, new_f, new_b, self.temp_img, self.temp_aud, tags, hint_val)
-                    else:
-                        is_suspended = not self.unsuspend_flag and card.get("suspended", False)
-                        db.edit_card(self.filename, card["id"], new_f, new_b, self.temp_img, self.temp_aud, tags, is_suspended, hint_val)
-                    self.refresh_list()
-        
-        dialog.connect("response", on_response); dialog.present()
-
-    def pick_file(self, type_hint, callback):
-        if hasattr(Gtk, "FileDialog"):
-            d = Gtk.FileDialog(); f = Gtk.FileFilter()
-            if type_hint == "image": f.set_name("Images"); f.add_pixbuf_formats()
-            elif type_hint == "audio": f.set_name("Audio"); f.add_mime_type("audio/*")
-            filters = Gio.ListStore.new(Gtk.FileFilter); filters.append(f); d.set_filters(filters); d.set_default_filter(f)
-            def on_o(f, r):
-                try: 
-                    res = f.open_finish(r)
-                    if res: callback(res.get_path())
-                except: pass
-            d.open(self.get_root(), None, on_o)
+            if r == "apply":
+                tags = [t.strip() for t in entry.get_text().split(",") if t.strip()]
+                if tags: self.run_bulk("tag", tags=tags)
+            d.close()
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def on_bulk_move(self, btn):
+        targets = sorted(f for f in db.get_all_decks() if f != self.filename)
+        if not targets: return
+        dialog = Adw.MessageDialog(heading="Move Cards", transient_for=self.get_root())
+        dialog.add_response("cancel", "Cancel")
+        dialog.add_response("move", "Move")
+        dialog.set_response_appearance("move", Adw.ResponseAppearance.SUGGESTED)
+
+        names = [f.replace(".json", "").replace("_", " ").title() for f in targets]
+        dropdown = Gtk.DropDown(model=Gtk.StringList.new(names))
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        box.append(Gtk.Label(label="Select destination deck:", xalign=0))
+        box.append(dropdown)
+        dialog.set_extra_child(box)
+
+        def on_response(d, r):
+            if r == "move":
+                self.run_bulk("move", to=targets[dropdown.get_selected()])
+            d.close()
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def on_bulk_delete(self, btn):
+        count = len(self.selected_ids)
+        if not count: return
+        dialog = Adw.MessageDialog(
+            heading="Delete Cards?",
+            body=f"Are you sure you want to delete {count} cards? This cannot be undone.",
+            transient_for=self.get_root()
+        )
+        dialog.add_response("cancel", "Cancel")
+        dialog.add_response("delete", "Delete")
+        dialog.set_response_appearance("delete", Adw.ResponseAppearance.DESTRUCTIVE)
+        dialog.set_default_response("cancel")
+        dialog.set_close_response("cancel")
+
+        def on_response(d, r):
+            if r == "delete": self.run_bulk("delete")
+            d.close()
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def on_delete_clicked(self, card_id):
+        if card_id: get_worker().delete_card(self.filename, card_id)
+
+    def show_card_dialog(self, mode, card=None):
+        card_dialog.show_card_dialog(self.get_root(), self.filename, mode, card)
 
     def confirm_delete(self, card):
         # 1. Create the Dialog
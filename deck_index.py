@@ -0,0 +1,160 @@
+import os
+import mmap
+import struct
+import hashlib
+import datetime
+import numpy as np
+
+# --- DECK INDEX SIDECARS ---
+# One small binary file per deck (deck_index/<deck>.idx) with a fixed-width record per
+# card, in the same order as the deck file:
+#   id_hash      64-bit hash of the card id
+#   span         where the card's JSON sits in the deck file (start << 32 | length; 0 = unknown)
+#   next_day     next review as days since 1970-01-01 (-1 = new card)
+#   bucket, miss_streak, flags (SUSPENDED)
+# Files are read through mmap and viewed with np.frombuffer, so due counts, mastery and
+# session planning are NumPy scans over a few bytes per card with no JSON and no copy.
+# The header carries the (mtime, size) of the deck file the records describe; a sidecar
+# whose stamp doesn't match its deck is stale and gets rebuilt by data_engine.
+MAGIC = b"FSDX"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIqq4x")   # magic, version, count, deck mtime_ns, deck size (32 bytes)
+RECORD = np.dtype([("id_hash", "<u8"), ("span", "<u8"), ("next_day", "<i4"),
+                   ("bucket", "<i2"), ("miss_streak", "u1"), ("flags", "u1")]) # 24 bytes
+SUSPENDED = 1
+_EPOCH = datetime.date(1970, 1, 1)
+
+def id_hash(card_id):
+    return int.from_bytes(hashlib.blake2b(str(card_id).encode(), digest_size=8).digest(), "little")
+
+def day_number(iso):
+    if not iso: return -1
+    try: return (datetime.date.fromisoformat(iso[:10]) - _EPOCH).days
+    except ValueError: return -1
+
+def today_number(today=None):
+    return ((today or datetime.date.today()) - _EPOCH).days
+
+def fill(records, row, card):
+    """Writes one card's fields (all but its span) into row `row` of a RECORD array."""
+    records["id_hash"][row] = id_hash(card.get("id"))
+    records["next_day"][row] = day_number(card.get("next_review"))
+    records["bucket"][row] = min(card.get("bucket", 0) or 0, 32767)
+    records["miss_streak"][row] = min(card.get("miss_streak", 0) or 0, 255)
+    records["flags"][row] = SUSPENDED if card.get("suspended") else 0
+
+def build(cards, spans=None):
+    """RECORD array for a list of cards; spans: packed spans aligned with the cards (or None)."""
+    n = len(cards)
+    records = np.zeros(n, dtype=RECORD)
+    records["id_hash"] = np.fromiter((id_hash(c.get("id")) for c in cards), dtype=np.uint64, count=n)
+    if spans is not None: records["span"] = np.asarray(spans, dtype=np.uint64)
+    records["next_day"] = np.fromiter((day_number(c.get("next_review")) for c in cards), dtype=np.int32, count=n)
+    records["bucket"] = np.fromiter((min(c.get("bucket", 0) or 0, 32767) for c in cards), dtype=np.int16, count=n)
+    records["miss_streak"] = np.fromiter((min(c.get("miss_streak", 0) or 0, 255) for c in cards), dtype=np.uint8, count=n)
+    records["flags"] = np.fromiter((SUSPENDED if c.get("suspended") else 0 for c in cards), dtype=np.uint8, count=n)
+    return records
+
+def write(path, records, deck_stamp):
+    """Writes a whole sidecar (write-then-rename, like the decks themselves)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), *deck_stamp))
+        f.write(records.tobytes())
+    os.replace(tmp, path)
+
+class Sidecar:
+    """A read-only mapped sidecar. `records` is a zero-copy view; it follows in-place patches."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size: raise ValueError("truncated sidecar")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, _, _ = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or size != HEADER.size + count * RECORD.itemsize:
+            raise ValueError("not a deck index sidecar")
+        self.records = np.frombuffer(self._map, dtype=RECORD, count=count, offset=HEADER.size)
+        self._sorted = None
+
+    @property
+    def deck_stamp(self):
+        return HEADER.unpack_from(self._map)[3:5] # Read live: patches move it
+
+    def __len__(self):
+        return len(self.records)
+
+    def rows_of(self, hashes):
+        """Row of each id hash (-1 where absent)."""
+        if self._sorted is None: # Ids never move within one sidecar file, so this holds until it's replaced
+            order = np.argsort(self.records["id_hash"], kind="stable")
+            self._sorted = (order, self.records["id_hash"][order])
+        order, keys = self._sorted
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(keys): return np.full(len(hashes), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(keys, hashes), len(keys) - 1)
+        return np.where(keys[pos] == hashes, order[pos], -1)
+
+def open_sidecar(path):
+    """The mapped sidecar at `path`, or None if it's missing or unreadable."""
+    try:
+        return Sidecar(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def patch(path, changes, spans, deck_stamp, expected_stamp):
+    """
+    Updates a sidecar in place: `changes` maps row -> card, `spans` (aligned with all
+    rows, or None) replaces the span column, and the header moves from `expected_stamp`
+    to `deck_stamp`. Returns False (nothing written) if the file isn't the sidecar of
+    the deck as it was (other stamp, other card count).
+    """
+    try:
+        with open(path, "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size: return False
+            mm = mmap.mmap(f.fileno(), 0)
+    except OSError:
+        return False
+    try:
+        magic, version, count, mtime, fsize = HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION or size != HEADER.size + count * RECORD.itemsize: return False
+        if (mtime, fsize) != tuple(expected_stamp or ()): return False
+        if spans is not None and len(spans) != count: return False
+        records = np.frombuffer(mm, dtype=RECORD, count=count, offset=HEADER.size)
+        if any(not 0 <= row < count for row in changes): return False
+        for row, card in changes.items(): fill(records, row, card)
+        if spans is not None: records["span"] = np.asarray(spans, dtype=np.uint64)
+        del records # The map can't close while a view is exported
+        HEADER.pack_into(mm, 0, MAGIC, VERSION, count, *deck_stamp)
+        mm.flush()
+        return True
+    finally:
+        mm.close()
+
+# --- Queries (vectorized over the records) ---
+def active(records):
+    return (records["flags"] & SUSPENDED) == 0
+
+def mastery(records):
+    if not len(records): return 0.0
+    return int(np.count_nonzero(active(records) & (records["bucket"] > 0))) / len(records)
+
+def due_counts(records, today=None):
+    """(new, review) counts: active cards never reviewed, and active cards due on/before today."""
+    live, day = active(records), records["next_day"]
+    new = int(np.count_nonzero(live & (day < 0)))
+    return new, int(np.count_nonzero(live & (day >= 0) & (day <= today_number(today))))
+
+def session_order(records, today=None, new_limit=None, review_limit=None):
+    """
+    Id hashes of a study session, in the order served: new cards (file order) first,
+    then due reviews, most overdue first. new_limit caps the new cards, review_limit
+    caps the whole session (new cards count as reviews too); None = no cap.
+    """
+    live, day = active(records), records["next_day"]
+    new = records["id_hash"][live & (day < 0)]
+    if new_limit is not None: new = new[:new_limit]
+    due = np.nonzero(live & (day >= 0) & (day <= today_number(today)))[0]
+    due = due[np.argsort(day[due], kind="stable")]
+    order = np.concatenate([new, records["id_hash"][due]])
+    return order[:review_limit] if review_limit is not None else order
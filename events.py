@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+# --- DATA EVENTS ---
+# data_engine publishes one of these after every successful change, so views can patch
+# just the rows, badges and counters involved instead of reloading everything.
+#
+#   events.subscribe(events.CardUpdated, self.on_card_updated)
+#
+# Writes mostly happen on the data worker; handlers always run on the main loop
+# (data_worker installs a GLib.idle_add dispatcher). Subscribe/unsubscribe from the
+# main loop only. Card dicts in events are copies: read them, don't keep editing them.
+
+@dataclass(frozen=True)
+class CardAdded:
+    deck: str
+    card: dict
+
+@dataclass(frozen=True)
+class CardUpdated:
+    deck: str
+    card: dict
+
+@dataclass(frozen=True)
+class CardDeleted:
+    deck: str
+    card_id: str
+
+@dataclass(frozen=True)
+class ProgressLogged:
+    deck: str
+    card: dict   # After scheduling (bucket, next_review...)
+    rating: int
+    leech: bool
+
+@dataclass(frozen=True)
+class DeckCreated:
+    deck: str
+    category: str
+
+@dataclass(frozen=True)
+class DeckRenamed:
+    old: str
+    new: str
+
+@dataclass(frozen=True)
+class DeckMoved:
+    deck: str
+    category: str
+
+@dataclass(frozen=True)
+class DeckDeleted:
+    deck: str
+
+@dataclass(frozen=True)
+class CategoriesChanged:
+    pass
+
+_subscribers = {} # event class -> [handler, ...]
+_dispatch = None  # schedule(fn, event) onto the UI thread; None = call right away
+
+def set_dispatcher(schedule):
+    global _dispatch
+    _dispatch = schedule
+
+def subscribe(event_type, handler):
+    _subscribers.setdefault(event_type, []).append(handler)
+
+def unsubscribe(event_type, handler):
+    handlers = _subscribers.get(event_type, [])
+    if handler in handlers: handlers.remove(handler)
+
+def subscribe_all(handlers):
+    """{event class: handler} -> subscribes each (pair with unsubscribe_all)."""
+    for event_type, handler in handlers.items(): subscribe(event_type, handler)
+
+def unsubscribe_all(handlers):
+    for event_type, handler in handlers.items(): unsubscribe(event_type, handler)
+
+def publish(event):
+    if _dispatch is None: _deliver(event)
+    else: _dispatch(_deliver, event)
+
+def _deliver(event):
+    for handler in list(_subscribers.get(type(event), ())):
+        try:
+            handler(event)
+        except Exception as e:
+            print(f"Event handler failed for {type(event).__name__}: {e}")
+    return False
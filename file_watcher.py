@@ -0,0 +1,102 @@
+import os
+
+import gi
+gi.require_version('Gio', '2.0')
+gi.require_version('GLib', '2.0')
+from gi.repository import Gio, GLib
+
+import data_engine as db
+from data_worker import get_worker
+
+# --- FILE WATCHER ---
+# Notices decks, assets and metadata changed outside the app (a sync, a restore, a script)
+# and tells the window which parts are affected, so it can update just those.
+# Events are coalesced: a burst (e.g. a sync rewriting 30 decks) becomes one callback.
+# Our own writes also fire events; data_engine.sync_external_changes recognises and drops them.
+DEBOUNCE_MS = 400
+
+# Metadata files in BASE_DIR, by what they affect
+META_FILES = {
+    os.path.basename(db.HISTORY_FILE): "history",
+    os.path.basename(db.ARCHIVE_FILE): "history",
+    os.path.basename(db.CATEGORIES_FILE): "library",
+    os.path.basename(db.DECK_META_FILE): "library",
+}
+
+WATCHED_EVENTS = (
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.MOVED_OUT,
+    Gio.FileMonitorEvent.RENAMED,
+)
+
+class FileWatcher:
+    """
+    Calls on_change(changes) on the main loop, where changes is a dict:
+      decks:   set of deck filenames changed (or added/removed) by someone else
+      history: the review log changed
+      library: categories / deck assignments changed
+      assets:  set of asset filenames changed
+    """
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self.monitors = []
+        self.pending = {"decks": set(), "history": False, "library": False, "assets": set()}
+        self.flush_source = None
+        for path in (db.DATA_DIR, db.ASSETS_DIR, db.BASE_DIR):
+            try:
+                monitor = Gio.File.new_for_path(path).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+            except GLib.Error as e:
+                print(f"Can't watch {path}: {e.message}")
+                continue
+            monitor.connect("changed", self.on_event)
+            self.monitors.append(monitor)
+
+    def on_event(self, monitor, file, other_file, event_type):
+        if event_type not in WATCHED_EVENTS: return
+        hit = False
+        for f in (file, other_file): # A rename touches both names (e.g. a tmp file replacing a deck)
+            path = f.get_path() if f else None
+            if path: hit = self.classify(path) or hit
+        if hit and self.flush_source is None:
+            self.flush_source = GLib.timeout_add(DEBOUNCE_MS, self.flush)
+
+    def classify(self, path):
+        folder, name = os.path.split(path)
+        if name.startswith("."): return False # Temp files, lock files
+        if folder == db.DATA_DIR:
+            if not name.endswith(".json"): return False
+            self.pending["decks"].add(name)
+        elif folder == db.ASSETS_DIR:
+            self.pending["assets"].add(name)
+        elif folder == db.BASE_DIR and name in META_FILES:
+            self.pending[META_FILES[name]] = True
+        else:
+            return False
+        return True
+
+    def flush(self):
+        self.flush_source = None
+        changes = self.pending
+        self.pending = {"decks": set(), "history": False, "library": False, "assets": set()}
+        if not (changes["decks"] or changes["history"]):
+            self.deliver(changes, (set(), False))
+            return False
+        # Cache invalidation runs on the data worker, serialized with our own writes
+        get_worker().sync_external_changes(changes["decks"], changes["history"],
+                                           callback=lambda result: self.deliver(changes, result))
+        return False
+
+    def deliver(self, changes, result):
+        decks, history = result
+        changes = {**changes, "decks": decks, "history": history}
+        if any(changes.values()): self.on_change(changes)
+
+    def stop(self):
+        for monitor in self.monitors: monitor.cancel()
+        self.monitors = []
+        if self.flush_source is not None:
+            GLib.source_remove(self.flush_source)
+            self.flush_source = None
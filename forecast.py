@@ -0,0 +1,52 @@
+import datetime
+import numpy as np
+import data_engine as db
+import scheduler
+
+# --- WORKLOAD FORECAST ---
+# Projects how many reviews will be due on each of the next N days.
+# Every card contributes its next due date, plus the follow-up reviews the
+# scheduler would give it if each review goes well. All of it runs on NumPy
+# arrays over the whole collection (one pass per "generation" of follow-ups).
+
+HORIZONS = (30, 90, 365)
+
+def project_reviews(arrays, sched, today, horizon):
+    """
+    Returns an int array of length `horizon`: reviews due on today+0 ... today+horizon-1.
+    Unscheduled (new) and overdue cards count as due today.
+    """
+    counts = np.zeros(horizon, dtype=np.int64)
+    if arrays["bucket"].size == 0: return counts
+
+    due = np.maximum(arrays["next_day"], today)
+    state = {k: arrays[k] for k in ("bucket", "ease", "stability")}
+    alive = due < today + horizon
+
+    while alive.any():
+        due = due[alive]
+        state = {k: v[alive] for k, v in state.items()}
+        counts += np.bincount(due - today, minlength=horizon)[:horizon]
+
+        interval, state = sched.project_good(state)
+        # A zero interval would loop forever on the same day; clamp to one day
+        due = due + np.maximum(interval, 1)
+        alive = due < today + horizon
+    return counts
+
+def get_forecast(horizon=max(HORIZONS)):
+    """
+    Returns {"daily": {"YYYY-MM-DD": count}, "totals": {30: n, 90: n, 365: n}}
+    for the active scheduler.
+    """
+    arrays = db.get_schedule_arrays()
+    sched = scheduler.get_scheduler(db.load_settings())
+    today = int(np.datetime64(datetime.date.today(), "D").astype(np.int64))
+    counts = project_reviews(arrays, sched, today, horizon)
+
+    days = np.arange(today, today + horizon).astype("datetime64[D]").astype(str)
+    nonzero = np.nonzero(counts)[0]
+    daily = dict(zip(days[nonzero].tolist(), counts[nonzero].tolist()))
+    cumulative = np.cumsum(counts)
+    totals = {h: int(cumulative[min(h, horizon) - 1]) for h in HORIZONS}
+    return {"daily": daily, "totals": totals}
@@ -0,0 +1,134 @@
+import os
+import time
+import fcntl
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+# --- FILE LOCKS ---
+# Advisory, per-file locks that coordinate writers across threads AND processes
+# (a second FlipStack instance, a sync tool...). Each key gets a sidecar lock file in
+# LOCK_DIR -- data files themselves are swapped with os.replace, so they can't carry it.
+#
+#   with locked(deck_key("spanish.json"), HISTORY): ...
+#
+# Uncontended, taking a lock is one non-blocking flock() on an already-open fd.
+# Waits are bounded (LockTimeout) and every key keeps contention counters.
+#
+# Lock order (to stay deadlock-free when nesting): decks, then deck_meta/categories,
+# then stats, then history. locked() sorts the keys it is given; nested `with` blocks
+# must follow the same order.
+DEFAULT_TIMEOUT = 10.0
+HISTORY = "history"
+DECK_META = "deck_meta"
+CATEGORIES = "categories"
+
+_RANK = {"deck": 0, DECK_META: 1, CATEGORIES: 1, "stats": 2, HISTORY: 3}
+
+_lock_dir = None
+_registry = {}
+_registry_lock = threading.Lock()
+
+class LockTimeout(TimeoutError):
+    pass
+
+def init(lock_dir):
+    global _lock_dir
+    os.makedirs(lock_dir, exist_ok=True)
+    _lock_dir = lock_dir
+
+def deck_key(filename):
+    return f"deck:{filename}"
+
+def stats_key(filename):
+    return f"stats:{filename}"
+
+def _order(key):
+    return (_RANK.get(key.split(":", 1)[0], 9), key)
+
+class _FileLock:
+    def __init__(self, key):
+        safe = "".join(c if c.isalnum() or c in "._-" else "_" for c in key)
+        self.path = os.path.join(_lock_dir, safe + ".lock")
+        self.fd = None
+        self.mutex = threading.RLock() # flock is per process: threads queue up here first
+        self.depth = 0                 # re-entry by the owning thread
+        self.stats = {"acquired": 0, "contended": 0, "wait_ms": 0.0, "timeouts": 0}
+
+    def acquire(self, timeout):
+        start = time.monotonic()
+        if not self.mutex.acquire(blocking=False):
+            self.stats["contended"] += 1
+            if not self.mutex.acquire(timeout=timeout):
+                self.stats["timeouts"] += 1
+                raise LockTimeout(f"Timed out waiting for {self.path}")
+            contended = True
+        else:
+            contended = False
+
+        self.depth += 1
+        if self.depth > 1: return
+        try:
+            if self.fd is None: self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._flock(start, timeout, contended)
+        except:
+            self.depth -= 1
+            self.mutex.release()
+            raise
+        self.stats["acquired"] += 1
+
+    def _flock(self, start, timeout, contended):
+        delay = 0.001
+        while True:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if not contended:
+                    self.stats["contended"] += 1
+                    contended = True
+                if time.monotonic() - start >= timeout:
+                    self.stats["timeouts"] += 1
+                    raise LockTimeout(f"Timed out waiting for {self.path} (held by another process)")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+        if contended: self.stats["wait_ms"] += (time.monotonic() - start) * 1000
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0: fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.mutex.release()
+
+def _get(key):
+    lock = _registry.get(key)
+    if lock is None:
+        with _registry_lock:
+            lock = _registry.setdefault(key, _FileLock(key))
+    return lock
+
+@contextmanager
+def locked(*keys, timeout=DEFAULT_TIMEOUT):
+    """Holds the locks for `keys` (taken in canonical order, released in reverse)."""
+    held = []
+    try:
+        for key in sorted(set(keys), key=_order):
+            lock = _get(key)
+            lock.acquire(timeout)
+            held.append(lock)
+        yield
+    finally:
+        for lock in reversed(held): lock.release()
+
+def holding(keys_of):
+    """Decorator: `keys_of(*args, **kwargs)` -> the keys to hold while the function runs."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with locked(*keys_of(*args, **kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def get_lock_stats():
+    """{key: {"acquired", "contended", "wait_ms", "timeouts"}} for every lock used so far."""
+    return {key: dict(lock.stats) for key, lock in _registry.items()}
@@ -0,0 +1,88 @@
+import numpy as np
+import data_engine as db
+import analytics
+
+# --- SCHEDULER PARAMETER OPTIMIZER ---
+# Fits the Leitner interval rule  interval(b) = base * growth**b  to the user's own
+# review history. Each card is assumed to be remembered with probability
+#     p = 0.9 ** (elapsed_days / interval(bucket))
+# i.e. an interval is "right" when ~90% of cards are still recalled at its end.
+# We minimize the log-loss of p against what actually happened (Good/Hard = recalled)
+# with plain gradient descent in log-parameter space, fully vectorized over all reviews.
+
+TARGET_RECALL = 0.9
+MIN_REVIEWS = 100
+GROWTH_BOUNDS = (1.2, 4.0)
+BASE_BOUNDS = (0.5, 5.0)
+
+def training_data(log):
+    """
+    Turns the review log into (elapsed_days, bucket, recalled) arrays.
+    Only reviews with a known card, a known bucket and an earlier review of the same card count.
+    """
+    usable = log.card >= 0
+    card, ts = log.card[usable], log.ts[usable]
+    bucket, rating = log.bucket[usable], log.rating[usable]
+
+    order = np.lexsort((ts, card)) # Group by card, oldest review first
+    card, ts, bucket, rating = card[order], ts[order], bucket[order], rating[order]
+
+    same_card = np.zeros(len(card), dtype=bool)
+    same_card[1:] = card[1:] == card[:-1]
+    elapsed = np.zeros(len(ts), dtype=np.float64)
+    elapsed[1:] = (ts[1:] - ts[:-1]) / 86400.0
+
+    keep = same_card & (bucket >= 0) & (elapsed > 0)
+    return elapsed[keep], bucket[keep].astype(np.float64), (rating[keep] >= 2).astype(np.float64)
+
+def log_loss(params, elapsed, bucket, recalled):
+    base, growth = params
+    p = np.clip(TARGET_RECALL ** (elapsed / (base * growth ** bucket)), 1e-6, 1 - 1e-6)
+    return float(-np.mean(recalled * np.log(p) + (1 - recalled) * np.log(1 - p)))
+
+def fit(elapsed, bucket, recalled, steps=300, lr=0.05):
+    """Returns (base, growth) minimizing log-loss, clamped to sane bounds."""
+    k = -np.log(TARGET_RECALL)
+    theta = np.log([1.0, 2.0]) # log(base), log(growth): start from the classic 2**bucket rule
+    lo = np.log([BASE_BOUNDS[0], GROWTH_BOUNDS[0]])
+    hi = np.log([BASE_BOUNDS[1], GROWTH_BOUNDS[1]])
+    m = np.zeros(2); v = np.zeros(2)
+
+    for t in range(1, steps + 1):
+        log_s = theta[0] + bucket * theta[1]
+        u = k * elapsed * np.exp(-log_s)            # p = exp(-u)
+        p = np.clip(np.exp(-u), 1e-6, 1 - 1e-6)
+        # dLoss/dlogS = -u * (y - (1-y) * p / (1-p))
+        d_log_s = -u * (recalled - (1 - recalled) * p / (1 - p))
+        grad = np.array([d_log_s.mean(), (d_log_s * bucket).mean()])
+
+        # Adam step, then project back into bounds
+        m = 0.9 * m + 0.1 * grad
+        v = 0.999 * v + 0.001 * grad ** 2
+        theta -= lr * (m / (1 - 0.9 ** t)) / (np.sqrt(v / (1 - 0.999 ** t)) + 1e-8)
+        theta = np.clip(theta, lo, hi)
+
+    base, growth = np.exp(theta)
+    return float(base), float(growth)
+
+def optimize_scheduler(save=True):
+    """
+    Fits the interval parameters to the review log and (optionally) stores them in
+    settings["scheduler_params"], where the Leitner scheduler picks them up.
+    Returns the stored params dict, or None if there isn't enough history yet.
+    """
+    elapsed, bucket, recalled = training_data(analytics.get_review_log())
+    if len(elapsed) < MIN_REVIEWS: return None
+
+    base, growth = fit(elapsed, bucket, recalled)
+    params = {
+        "base": round(base, 3),
+        "growth": round(growth, 3),
+        "reviews": int(len(elapsed)),
+        "log_loss": round(log_loss((base, growth), elapsed, bucket, recalled), 4),
+    }
+    if save:
+        settings = db.load_settings()
+        settings["scheduler_params"] = params
+        db.save_settings(settings)
+    return params
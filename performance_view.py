@@ -1,10 +1,110 @@
 import gi
-import data_engine as db
+from data_worker import get_worker
 from datetime import datetime, timedelta
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Gdk
+gi.require_version('PangoCairo', '1.0')
+from gi.repository import Gtk, Adw, Gdk, Gio, GObject, PangoCairo
+
+# --- STYLES ---
+# Registered once per display (a provider per view would pile up on every open)
+_styled_displays = set()
+
+def ensure_css(display):
+    if display is None or display in _styled_displays: return
+    css_provider = Gtk.CssProvider()
+    css_provider.load_from_string("""
+        .bar-green block.filled { background-color: #2ec27e; }
+        .bar-yellow block.filled { background-color: #f5c211; }
+        .bar-red block.filled { background-color: #ed333b; }
+        .session-list, .session-list > row { background: none; }
+        .session-list > row { padding: 0; }
+    """)
+    Gtk.StyleContext.add_provider_for_display(display, css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+    _styled_displays.add(display)
+
+# --- SESSION LIST ---
+# The session log is a Gtk.ListView: only visible rows exist and they are recycled
+# while scrolling. Row 0 holds the summary charts (built once per view); every other
+# row is a SessionRow rebound to a different session.
+BAR_COLORS = (("Good", (0x2e / 255, 0xc2 / 255, 0x7e / 255)),
+              ("Hard", (0xf5 / 255, 0xc2 / 255, 0x11 / 255)),
+              ("Miss", (0xed / 255, 0x33 / 255, 0x3b / 255)))
+BAR_ROW = 20
+BAR_HEIGHT = 8
+
+class SessionItem(GObject.Object):
+    def __init__(self, session=None):
+        super().__init__()
+        self.session = session # None marks the summary row
+
+class SessionBars(Gtk.DrawingArea):
+    """Good / Hard / Miss bars for one session, painted directly with cairo."""
+    def __init__(self):
+        super().__init__()
+        self.values = (0, 0, 0)
+        self.total = 0
+        self.set_hexpand(True)
+        self.set_content_height(BAR_ROW * len(BAR_COLORS))
+        self.set_draw_func(self.on_draw)
+
+    def set_values(self, good, hard, miss, total):
+        self.values, self.total = (good, hard, miss), total
+        self.queue_draw()
+
+    def on_draw(self, area, cr, width, height):
+        fg = self.get_color()
+        label_w = count_w = 44
+        track_w = max(0, width - label_w - count_w - 20)
+        for i, ((name, color), value) in enumerate(zip(BAR_COLORS, self.values)):
+            y = i * BAR_ROW
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, 1.0)
+            layout = self.create_pango_layout(name)
+            cr.move_to(0, y + (BAR_ROW - layout.get_pixel_size()[1]) / 2)
+            PangoCairo.show_layout(cr, layout)
+
+            layout = self.create_pango_layout(str(value))
+            cr.move_to(width - layout.get_pixel_size()[0], y + (BAR_ROW - layout.get_pixel_size()[1]) / 2)
+            PangoCairo.show_layout(cr, layout)
+
+            bar_y = y + (BAR_ROW - BAR_HEIGHT) / 2
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, 0.15)
+            cr.rectangle(label_w + 10, bar_y, track_w, BAR_HEIGHT)
+            cr.fill()
+            if self.total:
+                cr.set_source_rgb(*color)
+                cr.rectangle(label_w + 10, bar_y, track_w * value / self.total, BAR_HEIGHT)
+                cr.fill()
+
+class SessionRow(Gtk.Frame):
+    def __init__(self):
+        super().__init__()
+        inner = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        inner.set_margin_top(15); inner.set_margin_bottom(15)
+        inner.set_margin_start(15); inner.set_margin_end(15)
+        self.set_child(inner)
+
+        info_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        self.lbl_date = Gtk.Label(css_classes=["heading"])
+        self.lbl_count = Gtk.Label(css_classes=["dim-label"])
+        info_row.append(self.lbl_date)
+        info_row.append(Gtk.Label(hexpand=True))
+        info_row.append(self.lbl_count)
+        inner.append(info_row)
+
+        self.bars = SessionBars()
+        inner.append(self.bars)
+
+    def bind(self, sess):
+        try:
+            dt_obj = datetime.fromisoformat(sess['start_time'])
+            pretty_date = dt_obj.strftime("%a, %b %d • %H:%M") # Shorter date format
+        except:
+            pretty_date = "Unknown Date"
+        self.lbl_date.set_label(pretty_date)
+        self.lbl_count.set_label(f"{sess['count']} cards")
+        self.bars.set_values(sess['good'], sess['hard'], sess['miss'], sess['count'])
 
 class PerformanceView(Gtk.Box):
     def __init__(self, filename, session_stats=None, back_callback=None):
@@ -13,17 +113,64 @@ class PerformanceView(Gtk.Box):
         self.back_callback = back_callback
         deck_name = filename.replace(".json", "").replace("_", " ").title()
 
-        css_provider = Gtk.CssProvider()
-        css_provider.load_from_string("""
-            .bar-green block.filled { background-color: #2ec27e; }
-            .bar-yellow block.filled { background-color: #f5c211; }
-            .bar-red block.filled { background-color: #ed333b; }
-        """)
-        Gtk.StyleContext.add_provider_for_display(Gdk.Display.get_default(), css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        ensure_css(Gdk.Display.get_default())
+        self.session_stats = session_stats
+
+        # --- 1. FIXED HEADER (Sticky) ---
+        # We keep this outside the scroller so it never scrolls away
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        header.set_margin_top(15); header.set_margin_bottom(15)
+        header.set_margin_start(15); header.set_margin_end(15)
         
-        # Load Data
-        raw_history = db.get_deck_history(filename)
-        sessions = self.group_into_sessions(raw_history)
+        if self.back_callback:
+            btn_back = Gtk.Button(icon_name="go-previous-symbolic")
+            btn_back.add_css_class("flat")
+            btn_back.set_tooltip_text("Return")
+            btn_back.connect("clicked", lambda x: self.back_callback())
+            header.append(btn_back)
+
+        self.lbl_title = Gtk.Label(label=f"Stats: {deck_name}") # Shortened "Performance" to "Stats" for mobile title safety
+        self.lbl_title.add_css_class("title-2")
+        self.lbl_title.set_ellipsize(3) # Ellipsize END if title is too long
+        header.append(self.lbl_title)
+        
+        self.append(header)
+        self.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
+
+        # --- 2. SCROLLABLE CONTENT AREA ---
+        # The ListView is the scrollable itself, so session rows are created lazily
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_hexpand(True); scrolled.set_vexpand(True)
+        self.append(scrolled)
+
+        self.store = Gio.ListStore(item_type=SessionItem)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.on_row_setup)
+        factory.connect("bind", self.on_row_bind)
+
+        list_view = Gtk.ListView(model=Gtk.NoSelection(model=self.store), factory=factory)
+        list_view.add_css_class("session-list")
+        scrolled.set_child(list_view)
+
+        # Stats are computed on the data worker (after this deck's pending writes)
+        self.load()
+
+    def rebind(self, filename, session_stats=None):
+        """Shows another deck (or fresh numbers) in this view without rebuilding it."""
+        self.filename, self.session_stats = filename, session_stats
+        self.lbl_title.set_label("Stats: " + filename.replace(".json", "").replace("_", " ").title())
+        self.store.splice(0, self.store.get_n_items(), [])
+        self.load()
+
+    def load(self):
+        filename = self.filename
+        get_worker().get_deck_performance(filename, lambda data: self.populate(data) if filename == self.filename else None)
+
+    def populate(self, data):
+        filename = self.filename
+        has_history, sessions = data["has_history"], data["sessions"]
+        session_stats = self.session_stats
         
         if session_stats and session_stats.get('total', 0) > 0:
             is_dup = False
@@ -55,46 +202,13 @@ class PerformanceView(Gtk.Box):
                     'session_id': target_id
                 })
 
-        # --- 1. FIXED HEADER (Sticky) ---
-        # We keep this outside the scroller so it never scrolls away
-        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-        header.set_margin_top(15); header.set_margin_bottom(15)
-        header.set_margin_start(15); header.set_margin_end(15)
-        
-        if self.back_callback:
-            btn_back = Gtk.Button(icon_name="go-previous-symbolic")
-            btn_back.add_css_class("flat")
-            btn_back.set_tooltip_text("Return")
-            btn_back.connect("clicked", lambda x: self.back_callback())
-            header.append(btn_back)
-
-        lbl_title = Gtk.Label(label=f"Stats: {deck_name}") # Shortened "Performance" to "Stats" for mobile title safety
-        lbl_title.add_css_class("title-2")
-        lbl_title.set_ellipsize(3) # Ellipsize END if title is too long
-        header.append(lbl_title)
-        
-        self.append(header)
-        self.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
-
-        # --- 2. SCROLLABLE CONTENT AREA ---
-        scrolled = Gtk.ScrolledWindow()
-        scrolled.set_hexpand(True); scrolled.set_vexpand(True)
-        self.append(scrolled)
-
-        # --- 3. ADAPTIVE CLAMP (Mobile Magic) ---
-        # Wraps content to max 800px width, but shrinks to 12px margins on mobile
-        clamp = Adw.Clamp(maximum_size=800)
-        clamp.set_margin_top(20)
-        clamp.set_margin_bottom(40)
-        clamp.set_margin_start(12) 
-        clamp.set_margin_end(12)
-        scrolled.set_child(clamp)
-
+        # --- 3. SUMMARY (built once, shown as the first row) ---
         content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=30)
-        clamp.set_child(content_box)
+        content_box.set_margin_top(20)
+        self.summary = content_box
 
         # --- Overall Accuracy Section ---
-        if raw_history:
+        if has_history:
             overall_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=15)
             
             head_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -104,16 +218,7 @@ class PerformanceView(Gtk.Box):
             head_box.append(icon_info)
             overall_box.append(head_box)
 
-            total_score = 0.0
-            total_reviews = 0
-            for e in raw_history:
-                r = e['rating']
-                hint = e.get('hint_used', False)
-                if r == 3: total_score += 1.0
-                elif r == 2: total_score += 0.5 if hint else 1.0
-                total_reviews += 1
-            
-            final_acc = total_score / total_reviews if total_reviews > 0 else 0.0
+            final_acc = data["overall"]
             
             lbl_acc = Gtk.Label(label=f"{int(final_acc*100)}%", css_classes=["display-1"])
             lbl_acc.set_halign(Gtk.Align.CENTER)
@@ -133,7 +238,7 @@ class PerformanceView(Gtk.Box):
             content_box.append(Gtk.Separator())
 
         # --- Daily Accuracy Section ---
-        if raw_history:
+        if has_history:
             daily_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=15)
             
             head_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -145,28 +250,11 @@ class PerformanceView(Gtk.Box):
 
             daily_box.append(head_box)
             
-            daily_stats = {}
-            for entry in raw_history:
-                ts = entry.get('timestamp', entry.get('date', ''))
-                date_str = ts.split("T")[0] 
-                if date_str not in daily_stats: daily_stats[date_str] = []
-                daily_stats[date_str].append(entry)
-
-            sorted_dates = sorted(daily_stats.keys())[-7:]
             grid = Gtk.Grid(column_spacing=15, row_spacing=10) # Reduced column spacing for mobile
             
-            for i, d in enumerate(sorted_dates):
-                entries = daily_stats[d]
-                total_score = 0.0
-                
-                for e in entries:
-                    r = e['rating']
-                    hint = e.get('hint_used', False)
-                    if r == 3: total_score += 1.0
-                    elif r == 2: total_score += 0.5 if hint else 1.0
-                
-                acc = total_score / len(entries) if entries else 0.0
-                
+            # Last 7 study days, read from the end of this deck's own stats file
+            for i, (d, day) in enumerate(data["daily"].items()):
+                acc = day["accuracy"]
                 # Date Label (Truncated year if needed to save space)
                 lbl_date = Gtk.Label(label=d[5:], xalign=0) # Show "MM-DD" instead of "YYYY-MM-DD" for space
                 grid.attach(lbl_date, 0, i, 1, 1)
@@ -186,126 +274,68 @@ class PerformanceView(Gtk.Box):
             content_box.append(daily_box)
             content_box.append(Gtk.Separator())
 
-        # --- Session History ---
+        # --- Retention by Box & Best Hour ---
+        retention = data["retention"]
+        if retention:
+            ret_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=15)
+            head_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+            head_box.append(Gtk.Label(label="Retention by Box", xalign=0, css_classes=["title-2"]))
+            icon_info = Gtk.Image.new_from_icon_name("dialog-information-symbolic")
+            icon_info.set_tooltip_text("Share of reviews recalled (Good or Hard),\ngrouped by the Leitner box the card was in.")
+            head_box.append(icon_info)
+            ret_box.append(head_box)
+
+            grid = Gtk.Grid(column_spacing=15, row_spacing=10)
+            for i, (bucket, (count, rate)) in enumerate(sorted(retention.items())):
+                grid.attach(Gtk.Label(label=f"Box {bucket}", xalign=0), 0, i, 1, 1)
+                bar = Gtk.LevelBar(min_value=0, max_value=1.0)
+                bar.set_value(rate); bar.set_hexpand(True)
+                if rate > 0.75: bar.add_css_class("bar-green")
+                elif rate >= 0.50: bar.add_css_class("bar-yellow")
+                else: bar.add_css_class("bar-red")
+                grid.attach(bar, 1, i, 1, 1)
+                grid.attach(Gtk.Label(label=f"{int(rate*100)}% ({count})"), 2, i, 1, 1)
+            ret_box.append(grid)
+
+            counts, hour_acc = data["hourly"]
+            if counts.any():
+                best = int(hour_acc.argmax())
+                lbl_best = Gtk.Label(label=f"Best hour: {best:02d}:00 ({int(hour_acc[best]*100)}% accuracy)", xalign=0, css_classes=["dim-label"])
+                ret_box.append(lbl_best)
+
+            content_box.append(ret_box)
+            content_box.append(Gtk.Separator())
+
+        # --- Session History (header; the rows themselves come from the list) ---
         sess_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=20)
         sess_box.append(Gtk.Label(label="Session Log", xalign=0, css_classes=["title-2"]))
-
         if not sessions:
             sess_box.append(Gtk.Label(label="No sessions recorded yet.", css_classes=["dim-label"]))
-        else:
-            for sess in reversed(sessions):
-                sess_frame = Gtk.Frame()
-                sess_inner = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-                sess_inner.set_margin_top(15); sess_inner.set_margin_bottom(15)
-                sess_inner.set_margin_start(15); sess_inner.set_margin_end(15)
-                sess_frame.set_child(sess_inner)
+        content_box.append(sess_box)
 
-                try:
-                    dt_obj = datetime.fromisoformat(sess['start_time'])
-                    pretty_date = dt_obj.strftime("%a, %b %d • %H:%M") # Shorter date format
-                except:
-                    pretty_date = "Unknown Date"
-                
-                info_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-                info_row.append(Gtk.Label(label=pretty_date, css_classes=["heading"]))
-                info_row.append(Gtk.Label(hexpand=True))
-                info_row.append(Gtk.Label(label=f"{sess['count']} cards", css_classes=["dim-label"]))
-                sess_inner.append(info_row)
-
-                # Stats Grid (Compact)
-                stats_grid = Gtk.Grid(column_spacing=10, row_spacing=5)
-                
-                stats_grid.attach(Gtk.Label(label="Good", xalign=0), 0, 0, 1, 1)
-                bar_g = Gtk.LevelBar(min_value=0, max_value=sess['count'])
-                bar_g.set_value(sess['good']); bar_g.add_css_class("bar-green"); bar_g.set_hexpand(True)
-                stats_grid.attach(bar_g, 1, 0, 1, 1)
-                stats_grid.attach(Gtk.Label(label=str(sess['good'])), 2, 0, 1, 1)
-
-                stats_grid.attach(Gtk.Label(label="Hard", xalign=0), 0, 1, 1, 1)
-                bar_h = Gtk.LevelBar(min_value=0, max_value=sess['count'])
-                bar_h.set_value(sess['hard']); bar_h.add_css_class("bar-yellow"); bar_h.set_hexpand(True)
-                stats_grid.attach(bar_h, 1, 1, 1, 1)
-                stats_grid.attach(Gtk.Label(label=str(sess['hard'])), 2, 1, 1, 1)
-
-                stats_grid.attach(Gtk.Label(label="Miss", xalign=0), 0, 2, 1, 1)
-                bar_m = Gtk.LevelBar(min_value=0, max_value=sess['count'])
-                bar_m.set_value(sess['miss']); bar_m.add_css_class("bar-red"); bar_m.set_hexpand(True)
-                stats_grid.attach(bar_m, 1, 2, 1, 1)
-                stats_grid.attach(Gtk.Label(label=str(sess['miss'])), 2, 2, 1, 1)
-
-                sess_inner.append(stats_grid)
-                sess_box.append(sess_frame)
+        self.store.splice(0, self.store.get_n_items(), [SessionItem()] + [SessionItem(sess) for sess in reversed(sessions)])
 
-        content_box.append(sess_box)
+    def on_data_changed(self, changes):
+        """Files changed outside the app (see file_watcher): recompute if they concern this deck."""
+        if changes["history"] or self.filename in changes["decks"]: self.load()
 
-    def group_into_sessions(self, raw_history):
-        if not raw_history: return []
-        
-        legacy = []
-        modern = []
-        
-        for r in raw_history:
-            if 'session_id' in r and r['session_id']:
-                modern.append(r)
-            else:
-                if 'timestamp' not in r and 'date' in r:
-                    r['timestamp'] = r['date'] + "T12:00:00"
-                if 'timestamp' in r:
-                    legacy.append(r)
-
-        sessions = []
-        modern_groups = {}
-        modern_order = [] 
-        
-        for entry in modern:
-            sid = entry['session_id']
-            if sid not in modern_groups:
-                modern_groups[sid] = self.new_session_dict(datetime.fromisoformat(entry['timestamp']))
-                modern_groups[sid]['session_id'] = sid
-                modern_order.append(sid)
-            
-            s = modern_groups[sid]
-            s['count'] += 1
-            ts = datetime.fromisoformat(entry['timestamp'])
-            st = datetime.fromisoformat(s['start_time'])
-            if ts < st: s['start_time'] = entry['timestamp']
-            
-            r = entry['rating']
-            if r == 3: s['good'] += 1
-            elif r == 2: s['hard'] += 1
-            elif r == 1: s['miss'] += 1
-            
-        for sid in modern_order:
-            sessions.append(modern_groups[sid])
-
-        if legacy:
-            legacy.sort(key=lambda x: x['timestamp'])
-            current_session = None
-            for entry in legacy:
-                ts = datetime.fromisoformat(entry['timestamp'])
-                if not current_session:
-                    current_session = self.new_session_dict(ts)
-                else:
-                    last_ts = current_session['last_ts_obj']
-                    if (ts - last_ts) > timedelta(minutes=2):
-                        sessions.append(current_session)
-                        current_session = self.new_session_dict(ts)
-                
-                current_session['count'] += 1
-                current_session['last_ts_obj'] = ts
-                r = entry['rating']
-                if r == 3: current_session['good'] += 1
-                elif r == 2: current_session['hard'] += 1
-                elif r == 1: current_session['miss'] += 1
-            if current_session: sessions.append(current_session)
-
-        sessions.sort(key=lambda s: s['start_time'])
-        return sessions
-
-    def new_session_dict(self, ts_obj):
-        return { 
-            'start_time': ts_obj.isoformat(), 
-            'last_ts_obj': ts_obj, 
-            'count': 0, 'good': 0, 'hard': 0, 'miss': 0,
-            'session_id': None 
-        }
\ No newline at end of file
+    def on_row_setup(self, factory, list_item):
+        # Adaptive clamp per row: max 800px wide, 12px margins on mobile
+        clamp = Adw.Clamp(maximum_size=800)
+        clamp.set_margin_start(12); clamp.set_margin_end(12)
+        clamp.set_margin_bottom(20)
+        clamp.session_row = SessionRow()
+        list_item.set_child(clamp)
+        list_item.set_activatable(False)
+
+    def on_row_bind(self, factory, list_item):
+        clamp = list_item.get_child()
+        sess = list_item.get_item().session
+        if sess is None:
+            # The summary widget can only have one parent; detach it from a recycled row first
+            parent = self.summary.get_parent()
+            if parent is not None and parent is not clamp: parent.set_child(None)
+            clamp.set_child(self.summary)
+        else:
+            clamp.session_row.bind(sess)
+            if clamp.get_child() is not clamp.session_row: clamp.set_child(clamp.session_row)
@@ -0,0 +1,100 @@
+import gi
+import profiler
+
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import Gtk, Adw
+
+# --- DATA PROFILE PAGE ---
+# Debug page for the opt-in data_engine profiler (FLIPSTACK_PROFILE=1). Shows one row
+# per called function, slowest total first; the numbers are a snapshot, not live.
+COLUMNS = (("Function", "name"), ("Calls", "calls"), ("Total ms", "total_ms"), ("Avg ms", "avg_ms"),
+           ("Max ms", "max_ms"), ("Parse ms", "json_parse_ms"), ("Write ms", "json_write_ms"),
+           ("Read", "bytes_read"), ("Written", "bytes_written"))
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024: return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+def format_cell(key, value):
+    if key == "name": return value
+    if key.startswith("bytes"): return format_bytes(value) if value else "-"
+    if key.endswith("_ms"): return f"{value:.2f}" if value else "-"
+    return str(value)
+
+class ProfileView(Gtk.Box):
+    def __init__(self, back_callback=None, toast_callback=None):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        self.toast_callback = toast_callback
+
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        header.set_margin_top(15); header.set_margin_bottom(15)
+        header.set_margin_start(15); header.set_margin_end(15)
+
+        if back_callback:
+            btn_back = Gtk.Button(icon_name="go-previous-symbolic")
+            btn_back.add_css_class("flat")
+            btn_back.set_tooltip_text("Return")
+            btn_back.connect("clicked", lambda x: back_callback())
+            header.append(btn_back)
+
+        lbl_title = Gtk.Label(label="Data Profile")
+        lbl_title.add_css_class("title-2")
+        lbl_title.set_hexpand(True); lbl_title.set_halign(Gtk.Align.START)
+        header.append(lbl_title)
+
+        for icon, tooltip, cb in (("view-refresh-symbolic", "Refresh", lambda x: self.refresh()),
+                                  ("edit-clear-all-symbolic", "Reset Counters", self.on_reset),
+                                  ("document-save-symbolic", "Save Dump", self.on_dump)):
+            btn = Gtk.Button(icon_name=icon)
+            btn.add_css_class("flat")
+            btn.set_tooltip_text(tooltip)
+            btn.connect("clicked", cb)
+            header.append(btn)
+
+        self.append(header)
+        self.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_hexpand(True); scrolled.set_vexpand(True)
+        self.append(scrolled)
+
+        self.grid = Gtk.Grid(column_spacing=18, row_spacing=6)
+        self.grid.set_margin_top(15); self.grid.set_margin_bottom(15)
+        self.grid.set_margin_start(15); self.grid.set_margin_end(15)
+        scrolled.set_child(self.grid)
+        self.refresh()
+
+    def refresh(self):
+        while child := self.grid.get_first_child(): self.grid.remove(child)
+        for col, (title, _) in enumerate(COLUMNS):
+            lbl = Gtk.Label(label=title, xalign=0 if col == 0 else 1)
+            lbl.add_css_class("heading")
+            self.grid.attach(lbl, col, 0, 1, 1)
+
+        rows = profiler.snapshot()
+        if not rows:
+            empty = Gtk.Label(label="No data_engine calls recorded yet.", xalign=0)
+            empty.add_css_class("dim-label")
+            self.grid.attach(empty, 0, 1, len(COLUMNS), 1)
+            return
+        for r, row in enumerate(rows, start=1):
+            for col, (_, key) in enumerate(COLUMNS):
+                lbl = Gtk.Label(label=format_cell(key, row[key]), xalign=0 if col == 0 else 1)
+                lbl.add_css_class("monospace" if col else "body")
+                lbl.set_selectable(col == 0)
+                self.grid.attach(lbl, col, r, 1, 1)
+
+    def on_reset(self, btn):
+        profiler.reset()
+        self.refresh()
+
+    def on_dump(self, btn):
+        try:
+            path = profiler.dump()
+            msg = f"Profile saved to {path}"
+        except OSError as e:
+            msg = f"Could not save profile: {e}"
+        if self.toast_callback: self.toast_callback(msg)
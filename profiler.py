@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import atexit
+import inspect
+import functools
+import threading
+
+# --- DATA PROFILER (opt-in) ---
+# Wraps every public function of a module (data_engine) to record, per function:
+#   calls, wall time (total / max, inclusive of nested calls),
+#   JSON parse / serialize time and the bytes they read / wrote (attributed to the
+#   innermost profiled function doing the I/O).
+# Turned on with FLIPSTACK_PROFILE=1 or settings["profiling"] = true, at startup.
+# When off, install() is never called: nothing is wrapped and the cost is zero.
+ENV_VAR = "FLIPSTACK_PROFILE"
+
+_stats = {}             # function name -> record
+_lock = threading.Lock()
+_local = threading.local()
+_dump_path = None
+
+def requested(settings=None):
+    if os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes", "on"): return True
+    return bool((settings or {}).get("profiling"))
+
+def active():
+    return _dump_path is not None
+
+def _record():
+    return {"calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "json_parse_ms": 0.0, "json_write_ms": 0.0, "bytes_read": 0, "bytes_written": 0}
+
+def _current():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else _stats.setdefault("(module level)", _record())
+
+def _wrap(name, fn):
+    rec = _stats.setdefault(name, _record())
+
+    @functools.wraps(fn)
+    def profiled(*args, **kwargs):
+        stack = getattr(_local, "stack", None)
+        if stack is None: stack = _local.stack = []
+        stack.append(rec)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            stack.pop()
+            with _lock:
+                rec["calls"] += 1
+                rec["total_ms"] += ms
+                if ms > rec["max_ms"]: rec["max_ms"] = ms
+    return profiled
+
+def _add(key, ms_key, ms, n):
+    rec = _current()
+    with _lock:
+        rec[ms_key] += ms
+        rec[key] += n
+
+def _tell(fp):
+    try: return fp.tell()
+    except (OSError, ValueError): return None
+
+class _ProfiledJSON:
+    """Stands in for the json module inside the profiled module; times load/dump."""
+    def __init__(self, module):
+        self._json = module
+
+    def __getattr__(self, name):
+        return getattr(self._json, name)
+
+    def load(self, fp, **kwargs):
+        start = time.perf_counter()
+        data = self._json.load(fp, **kwargs)
+        _add("bytes_read", "json_parse_ms", (time.perf_counter() - start) * 1000, _tell(fp) or 0)
+        return data
+
+    def loads(self, s, **kwargs):
+        start = time.perf_counter()
+        data = self._json.loads(s, **kwargs)
+        _add("bytes_read", "json_parse_ms", (time.perf_counter() - start) * 1000, len(s))
+        return data
+
+    def dump(self, obj, fp, **kwargs):
+        before = _tell(fp)
+        start = time.perf_counter()
+        self._json.dump(obj, fp, **kwargs)
+        after = _tell(fp)
+        written = after - before if before is not None and after is not None else 0
+        _add("bytes_written", "json_write_ms", (time.perf_counter() - start) * 1000, written)
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        s = self._json.dumps(obj, **kwargs)
+        _add("bytes_written", "json_write_ms", (time.perf_counter() - start) * 1000, len(s))
+        return s
+
+def install(module, dump_path):
+    """Instruments `module` in place; the report is written to dump_path at exit (and on demand)."""
+    global _dump_path
+    if _dump_path is not None: return
+    _dump_path = dump_path
+    module.json = _ProfiledJSON(json)
+    for name, obj in list(vars(module).items()):
+        if name.startswith("_") or not inspect.isfunction(obj) or obj.__module__ != module.__name__: continue
+        setattr(module, name, _wrap(name, obj))
+    atexit.register(dump)
+
+def snapshot():
+    """[{name, calls, total_ms, avg_ms, ...}, ...] for every function called so far, slowest first."""
+    with _lock:
+        rows = [{"name": name, **rec} for name, rec in _stats.items() if rec["calls"] or rec["bytes_read"] or rec["bytes_written"]]
+    for row in rows:
+        row["avg_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+def reset():
+    with _lock:
+        for rec in _stats.values(): rec.update(_record())
+
+def dump(path=None):
+    """Writes the snapshot as JSON; returns the path (None if profiling is off)."""
+    path = path or _dump_path
+    if path is None: return None
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "pid": os.getpid(), "functions": snapshot()}
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,165 @@
+import datetime
+import numpy as np
+
+# --- SPACED REPETITION SCHEDULERS ---
+# A scheduler decides when a card comes back after it's rated.
+#   review(card, rating, today)  -> updates ONE card in place (used while studying)
+#   reschedule(arrays)           -> recomputes the whole collection at once with NumPy
+# Ratings: 3=Good, 2=Hard, 1=Miss
+
+DEFAULT_SCHEDULER = "leitner"
+
+def card_arrays(cards):
+    """
+    Packs the scheduling fields of a list of cards into NumPy arrays.
+    Dates become day numbers; -1 marks "never" (new card / unknown).
+    """
+    n = len(cards)
+    bucket = np.fromiter((c.get("bucket", 0) or 0 for c in cards), dtype=np.int32, count=n)
+    lapses = np.fromiter((c.get("lapses", 0) or 0 for c in cards), dtype=np.int32, count=n)
+    ease = np.fromiter((c.get("ease") or np.nan for c in cards), dtype=np.float64, count=n)
+    stability = np.fromiter((np.nan if c.get("stability") is None else c["stability"] for c in cards), dtype=np.float64, count=n)
+    next_day = np.array([c.get("next_review") or "NaT" for c in cards], dtype="datetime64[D]")
+    last_day = np.array([c.get("last_review") or "NaT" for c in cards], dtype="datetime64[D]")
+
+    def to_days(arr):
+        out = arr.astype(np.int64)
+        out[np.isnat(arr)] = -1
+        return out
+
+    return {
+        "bucket": bucket, "lapses": lapses, "ease": ease, "stability": stability,
+        "next_day": to_days(next_day), "last_day": to_days(last_day),
+    }
+
+def days_to_iso(days):
+    """Vectorized inverse of card_arrays' date packing. -1 becomes None."""
+    iso = days.astype("datetime64[D]").astype(str)
+    return [None if d < 0 else s for d, s in zip(days.tolist(), iso.tolist())]
+
+def leitner_bucket(bucket, rating):
+    if rating == 3: bucket += 1
+    elif rating == 1: bucket = 0
+    if rating == 2 and bucket == 0: bucket = 1
+    return bucket
+
+def _estimate_last_day(arrays, base_intervals):
+    """
+    Cards created before last_review was tracked: back it out of next_review.
+    reschedule() returns it as "last_day" so the caller can store it; estimating
+    again from the rescheduled next_review would drift further on every run.
+    """
+    last_day = arrays["last_day"].copy()
+    missing = (last_day < 0) & (arrays["next_day"] >= 0)
+    last_day[missing] = arrays["next_day"][missing] - base_intervals[missing]
+    return last_day
+
+class LeitnerScheduler:
+    """
+    The classic FlipStack rule: a card in bucket b returns after base * growth**b days.
+    Defaults give the original 2**b; optimizer.py can fit both to your history.
+    """
+    name = "leitner"
+    label = "Leitner (Classic)"
+
+    def __init__(self, growth=2.0, base=1.0):
+        self.growth = float(growth)
+        self.base = float(base)
+
+    def interval(self, bucket):
+        return 0 if bucket == 0 else max(1, int(round(self.base * self.growth ** bucket)))
+
+    def review(self, card, rating, today):
+        card["bucket"] = leitner_bucket(card.get("bucket", 0), rating)
+        card["next_review"] = (today + datetime.timedelta(days=self.interval(card["bucket"]))).isoformat()
+
+    def intervals(self, bucket):
+        days = np.maximum(1, np.rint(self.base * self.growth ** bucket.astype(np.float64)))
+        return np.where(bucket == 0, 0, days).astype(np.int64)
+
+    def project_good(self, state):
+        """Vectorized "what if every review is Good": next intervals + advanced state."""
+        bucket = state["bucket"] + 1
+        return self.intervals(bucket), {**state, "bucket": bucket}
+
+    def reschedule(self, arrays):
+        # Old decks were always scheduled with 2**bucket, so that's what we back out
+        last_day = _estimate_last_day(arrays, LeitnerScheduler(2.0).intervals(arrays["bucket"]))
+        next_day = np.where(last_day >= 0, last_day + self.intervals(arrays["bucket"]), -1)
+        return {"next_day": next_day, "last_day": last_day}
+
+class SM2Scheduler:
+    """
+    SM-2 style scheduling. Every card carries its own "ease" (interval multiplier)
+    and "stability" (current interval in days), so easy cards space out faster
+    than cards you keep missing.
+    """
+    name = "sm2"
+    label = "SM-2 (Adaptive Ease)"
+    START_EASE = 2.5
+    MIN_EASE = 1.3
+    MAX_EASE = 3.0
+
+    def review(self, card, rating, today):
+        bucket = card.get("bucket", 0)
+        ease = card.get("ease") or self.START_EASE
+        stab = card.get("stability")
+        if stab is None: stab = float(LeitnerScheduler().interval(bucket))
+
+        if rating == 1:
+            ease = max(self.MIN_EASE, ease - 0.2)
+            stab = 0.0
+        elif rating == 2:
+            ease = max(self.MIN_EASE, ease - 0.15)
+            stab = max(1.0, stab * 1.2)
+        else:
+            ease = min(self.MAX_EASE, ease + 0.1)
+            if stab < 1: stab = 1.0
+            elif stab < 6: stab = 6.0
+            else: stab = stab * ease
+
+        card["bucket"] = leitner_bucket(bucket, rating)
+        card["ease"] = round(ease, 3)
+        card["stability"] = round(stab, 2)
+        card["next_review"] = (today + datetime.timedelta(days=int(round(stab)))).isoformat()
+
+    def project_good(self, state):
+        ease = np.minimum(self.MAX_EASE, np.where(np.isnan(state["ease"]), self.START_EASE, state["ease"]) + 0.1)
+        stab = np.where(np.isnan(state["stability"]), LeitnerScheduler(2.0).intervals(state["bucket"]), state["stability"])
+        stab = np.where(stab < 1, 1.0, np.where(stab < 6, 6.0, stab * ease))
+        return np.rint(stab).astype(np.int64), {**state, "bucket": state["bucket"] + 1, "ease": ease, "stability": stab}
+
+    def reschedule(self, arrays):
+        bucket, lapses = arrays["bucket"], arrays["lapses"]
+        base = LeitnerScheduler(2.0).intervals(bucket)
+
+        # Cards that never went through SM-2 get ease from their lapse count and
+        # stability from their Leitner interval, so switching schedulers keeps progress.
+        ease = arrays["ease"].copy()
+        no_ease = np.isnan(ease)
+        ease[no_ease] = np.clip(self.START_EASE - 0.2 * np.minimum(lapses[no_ease], 6), self.MIN_EASE, self.MAX_EASE)
+        stab = arrays["stability"].copy()
+        no_stab = np.isnan(stab)
+        stab[no_stab] = base[no_stab] * (ease[no_stab] / self.START_EASE)
+        stab[bucket == 0] = 0.0
+
+        last_day = _estimate_last_day(arrays, base)
+        next_day = np.where(last_day >= 0, last_day + np.rint(stab).astype(np.int64), -1)
+        return {"next_day": next_day, "last_day": last_day, "ease": np.round(ease, 3), "stability": np.round(stab, 2)}
+
+SCHEDULERS = {
+    LeitnerScheduler.name: LeitnerScheduler,
+    SM2Scheduler.name: SM2Scheduler,
+}
+
+def get_scheduler(settings=None):
+    """
+    Builds the scheduler selected in settings (falls back to Leitner).
+    Fitted interval parameters (settings["scheduler_params"]) apply to Leitner.
+    """
+    settings = settings or {}
+    name = settings.get("scheduler", DEFAULT_SCHEDULER)
+    if SCHEDULERS.get(name, LeitnerScheduler) is LeitnerScheduler:
+        params = settings.get("scheduler_params") or {}
+        return LeitnerScheduler(params.get("growth", 2.0), params.get("base", 1.0))
+    return SCHEDULERS[name]()
@@ -0,0 +1,144 @@
+import random
+import datetime
+import deck_index
+import data_engine as db
+
+# --- SESSION QUEUE ---
+# Feeds a study session its cards a batch at a time. A single deck's session is planned
+# from the deck's sidecar (deck_index): one NumPy pass picks the due cards, applies the
+# daily caps ("new_per_day" / "reviews_per_day", 0 = no cap) and orders them, and each
+# batch then reads just its cards. "Study All Due" walks the global due index from a
+# resume key, applying the caps per deck as it goes. Cram mode draws a random order one
+# batch at a time (a Fisher-Yates shuffle that stops after each batch) rather than
+# shuffling the whole deck up front. Cards are tracked by id hash (deck_index.id_hash).
+# start() and next_batch() read the decks, so they run on the data worker.
+BATCH_SIZE = 50
+PREFETCH = 10 # Fetch the next batch when this few loaded cards are left
+
+class SessionQueue:
+    def __init__(self, filename, cram=False, settings=None):
+        settings = settings or db.load_settings()
+        self.filename = filename
+        self.is_all_due = filename == db.ALL_DUE
+        self.cram = cram and not self.is_all_due
+        self.new_per_day = settings.get("new_per_day", 0)
+        self.reviews_per_day = settings.get("reviews_per_day", 0)
+        self.per_deck_limit = settings.get("due_limit_per_deck", 0) if self.is_all_due else 0
+        self.today = datetime.date.today()
+        self.after = None    # All Due: index key the next batch resumes after
+        self.served = set()  # (deck, card id hash) already handed to the session
+        self.budget = {}     # deck -> [new cards left, reviews left] (None = no cap)
+        self.taken = {}      # deck -> cards taken (All Due per-deck limit)
+        self.order = None    # One deck: id hashes in session order (cram: order[:drawn] is the shuffled prefix)
+        self.drawn = 0
+        self.left = 0        # Cards still expected beyond the loaded ones (for progress)
+        self.exhausted = False
+
+    # --- Worker side ---
+    def start(self):
+        """Plans the session; returns (first batch of cards, cards in the deck)."""
+        if self.is_all_due:
+            total = db.count_indexed_cards()
+            self.left = sum(self.planned(f) for f in db.get_all_decks())
+            return self.next_batch(), total
+        side = db.load_sidecar(self.filename)
+        records = side.records if side is not None else deck_index.build([])
+        if self.cram:
+            self.order = records["id_hash"].copy()
+        else:
+            new_left, review_left = self.deck_budget(self.filename)
+            self.order = deck_index.session_order(records, self.today, new_left, review_left)
+        self.left = len(self.order)
+        return self.next_batch(), len(records)
+
+    def planned(self, fname):
+        """How many cards this session will take from one deck, given its due counts and the caps."""
+        new, review = db.count_deck_due(fname, self.today)
+        new_left, review_left = self.deck_budget(fname)
+        if new_left is not None: new = min(new, new_left)
+        if review_left is not None: review = min(review, review_left)
+        count = new + review
+        if review_left is not None: count = min(count, review_left) # New cards count as reviews too
+        return min(count, self.per_deck_limit) if self.per_deck_limit > 0 else count
+
+    def deck_budget(self, fname):
+        budget = self.budget.get(fname)
+        if budget is None:
+            new_done, reviews_done = db.get_studied_today(fname) if (self.new_per_day or self.reviews_per_day) else (0, 0)
+            budget = self.budget[fname] = [
+                max(0, self.new_per_day - new_done) if self.new_per_day > 0 else None,
+                max(0, self.reviews_per_day - reviews_done) if self.reviews_per_day > 0 else None]
+        return budget
+
+    def next_batch(self, size=BATCH_SIZE):
+        """The next cards of the session (fewer than `size`, possibly none, once it runs dry)."""
+        if self.exhausted: return []
+        if self.is_all_due:
+            picks = self.draw_due(size)
+            self.exhausted = len(picks) < size
+        else:
+            picks = self.draw_order(size)
+            self.exhausted = self.drawn >= len(self.order)
+
+        by_deck = {}
+        for fname, h in picks: by_deck.setdefault(fname, []).append(h)
+        loaded = {}
+        for fname, hashes in by_deck.items():
+            for card in db.load_cards(fname, hashes=hashes):
+                if self.is_all_due: card["_deck"] = fname
+                loaded[(fname, deck_index.id_hash(card["id"]))] = card
+        cards = [loaded[k] for k in picks if k in loaded]
+        self.left = 0 if self.exhausted else max(0, self.left - len(cards))
+        return cards
+
+    def draw_due(self, size):
+        picks = []
+        for fname, cid, is_new, key in db.iter_due_keys(self.after, self.today.isoformat()):
+            self.after = key
+            pick = (fname, deck_index.id_hash(cid))
+            if pick in self.served: continue # e.g. a missed card that came due again
+            if self.per_deck_limit > 0 and self.taken.get(fname, 0) >= self.per_deck_limit: continue
+            budget = self.deck_budget(fname)
+            if budget[1] is not None and budget[1] <= 0: continue
+            if is_new:
+                if budget[0] is not None and budget[0] <= 0: continue
+                if budget[0] is not None: budget[0] -= 1
+            if budget[1] is not None: budget[1] -= 1
+            self.taken[fname] = self.taken.get(fname, 0) + 1
+            self.served.add(pick)
+            picks.append(pick)
+            if len(picks) == size: break
+        return picks
+
+    def draw_order(self, size):
+        order, start = self.order, self.drawn
+        end = min(start + size, len(order))
+        if self.cram:
+            for i in range(start, end):
+                j = random.randrange(i, len(order))
+                order[i], order[j] = order[j], order[i]
+        self.drawn = end
+        picks = [(self.filename, h) for h in order[start:end].tolist() if (self.filename, h) not in self.served]
+        self.served.update(picks)
+        return picks
+
+    # --- Main loop side ---
+    def claim(self, fname, card_id):
+        """Marks a card the session picked up on its own (added, or due after an outside change); False if already served."""
+        key = (fname, deck_index.id_hash(card_id))
+        if key in self.served: return False
+        self.served.add(key)
+        return True
+
+    def behind(self, fname, card):
+        """True if the session won't reach this card on its own, i.e. it won't be served unless claimed."""
+        if self.exhausted: return True
+        if self.cram: return False # Every card of the deck is still ahead, or already served
+        if self.is_all_due:
+            if self.after is None: return False
+            return (card.get("next_review") or "", fname, card["id"]) <= self.after
+        if self.order is None: return False
+        return not (self.order[self.drawn:] == deck_index.id_hash(card["id"])).any()
+
+    def wants_more(self, loaded_ahead):
+        return not self.exhausted and loaded_ahead <= PREFETCH
@@ -1,7 +1,13 @@
 import gi
 import data_engine as db
+import events
+import tracing
+from data_worker import get_worker
+import card_dialog
+from session_queue import SessionQueue
 from datetime import datetime
 import uuid
+import time
 import random
 import subprocess
 import threading
@@ -13,11 +19,74 @@ gi.require_version('Adw', '1')
 gi.require_version('Pango', '1.0')
 from gi.repository import Gtk, Adw, Gdk, Gio, GLib, GObject, Pango
 
+# --- STYLES ---
+# Registered once per display (a provider per session would pile up on every open)
+_styled_displays = set()
+
+def ensure_css(display):
+    if display is None or display in _styled_displays: return
+    css_provider = Gtk.CssProvider()
+    css_provider.load_from_string("""
+        .btn-green { background: #2ec27e; color: white; }
+        .btn-green:hover { background: #26a269; }
+        .btn-yellow { background: #f5c211; color: black; }
+        .btn-yellow:hover { background: #e5a50a; }
+        .btn-red { background: #ed333b; color: white; }
+        .btn-red:hover { background: #c01c28; }
+        .progress-label { font-size: 12px; color: alpha(currentColor, 0.7); }
+        .card-btn-edit { background: transparent; color: alpha(currentColor, 0.5); box-shadow: none; margin-right: 20px;}
+        .card-btn-edit:hover { color: currentColor; background: alpha(currentColor, 0.1); }
+        .audio-btn-large { padding: 10px; border-radius: 50%; background: alpha(currentColor, 0.1); color: #3584e4; }
+        .audio-btn-large:hover { background: alpha(#3584e4, 0.2); }
+        .hint-text { color: #f5c211; font-weight: bold; }
+        
+        /* UPDATED: Frame Style Flash */
+        .flash-success { 
+            border: 6px solid #2ec27e; /* Green */
+            background-color: transparent; 
+        }
+        .flash-warning { 
+            border: 6px solid #f5c211; /* Yellow (Hard) */
+            background-color: transparent; 
+        }
+        .flash-error { 
+            border: 6px solid #ed333b; /* Red */
+            background-color: transparent; 
+        }
+    """)
+    Gtk.StyleContext.add_provider_for_display(display, css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+    _styled_displays.add(display)
+
 class StudySession(Gtk.Box):
     def __init__(self, filename, navigation_callback=None):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
-        self.filename = filename
         self.nav_callback = navigation_callback 
+        self.bind(filename)
+
+        ensure_css(Gdk.Display.get_default())
+        self.card_events = {
+            events.CardAdded: self.on_card_added,
+            events.CardUpdated: self.on_card_updated,
+            events.CardDeleted: self.on_card_deleted,
+        }
+        
+        self.build_ui()
+        self.setup_views()
+        self.refresh_view()
+        self.load_cards()
+
+        self.key_controller = Gtk.EventControllerKey()
+        self.key_controller.connect("key-pressed", self.on_key_pressed)
+        self.add_controller(self.key_controller)
+
+        self.setup_gestures()
+
+    def bind(self, filename):
+        """Per-session state; everything rebind() has to reset lives here."""
+        self.start_span = tracing.begin("session.start", deck=filename) # Ends when the first card is shown
+        self.binding = object() # Worker results for an earlier binding are dropped
+        self.filename = filename
+        self.is_all_due = filename == db.ALL_DUE # Cross-deck review of everything due
         self.session_id = str(uuid.uuid4())
         
         self.session_stats = {"good": 0, "hard": 0, "miss": 0, "total": 0, "session_id": self.session_id}
@@ -25,6 +94,8 @@ class StudySession(Gtk.Box):
         self.is_cram_mode = False
         self.is_reverse_mode = False
         self.hint_used = False
+        self.flip_time = None
+        self.response_ms = None
 
         # --- NEW: State Flags ---
         self.current_img_path = None 
@@ -33,55 +104,32 @@ class StudySession(Gtk.Box):
         self.is_editing = False
         # ------------------------
 
-        self.setup_css()
-        self.load_cards()
+        self.cards = []                 # Cards loaded so far; the queue hands out more as the session goes
+        self.queue = None
+        self.fetching = False
+        self.total_cards_in_deck = None # None = still loading (cards arrive from the data worker)
         self.current_index = 0
         self.is_flipped = False
-        
-        self.build_ui()
-        self.setup_views()
-        self.refresh_view()
 
-        self.key_controller = Gtk.EventControllerKey()
-        self.key_controller.connect("key-pressed", self.on_key_pressed)
-        self.add_controller(self.key_controller)
+    def rebind(self, filename):
+        """Starts a fresh session on `filename` reusing this view's widgets (see the view pool in main)."""
+        self.bind(filename)
+        self.lbl_title.set_label(self.deck_title())
+        for btn, handler in ((self.btn_rev, self.rev_handler), (self.btn_cram, self.cram_handler)):
+            with btn.handler_block(handler): btn.set_active(False)
+        for btn in (self.btn_cram, self.btn_add, self.btn_add_first, self.btn_stats): btn.set_visible(not self.is_all_due)
+        self.refresh_view()
+        self.load_cards()
 
-        self.setup_gestures()
+    def deck_title(self):
+        return "All Due Cards" if self.is_all_due else self.filename.replace(".json", "").replace("_", " ").title()
 
-    def setup_css(self):
-        css_provider = Gtk.CssProvider()
-        css_provider.load_from_string("""
-            .btn-green { background: #2ec27e; color: white; }
-            .btn-green:hover { background: #26a269; }
-            .btn-yellow { background: #f5c211; color: black; }
-            .btn-yellow:hover { background: #e5a50a; }
-            .btn-red { background: #ed333b; color: white; }
-            .btn-red:hover { background: #c01c28; }
-            .progress-label { font-size: 12px; color: alpha(currentColor, 0.7); }
-            .card-btn-edit { background: transparent; color: alpha(currentColor, 0.5); box-shadow: none; margin-right: 20px;}
-            .card-btn-edit:hover { color: currentColor; background: alpha(currentColor, 0.1); }
-            .audio-btn-large { padding: 10px; border-radius: 50%; background: alpha(currentColor, 0.1); color: #3584e4; }
-            .audio-btn-large:hover { background: alpha(#3584e4, 0.2); }
-            .hint-text { color: #f5c211; font-weight: bold; }
-            
-            /* UPDATED: Frame Style Flash */
-            .flash-success { 
-                border: 6px solid #2ec27e; /* Green */
-                background-color: transparent; 
-            }
-            .flash-warning { 
-                border: 6px solid #f5c211; /* Yellow (Hard) */
-                background-color: transparent; 
-            }
-            .flash-error { 
-                border: 6px solid #ed333b; /* Red */
-                background-color: transparent; 
-            }
-        """)
-        Gtk.StyleContext.add_provider_for_display(Gdk.Display.get_default(), css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+    def deck_of(self, card):
+        """The deck a card belongs to (differs per card in All Due mode)."""
+        return card.get("_deck", self.filename)
 
     def build_ui(self):
-        deck_name = self.filename.replace(".json", "").replace("_", " ").title()
+        deck_name = self.deck_title()
         
         # FIX: Reduced margins for mobile
         header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
@@ -89,7 +137,7 @@ class StudySession(Gtk.Box):
         header.set_margin_start(10); header.set_margin_end(10)
         
         # FIX: Allow title to shrink/ellipsize
-        title = Gtk.Label(label=deck_name, xalign=0)
+        self.lbl_title = title = Gtk.Label(label=deck_name, xalign=0)
         title.add_css_class("title-2")
         title.set_ellipsize(Pango.EllipsizeMode.END) 
         title.set_hexpand(True) # Takes available space
@@ -97,10 +145,13 @@ class StudySession(Gtk.Box):
         header.append(title)
         
         # Buttons (Compact)
-        btn_rev = Gtk.ToggleButton(icon_name="object-rotate-left-symbolic"); btn_rev.set_tooltip_text("Reverse Mode"); btn_rev.add_css_class("flat"); btn_rev.connect("toggled", self.on_reverse_toggled); header.append(btn_rev)
-        btn_cram = Gtk.ToggleButton(icon_name="weather-storm-symbolic"); btn_cram.set_tooltip_text("Cram Mode"); btn_cram.add_css_class("flat"); btn_cram.connect("toggled", self.on_cram_toggled); header.append(btn_cram)
+        btn_rev = Gtk.ToggleButton(icon_name="object-rotate-left-symbolic"); btn_rev.set_tooltip_text("Reverse Mode"); btn_rev.add_css_class("flat"); self.rev_handler = btn_rev.connect("toggled", self.on_reverse_toggled); header.append(btn_rev)
+        btn_cram = Gtk.ToggleButton(icon_name="weather-storm-symbolic"); btn_cram.set_tooltip_text("Cram Mode"); btn_cram.add_css_class("flat"); self.cram_handler = btn_cram.connect("toggled", self.on_cram_toggled); header.append(btn_cram)
         btn_shuf = Gtk.Button(icon_name="media-playlist-shuffle-symbolic"); btn_shuf.set_tooltip_text("Shuffle"); btn_shuf.add_css_class("flat"); btn_shuf.connect("clicked", self.on_shuffle_clicked); header.append(btn_shuf)
         btn_add = Gtk.Button(icon_name="list-add-symbolic"); btn_add.set_tooltip_text("Add Card"); btn_add.add_css_class("flat"); btn_add.connect("clicked", self.on_add_clicked); header.append(btn_add)
+        # All Due mode spans many decks: there's no single deck to cram or add cards to
+        btn_cram.set_visible(not self.is_all_due); btn_add.set_visible(not self.is_all_due)
+        self.btn_rev, self.btn_cram, self.btn_add = btn_rev, btn_cram, btn_add
         
         self.append(header); self.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
 
@@ -137,18 +188,134 @@ class StudySession(Gtk.Box):
         self.card_stack = Gtk.Stack(); self.card_stack.set_transition_type(Gtk.StackTransitionType.SLIDE_LEFT_RIGHT); self.card_stack.set_size_request(300, 445); center.append(self.card_stack)
    
     def load_cards(self):
-        all_cards = db.load_deck(self.filename)
-        self.total_cards_in_deck = len(all_cards) # <--- NEW: Track total size
-        if self.is_cram_mode: self.cards = all_cards; random.shuffle(self.cards)
-        else:
-            today = datetime.today().isoformat()
-            self.cards = sorted([c for c in all_cards if not c.get("next_review") or c.get("next_review") <= today], key=lambda c: c.get("next_review") or "0000-00-00")
+        """Starts a fresh queue for the current mode; its first batch arrives from the data worker."""
+        self.binding = object() # Batches of the previous queue (restart, cram toggle) are dropped
+        self.cards = []
+        self.queue = SessionQueue(self.filename, cram=self.is_cram_mode)
+        self.fetching = True
+        get_worker().start_session(self.queue, self.bound(self.on_cards_loaded))
+
+    def fetch_more(self):
+        """Asks the queue for its next batch once the loaded cards run low."""
+        if self.fetching or self.queue is None or not self.queue.wants_more(len(self.cards) - self.current_index): return
+        self.fetching = True
+        get_worker().next_session_batch(self.queue, self.bound(self.on_batch_loaded))
+
+    def bound(self, callback):
+        """Wraps a worker callback so it is ignored if the view was rebound meanwhile."""
+        binding = self.binding
+        return lambda result: callback(result) if binding is self.binding else None
+
+    def on_cards_loaded(self, result):
+        self.fetching = False
+        self.cards, self.total_cards_in_deck = result
+        self.refresh_view()
+        self.end_start_span()
+
+    def on_batch_loaded(self, cards):
+        self.fetching = False
+        waiting = self.current_index >= len(self.cards) # The "loading" page is up
+        self.cards.extend(cards)
+        if waiting: self.refresh_view()
+        else: self.update_progress()
+
+    def session_total(self):
+        """Cards in this session: the loaded ones plus what the queue still expects to hand out."""
+        return len(self.cards) + (self.queue.left if self.queue else 0)
+
+    def update_progress(self):
+        self.lbl_progress.set_label(f"{self.current_index + 1} / {self.session_total()}")
+
+    def end_start_span(self):
+        tracing.end(self.start_span, cards=self.session_total(), total=self.total_cards_in_deck)
+        self.start_span = None
     
+    # --- DATA EVENTS (edits made here or elsewhere in the app) ---
+    def do_root(self):
+        Gtk.Box.do_root(self)
+        events.subscribe_all(self.card_events)
+
+    def do_unroot(self):
+        events.unsubscribe_all(self.card_events)
+        Gtk.Box.do_unroot(self)
+
+    def session_index(self, deck, card_id):
+        """Position of a card among the ones still ahead in the session, or None."""
+        for i in range(self.current_index, len(self.cards)):
+            c = self.cards[i]
+            if c["id"] == card_id and self.deck_of(c) == deck: return i
+        return None
+
+    def on_card_added(self, e):
+        if self.is_all_due or e.deck != self.filename or self.total_cards_in_deck is None: return
+        self.total_cards_in_deck += 1
+        if not self.queue.claim(e.deck, e.card["id"]): return
+        self.cards.append(e.card) # New cards are due right away
+        if self.current_index == len(self.cards) - 1: self.refresh_view() # We were on an empty/done page
+        else: self.update_progress()
+
+    def on_card_updated(self, e):
+        i = self.session_index(e.deck, e.card["id"])
+        if i is None: return
+        self.cards[i] = {**e.card, "_deck": e.deck} if self.is_all_due else e.card
+        if i == self.current_index: self.refresh_view()
+
+    def on_card_deleted(self, e):
+        if not self.is_all_due and e.deck == self.filename and self.total_cards_in_deck:
+            self.total_cards_in_deck -= 1
+        i = self.session_index(e.deck, e.card_id)
+        if i is None: return
+        del self.cards[i]
+        if i == self.current_index: self.refresh_view()
+        else: self.update_progress()
+
+    def on_data_changed(self, changes):
+        """
+        Files changed outside the app (see file_watcher). Re-reads only the affected deck(s)
+        and patches the cards still ahead in the session; reviewed cards stay as they were.
+        """
+        if self.total_cards_in_deck is None: return # A load is already on its way
+        decks = changes["decks"] if self.is_all_due else changes["decks"] & {self.filename}
+        for fname in decks:
+            get_worker().load_deck(fname, self.bound(lambda cards, f=fname: self.merge_deck(f, cards)))
+        if changes["assets"] and not decks and self.current_index < len(self.cards):
+            card = self.cards[self.current_index]
+            if {card.get("image"), card.get("audio")} & changes["assets"]: self.refresh_view()
+
+    def merge_deck(self, fname, cards):
+        fresh = {c["id"]: c for c in cards}
+        if not self.is_all_due: self.total_cards_in_deck = len(cards)
+        current = self.cards[self.current_index] if self.current_index < len(self.cards) else None
+
+        upcoming = []
+        for c in self.cards[self.current_index:]:
+            if self.deck_of(c) != fname: upcoming.append(c); continue
+            new = fresh.get(c["id"])
+            if new is None: continue # Deleted elsewhere
+            upcoming.append({**new, "_deck": fname} if self.is_all_due else new)
+        if not self.is_cram_mode:
+            today = datetime.today().isoformat()
+            for c in cards: # Newly due (or newly added) cards the queue has already walked past join the end
+                if c.get("suspended") or (c.get("next_review") and c["next_review"] > today): continue
+                if self.queue.behind(fname, c) and self.queue.claim(fname, c["id"]):
+                    upcoming.append({**c, "_deck": fname} if self.is_all_due else c)
+        self.cards = self.cards[:self.current_index] + upcoming
+
+        new_current = self.cards[self.current_index] if self.current_index < len(self.cards) else None
+        if new_current != current or current is None: self.refresh_view()
+        else: self.update_progress()
+        self.fetch_more()
+
     def setup_views(self):
+        # Loading (while the data worker reads the deck)
+        spinner = Gtk.Spinner(spinning=True, halign=Gtk.Align.CENTER, valign=Gtk.Align.CENTER)
+        spinner.set_size_request(32, 32)
+        self.card_stack.add_named(spinner, "loading")
+
         # 0. Void
         page_void = Adw.StatusPage(icon_name="folder-new-symbolic", title="Empty Deck", description="This deck has no cards yet.")
-        btn_add_first = Gtk.Button(label="Add Your First Card"); btn_add_first.add_css_class("pill"); btn_add_first.add_css_class("suggested-action")
-        btn_add_first.connect("clicked", self.on_add_clicked); page_void.set_child(btn_add_first)
+        self.btn_add_first = Gtk.Button(label="Add Your First Card"); self.btn_add_first.add_css_class("pill"); self.btn_add_first.add_css_class("suggested-action")
+        self.btn_add_first.connect("clicked", self.on_add_clicked); self.btn_add_first.set_visible(not self.is_all_due); page_void.set_child(self.btn_add_first)
         self.card_stack.add_named(page_void, "void")
 
         # 1. Empty
@@ -162,7 +329,7 @@ class StudySession(Gtk.Box):
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=15); vbox.set_halign(Gtk.Align.CENTER)
         row1 = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=15); row1.set_halign(Gtk.Align.CENTER)
         btn_close = Gtk.Button(label="Close Deck"); btn_close.add_css_class("pill"); btn_close.connect("clicked", lambda x: self.nav_callback("close", None)); row1.append(btn_close)
-        btn_stats = Gtk.Button(label="Show Performance"); btn_stats.add_css_class("pill"); btn_stats.connect("clicked", lambda x: self.nav_callback("stats", self.session_stats)); row1.append(btn_stats); vbox.append(row1)
+        self.btn_stats = Gtk.Button(label="Show Performance"); self.btn_stats.add_css_class("pill"); self.btn_stats.connect("clicked", lambda x: self.nav_callback("stats", self.session_stats)); self.btn_stats.set_visible(not self.is_all_due); row1.append(self.btn_stats); vbox.append(row1)
         btn_play = Gtk.Button(label="Play Again"); btn_play.add_css_class("suggested-action"); btn_play.add_css_class("pill"); btn_play.set_size_request(200, -1); btn_play.connect("clicked", lambda x: self.restart_session()); vbox.append(btn_play)
         page_done.set_child(vbox); self.card_stack.add_named(page_done, "done")
 
@@ -237,7 +404,8 @@ class StudySession(Gtk.Box):
         self.input_locked = False 
         
         self.hint_used = False
-        total = len(self.cards)
+        self.flip_time = None
+        total = self.session_total()
         
         # Update progress bar logic...
         if total > 0: self.progress_bar.set_fraction(self.current_index / total); self.lbl_progress.set_label(f"{self.current_index + 1} / {total}")
@@ -245,12 +413,22 @@ class StudySession(Gtk.Box):
         
         self.btn_card_edit.set_visible(self.cards and self.current_index < len(self.cards))
         
+        if self.total_cards_in_deck is None:
+            self.card_stack.set_visible_child_name("loading")
+            return
+
         if self.total_cards_in_deck == 0: 
             self.card_stack.set_visible_child_name("void")
             self.lbl_progress.set_label("0 / 0")
             return
 
-        if not self.cards: self.card_stack.set_visible_child_name("empty"); return
+        if not self.cards and not self.fetching: self.card_stack.set_visible_child_name("empty"); return
+
+        # Ran past the loaded cards: wait for the queue's next batch
+        if self.current_index >= len(self.cards) and (self.fetching or not self.queue.exhausted):
+            self.card_stack.set_visible_child_name("loading")
+            self.fetch_more()
+            return
 
         # --- FIX: DOUBLE AUDIO PREVENTION ---
         if self.current_index >= len(self.cards): 
@@ -293,6 +471,7 @@ class StudySession(Gtk.Box):
 
     def on_hint_clicked(self, btn): self.hint_used = True; self.btn_hint.set_visible(False); self.lbl_hint.set_visible(True)
     
+    @tracing.traced("session.flip")
     def flip_card(self, *args):
         # Prevent flipping if already locked (though unlikely here)
         if self.input_locked or self.is_editing: return # <--- ADD check here
@@ -300,6 +479,7 @@ class StudySession(Gtk.Box):
         self.play_sound("flip")
         self.card_stack.set_visible_child_name("back")
         self.is_flipped = True
+        self.flip_time = time.monotonic() # Answer latency is measured from here to rate_card
         
         # Disable "Good" if hint used
         if self.hint_used: 
@@ -355,6 +535,7 @@ class StudySession(Gtk.Box):
         
         # 2. LOCK IMMEDIATELY to prevent accidental swipes (e.g. "Good" click + micro-swipe up)
         self.input_locked = True 
+        self.response_ms = int((time.monotonic() - self.flip_time) * 1000) if self.flip_time else None
         
         color_class = ""
         if rating == 3: color_class = "flash-success"
@@ -364,13 +545,15 @@ class StudySession(Gtk.Box):
         self.flash_box.set_css_classes([color_class])
         self.flash_box.set_opacity(1.0) 
         
+        binding = self.binding
         def fade_out():
             self.flash_box.set_opacity(0)
-            self._finalize_rating(rating)
+            if binding is self.binding: self._finalize_rating(rating) # Not if the view was rebound meanwhile
             return False
 
         GLib.timeout_add(150, fade_out)
 
+    @tracing.traced("session.rate")
     def _finalize_rating(self, rating):
         if rating == 3: self.play_sound("good")
         elif rating == 1: self.play_sound("miss")
@@ -381,10 +564,12 @@ class StudySession(Gtk.Box):
         elif rating == 1: self.session_stats["miss"] += 1
         
         if not self.is_cram_mode: 
-            db.update_card_progress(self.filename, self.cards[self.current_index]["id"], rating, self.session_id, self.hint_used)
+            card = self.cards[self.current_index]
+            get_worker().update_card_progress(self.deck_of(card), card["id"], rating, self.session_id, self.hint_used, self.response_ms)
             
         self.current_index += 1
         self.refresh_view()
+        self.fetch_more()
 
     def play_sound(self, type):
         settings = db.load_settings()
@@ -434,7 +619,6 @@ class StudySession(Gtk.Box):
         self.session_id = str(uuid.uuid4())
         self.session_stats = {"good": 0, "hard": 0, "miss": 0, "total": 0, "session_id": self.session_id}
         self.load_cards()
-        self.refresh_view()
     
     def on_reverse_toggled(self, btn): self.is_reverse_mode = btn.get_active(); self.refresh_view()
     
@@ -442,7 +626,7 @@ class StudySession(Gtk.Box):
         self.has_finished_deck = False # <--- Reset flag
         if force_on: self.is_cram_mode = True
         else: self.is_cram_mode = btn.get_active()
-        self.current_index = 0; self.load_cards(); self.refresh_view()
+        self.current_index = 0; self.load_cards()
     
     def on_shuffle_clicked(self, btn):
         if not self.cards: return
@@ -477,135 +661,15 @@ class StudySession(Gtk.Box):
 
     def show_card_dialog(self, mode, card=None):
         self.is_editing = True # <--- LOCK INPUTS IMMEDIATELY
-        title = "Add Card" if mode == "add" else "Edit Card"
-        d = Adw.MessageDialog(heading=title, transient_for=self.get_root())
-        d.set_modal(True)
-        d.add_response("cancel", "Cancel")
-        d.add_response("save", "Save")
-        d.set_response_appearance("save", Adw.ResponseAppearance.SUGGESTED)
-        
-        # Responsive Height Check
-        win_width = self.get_root().get_width()
-        is_narrow = win_width < 500
-        box_height = 90 if is_narrow else 150
-        
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        
-        # Front
-        box.append(Gtk.Label(label="Front", xalign=0))
-        tf = Gtk.TextView(); tf.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
-        tf.set_left_margin(10); tf.set_right_margin(10)
-        tf.set_top_margin(10); tf.set_bottom_margin(10)
-        if card: tf.get_buffer().set_text(card.get("front", ""))
-
-        scroll_f = Gtk.ScrolledWindow(min_content_height=box_height) 
-        scroll_f.set_propagate_natural_height(True)
-        scroll_f.set_hexpand(True)
-        scroll_f.set_child(tf)
-        box.append(Gtk.Frame(child=scroll_f))
-        
-        # Back
-        box.append(Gtk.Label(label="Back", xalign=0))
-        tb = Gtk.TextView(); tb.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
-        tb.set_left_margin(10); tb.set_right_margin(10)
-        tb.set_top_margin(10); tb.set_bottom_margin(10)
-        if card: tb.get_buffer().set_text(card.get("back", ""))
-
-        scroll_b = Gtk.ScrolledWindow(min_content_height=box_height)
-        scroll_b.set_propagate_natural_height(True)
-        scroll_b.set_hexpand(True)
-        scroll_b.set_child(tb)
-        box.append(Gtk.Frame(child=scroll_b))
-        
-        # Metadata
-        box.append(Gtk.Label(label="Hint (Optional)", xalign=0)); th = Gtk.Entry()
-        if card: th.set_text(card.get("hint", ""))
-        box.append(th)
-        box.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
-        box.append(Gtk.Label(label="Tags (comma separated)", xalign=0)); ent_tags = Gtk.Entry() 
-        if card: ent_tags.set_text(", ".join(card.get("tags", [])))
-        box.append(ent_tags)
-
-        self.temp_img = card.get("image") if card else None
-        self.temp_aud = card.get("audio") if card else None
-
-        # Media Rows
-        row_img = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-        lbl_img = Gtk.Label(label=os.path.basename(self.temp_img) if self.temp_img else "No Image", hexpand=True, xalign=0)
-        lbl_img.set_ellipsize(3)
-        btn_img_del = Gtk.Button(icon_name="user-trash-symbolic", visible=bool(self.temp_img))
-        btn_img_add = Gtk.Button(icon_name="insert-image-symbolic")
-        
-        def on_img_del(b): self.temp_img = None; lbl_img.set_label("No Image"); btn_img_del.set_visible(False)
-        def on_img_pick(b): self.pick_file("image", lambda p: setattr(self, 'temp_img', p) or lbl_img.set_label(os.path.basename(p)) or btn_img_del.set_visible(True))
-        btn_img_del.connect("clicked", on_img_del); btn_img_add.connect("clicked", on_img_pick)
-        row_img.append(lbl_img); row_img.append(btn_img_add); row_img.append(btn_img_del); box.append(row_img)
-
-        row_aud = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-        lbl_aud = Gtk.Label(label=os.path.basename(self.temp_aud) if self.temp_aud else "No Audio", hexpand=True, xalign=0)
-        lbl_aud.set_ellipsize(3)
-        btn_aud_del = Gtk.Button(icon_name="user-trash-symbolic", visible=bool(self.temp_aud))
-        btn_aud_add = Gtk.Button(icon_name="audio-volume-high-symbolic")
-        
-        def on_aud_del(b): self.temp_aud = None; lbl_aud.set_label("No Audio"); btn_aud_del.set_visible(False)
-        def on_aud_pick(b): self.pick_file("audio", lambda p: setattr(self, 'temp_aud', p) or lbl_aud.set_label(os.path.basename(p)) or btn_aud_del.set_visible(True))
-        btn_aud_del.connect("clicked", on_aud_del); btn_aud_add.connect("clicked", on_aud_pick)
-        row_aud.append(lbl_aud); row_aud.append(btn_aud_add); row_aud.append(btn_aud_del); box.append(row_aud)
-
-        # FIX: Layout Inversion (Scroll -> Clamp -> Content)
-        # This puts the scrollbar at the dialog edge, not overlaying text.
-        scroll_main = Gtk.ScrolledWindow()
-        scroll_main.set_propagate_natural_height(True)
-        scroll_main.set_max_content_height(500) 
-
-        clamp = Adw.Clamp(maximum_size=800)
-        # Add padding to keep text off the scrollbar
-        clamp.set_margin_start(12); clamp.set_margin_end(12); clamp.set_margin_bottom(12)
-        clamp.set_child(box)
-        
-        scroll_main.set_child(clamp)
-        d.set_extra_child(scroll_main)
-
-        def on_r(dlg, res):
-            if res == "save":
-                bf, bb = tf.get_buffer(), tb.get_buffer()
-                f = bf.get_text(bf.get_start_iter(), bf.get_end_iter(), True).strip()
-                b = bb.get_text(bb.get_start_iter(), bb.get_end_iter(), True).strip()
-                tags = [t.strip() for t in ent_tags.get_text().split(",") if t.strip()]
-                hint_val = th.get_text().strip()
-                if f and b:
-                    if mode == "add": db.add_card_to_deck(self.filename, f, b, self.temp_img, self.temp_aud, tags, hint_val)
-                    else: db.edit_card(self.filename, card["id"], f, b, self.temp_img, self.temp_aud, tags, card.get("suspended", False), hint_val)
-                    self.load_cards(); self.refresh_view()
-            
-            # --- UNLOCK LOGIC ---
-            # We delay unlocking slightly to swallow any "Enter/Space" key release events 
-            # that triggered the Save button, preventing them from flipping the card underneath.
-            def unlock():
-                self.is_editing = False
-                return False
-            GLib.timeout_add(200, unlock) 
-            
-        d.connect("response", on_r)
-        d.present()
-
-    def pick_file(self, type_hint, callback):
-        if hasattr(Gtk, "FileDialog"):
-            d = Gtk.FileDialog(); f = Gtk.FileFilter()
-            if type_hint == "image": f.set_name("Images"); f.add_pixbuf_formats()
-            elif type_hint == "audio": f.set_name("Audio"); f.add_mime_type("audio/*")
-            filters = Gio.ListStore.new(Gtk.FileFilter); filters.append(f); d.set_filters(filters); d.set_default_filter(f)
-            def on_o(f, r):
-                try: 
-                    res = f.open_finish(r)
-                    if res: 
-                        path = res.get_path()
-                        if type_hint == "audio" and os.path.getsize(path) > 10 * 1024 * 1024: toast = Adw.Toast.new("File too large! Max 10MB."); self.get_root().get_content().add_toast(toast); return
-                        callback(path)
-                except: pass
-            d.open(self.get_root(), None, on_o)
-
-            # --- NEW: LIGHTBOX METHODS ---
+        # We delay unlocking slightly to swallow any "Enter/Space" key release events
+        # that triggered the Save button, preventing them from flipping the card underneath.
+        def unlock():
+            self.is_editing = False
+            return False
+        # Saved on the data worker; the CardAdded/CardUpdated event patches the session
+        deck = self.deck_of(card) if card else self.filename
+        card_dialog.show_card_dialog(self.get_root(), deck, mode, card, on_close=lambda: GLib.timeout_add(200, unlock))
+    # --- NEW: LIGHTBOX METHODS ---
     def on_image_click(self, gesture, n_press, x, y):
         if self.current_img_path:
             self.show_lightbox(self.current_img_path)
@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import threading
+import traceback
+from collections import deque, Counter
+
+import gi
+gi.require_version('GLib', '2.0')
+from gi.repository import GLib
+
+# --- DEBUG TRACING (opt-in) ---
+# FLIPSTACK_DEBUG=1 (or settings["debug_trace"]) turns on two things:
+#   * a main-loop watchdog: a 50 ms heartbeat runs on the GLib main loop while a
+#     sampler thread checks it. When the loop hasn't come back for STALL_MS, the
+#     sampler takes stack samples of the main thread until it does, and the stall is
+#     reported on stderr with its most frequent stack.
+#   * spans around user-facing operations (session start, flip, rating, sidebar
+#     refresh, search, import) and data worker jobs, kept in a bounded buffer and
+#     written as Chrome trace-event JSON (open in chrome://tracing or Perfetto).
+# When off, span()/begin() hand back shared no-ops and nothing runs in the background.
+ENV_VAR = "FLIPSTACK_DEBUG"
+HEARTBEAT_MS = 50
+SAMPLE_MS = 10
+STALL_MS = int(os.environ.get("FLIPSTACK_STALL_MS", "200"))
+MAX_EVENTS = 200000
+MAX_SAMPLES = 200   # Per stall
+STACK_DEPTH = 12    # Innermost frames kept per sample
+
+_events = None      # deque of trace events while tracing, None when off
+_trace_path = None
+_pid = os.getpid()
+_epoch = time.perf_counter()
+_threads = {}       # tid -> thread name (for the trace's metadata events)
+
+def requested(settings=None):
+    if os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes", "on"): return True
+    return bool((settings or {}).get("debug_trace"))
+
+def active():
+    return _events is not None
+
+def _now_us():
+    return (time.perf_counter() - _epoch) * 1e6
+
+def _emit(event):
+    tid = threading.get_ident()
+    if tid not in _threads: _threads[tid] = threading.current_thread().name
+    event["pid"], event["tid"] = _pid, tid
+    _events.append(event) # deque.append is atomic; the buffer drops the oldest when full
+
+# --- Spans ---
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args, self.start = name, cat, args, _now_us()
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+
+    def finish(self, **args):
+        if _events is None: return
+        if args: self.args = {**self.args, **args}
+        _emit({"name": self.name, "cat": self.cat, "ph": "X", "ts": self.start,
+               "dur": _now_us() - self.start, "args": self.args})
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): pass
+    def finish(self, **args): pass
+
+_NULL = _NullSpan()
+
+def span(name, cat="app", **args):
+    """Context manager timing a block on the current thread."""
+    return _Span(name, cat, args) if _events is not None else _NULL
+
+def begin(name, cat="app", **args):
+    """Starts a span that ends later (e.g. in a worker callback); call end(token)."""
+    return _Span(name, cat, args) if _events is not None else _NULL
+
+def end(token, **args):
+    if token is not None: token.finish(**args)
+
+def traced(name, cat="app"):
+    """Decorator: wraps each call of the function in a span (checked per call)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _events is None: return fn(*args, **kwargs)
+            with _Span(name, cat, {}): return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def complete(name, start, cat="app", **args):
+    """Records a span that began at time.perf_counter() value `start` (e.g. before tracing started)."""
+    if _events is not None:
+        _emit({"name": name, "cat": cat, "ph": "X", "ts": (start - _epoch) * 1e6,
+               "dur": _now_us() - (start - _epoch) * 1e6, "args": args})
+
+def instant(name, cat="app", **args):
+    if _events is not None: _emit({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _now_us(), "args": args})
+
+# --- Watchdog ---
+class _Watchdog:
+    def __init__(self, stall_ms):
+        self.stall_s = stall_ms / 1000
+        self.main_ident = threading.main_thread().ident
+        self.lock = threading.Lock()
+        self.last_beat = time.perf_counter()
+        self.samples = []          # Stacks sampled during the current stall
+        self.stall_start = None
+        self.stats = {"beats": 0, "max_lag_ms": 0.0, "stalls": 0, "stalled_ms": 0.0}
+        GLib.timeout_add(HEARTBEAT_MS, self.beat)
+        threading.Thread(target=self.sample_loop, name="flipstack-watchdog", daemon=True).start()
+
+    def beat(self):
+        now = time.perf_counter()
+        with self.lock:
+            lag_ms = max(0.0, (now - self.last_beat) * 1000 - HEARTBEAT_MS)
+            self.last_beat = now
+            stall_start, samples = self.stall_start, self.samples
+            self.stall_start, self.samples = None, []
+            self.stats["beats"] += 1
+            if lag_ms > self.stats["max_lag_ms"]: self.stats["max_lag_ms"] = lag_ms
+        if stall_start is not None: self.report(stall_start, now, samples)
+        return True
+
+    def sample_loop(self):
+        while True:
+            time.sleep(SAMPLE_MS / 1000)
+            with self.lock:
+                now = time.perf_counter()
+                if now - self.last_beat < self.stall_s + HEARTBEAT_MS / 1000: continue
+                if self.stall_start is None: self.stall_start = self.last_beat + HEARTBEAT_MS / 1000
+                if len(self.samples) >= MAX_SAMPLES: continue
+            frame = sys._current_frames().get(self.main_ident)
+            if frame is None: continue
+            stack = tuple(f"{os.path.basename(fs.filename)}:{fs.lineno} {fs.name}"
+                          for fs in traceback.extract_stack(frame)[-STACK_DEPTH:])
+            with self.lock:
+                if self.stall_start is not None: self.samples.append(stack)
+
+    def report(self, start, end, samples):
+        ms = (end - start) * 1000
+        with self.lock:
+            self.stats["stalls"] += 1
+            self.stats["stalled_ms"] += ms
+        top = Counter(samples).most_common(3)
+        if _events is not None:
+            _emit({"name": "main loop stall", "cat": "watchdog", "ph": "X",
+                   "ts": (start - _epoch) * 1e6, "dur": ms * 1000,
+                   "args": {"ms": round(ms, 1), "samples": len(samples),
+                            "stacks": [{"hits": n, "stack": list(s)} for s, n in top]}})
+        print(f"[watchdog] main loop blocked for {ms:.0f} ms ({len(samples)} samples)", file=sys.stderr)
+        if top:
+            print("  most frequent stack:\n    " + "\n    ".join(reversed(top[0][0])), file=sys.stderr)
+
+_watchdog = None
+
+def start(trace_path, stall_ms=STALL_MS):
+    """Turns tracing on (call on the main thread); the trace is written at exit."""
+    global _events, _trace_path, _watchdog
+    if _events is not None: return
+    _events = deque(maxlen=MAX_EVENTS)
+    _trace_path = trace_path
+    _watchdog = _Watchdog(stall_ms)
+    atexit.register(export)
+
+def stats():
+    if _watchdog is None: return {}
+    with _watchdog.lock: return dict(_watchdog.stats)
+
+def export(path=None):
+    """Writes the buffered events as Chrome trace JSON; returns the path (None when off)."""
+    path = path or _trace_path
+    if _events is None or path is None: return None
+    meta = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(_threads.items())]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": meta + list(_events), "displayTimeUnit": "ms",
+                   "otherData": {"watchdog": stats(), "stall_ms": _watchdog.stall_s * 1000}}, f)
+    return path